@@ -4,20 +4,28 @@ FastAPI Server for N8N Workflow Documentation
 High-performance API with sub-100ms response times.
 """
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import (HTMLResponse, FileResponse, JSONResponse, PlainTextResponse, Response,
+                               StreamingResponse)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
 import json
 import os
 import asyncio
+import contextvars
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import uvicorn
+from urllib.parse import quote
 
-from workflow_db import WorkflowDatabase
+from workflow_db import (WorkflowDatabase, EXPORT_FORMATS, splice_json, verified_raw_json,
+                         single_line_json)
+from category_cache import CategoryCache, CachedBody, AcceptEncodingMiddleware
+from metrics import metrics, ServerTimingMiddleware
+from workflow_ingest import WorkflowIngester, IngestError, iter_entries
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -28,6 +36,8 @@ app = FastAPI(
 
 # Add middleware for performance
 app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Outside GZipMiddleware so gzip;q=0 reaches it as a refusal
+app.add_middleware(AcceptEncodingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -35,23 +45,77 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-stage Server-Timing header and per-route latency for /metrics
+app.add_middleware(ServerTimingMiddleware)
 
-# Initialize database
-db = WorkflowDatabase()
+# Created by startup_event (see init_services), so importing this module
+# opens no database and starts no threads
+db: Optional[WorkflowDatabase] = None
+
+# Category files are parsed once and reloaded when they change on disk
+category_cache = CategoryCache()
+
+# Batch detail requests: filenames per request and parallel file reads
+BATCH_MAX_FILENAMES = int(os.environ.get('WORKFLOW_BATCH_MAX', '100'))
+BATCH_READ_WORKERS = 8
+batch_executor: Optional[ThreadPoolExecutor] = None
+
+# Bulk ingestion: request body limit and the part of it buffered in memory
+INGEST_MAX_BYTES = int(os.environ.get('WORKFLOW_INGEST_MAX_BYTES', str(256 * 1024 * 1024)))
+INGEST_SPOOL_BYTES = 8 * 1024 * 1024
+ingester: Optional[WorkflowIngester] = None
+
+def init_services():
+    """Open the database and create the batch executor and ingester, keeping
+    any that are already set (tests and benchmarks install their own db)."""
+    global db, batch_executor, ingester
+    if db is None:
+        db = WorkflowDatabase()
+    if batch_executor is None:
+        batch_executor = ThreadPoolExecutor(max_workers=BATCH_READ_WORKERS, thread_name_prefix="batch-read")
+    if ingester is None or ingester.db is not db:
+        ingester = WorkflowIngester(db)
 
 # Startup function to verify database
 @app.on_event("startup")
 async def startup_event():
-    """Verify database connectivity on startup."""
+    """Serve immediately; reindex in the background if the workflows changed."""
+    init_services()
     try:
-        stats = db.get_stats()
-        if stats['total'] == 0:
-            print("⚠️  Warning: No workflows found in database. Run indexing first.")
+        manifest = db.get_manifest()
+        if db.is_index_current(manifest):
+            print(f"✅ Database current: {manifest.get('corpus_files', '?')} workflows, "
+                  f"generation {manifest.get('generation', '0')}")
+        elif db.read_only:
+            # Multi-worker mode: the indexer process owns writes; workers pick up
+            # the new generation on their next query
+            print("🔒 Read-only worker: index is stale, waiting for the indexer")
         else:
-            print(f"✅ Database connected: {stats['total']} workflows indexed")
+            print("🔄 Workflow files changed since the last index, reindexing in the background")
+            db.start_background_reindex(force_reindex=db.needs_full_reindex(manifest))
+        if db.use_bitmap_index:
+            db.get_bitmap_index()
+            print("✅ Bitmap filter index loaded")
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         raise
+    try:
+        category_cache.refresh()
+    except Exception as e:
+        print(f"⚠️  Warning: could not load category files: {e}")
+    if not Path("static").exists():
+        print(f"❌ Warning: Static directory not found at {Path('static').absolute()}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the batch readers and the ingest worker processes."""
+    global batch_executor, ingester
+    if batch_executor is not None:
+        batch_executor.shutdown(wait=False, cancel_futures=True)
+        batch_executor = None
+    if ingester is not None:
+        ingester.close()
+        ingester = None
 
 # Response models
 class WorkflowSummary(BaseModel):
@@ -67,6 +131,7 @@ class WorkflowSummary(BaseModel):
     tags: List[str] = []
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+    snippet: Optional[str] = None
     
     class Config:
         # Allow conversion of int to bool for active field
@@ -88,6 +153,20 @@ class SearchResponse(BaseModel):
     pages: int
     query: str
     filters: Dict[str, Any]
+    suggestion: Optional[str] = None
+
+class SimilarWorkflow(WorkflowSummary):
+    similarity: float
+
+class SimilarResponse(BaseModel):
+    filename: str
+    similar: List[SimilarWorkflow]
+    min_similarity: float
+
+class BatchRequest(BaseModel):
+    filenames: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_FILENAMES)
+    include_raw: bool = False
+    include_diagram: bool = False
 
 class StatsResponse(BaseModel):
     total: int
@@ -99,6 +178,24 @@ class StatsResponse(BaseModel):
     unique_integrations: int
     last_indexed: str
 
+def workflow_summary_fields(workflow: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the WorkflowSummary fields out of a database row dict."""
+    return {
+        'id': workflow.get('id'),
+        'filename': workflow.get('filename', ''),
+        'name': workflow.get('name', ''),
+        'active': workflow.get('active', False),
+        'description': workflow.get('description', ''),
+        'trigger_type': workflow.get('trigger_type', 'Manual'),
+        'complexity': workflow.get('complexity', 'low'),
+        'node_count': workflow.get('node_count', 0),
+        'integrations': workflow.get('integrations', []),
+        'tags': workflow.get('tags', []),
+        'created_at': workflow.get('created_at'),
+        'updated_at': workflow.get('updated_at'),
+        'snippet': workflow.get('snippet')
+    }
+
 @app.get("/")
 async def root():
     """Serve the main documentation page."""
@@ -119,6 +216,15 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "message": "N8N Workflow API is running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text-format metrics for this process."""
+    try:
+        metrics.set_gauge('workflow_index_generation', db.get_index_generation())
+    except Exception as e:
+        print(f"⚠️  Warning: could not read index generation: {e}")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/stats", response_model=StatsResponse)
 async def get_stats():
     """Get workflow database statistics."""
@@ -134,10 +240,17 @@ async def search_workflows(
     trigger: str = Query("all", description="Filter by trigger type"),
     complexity: str = Query("all", description="Filter by complexity"),
     active_only: bool = Query(False, description="Show only active workflows"),
+    scope: str = Query("default", pattern="^(default|deep)$",
+                       description="'deep' also searches node parameters (prompts, URLs, code, notes)"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page")
 ):
     """Search and filter workflows with pagination."""
+    if scope == "deep" and not db.has_deep_index():
+        raise HTTPException(
+            status_code=400,
+            detail="Deep index not built. Run: python workflow_db.py --index --deep"
+        )
     try:
         offset = (page - 1) * per_page
         
@@ -147,36 +260,27 @@ async def search_workflows(
             complexity_filter=complexity,
             active_only=active_only,
             limit=per_page,
-            offset=offset
+            offset=offset,
+            scope=scope
         )
         
         # Convert to Pydantic models with error handling
         workflow_summaries = []
-        for workflow in workflows:
-            try:
-                # Remove extra fields that aren't in the model
-                clean_workflow = {
-                    'id': workflow.get('id'),
-                    'filename': workflow.get('filename', ''),
-                    'name': workflow.get('name', ''),
-                    'active': workflow.get('active', False),
-                    'description': workflow.get('description', ''),
-                    'trigger_type': workflow.get('trigger_type', 'Manual'),
-                    'complexity': workflow.get('complexity', 'low'),
-                    'node_count': workflow.get('node_count', 0),
-                    'integrations': workflow.get('integrations', []),
-                    'tags': workflow.get('tags', []),
-                    'created_at': workflow.get('created_at'),
-                    'updated_at': workflow.get('updated_at')
-                }
-                workflow_summaries.append(WorkflowSummary(**clean_workflow))
-            except Exception as e:
-                print(f"Error converting workflow {workflow.get('filename', 'unknown')}: {e}")
-                # Continue with other workflows instead of failing completely
-                continue
+        with metrics.timer('pydantic'):
+            for workflow in workflows:
+                try:
+                    # Remove extra fields that aren't in the model
+                    workflow_summaries.append(WorkflowSummary(**workflow_summary_fields(workflow)))
+                except Exception as e:
+                    print(f"Error converting workflow {workflow.get('filename', 'unknown')}: {e}")
+                    # Continue with other workflows instead of failing completely
+                    continue
         
         pages = (total + per_page - 1) // per_page  # Ceiling division
         
+        # Offer a spelling correction when nothing matched
+        suggestion = db.suggest_query(q) if total == 0 and q.strip() else None
+        
         return SearchResponse(
             workflows=workflow_summaries,
             total=total,
@@ -187,81 +291,246 @@ async def search_workflows(
             filters={
                 "trigger": trigger,
                 "complexity": complexity,
-                "active_only": active_only
-            }
+                "active_only": active_only,
+                "scope": scope
+            },
+            suggestion=suggestion
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching workflows: {str(e)}")
 
 @app.get("/api/workflows/{filename}")
-async def get_workflow_detail(filename: str):
+async def get_workflow_detail(
+    filename: str,
+    include_raw: bool = Query(True, description="Embed the workflow JSON; "
+                                                "false returns metadata only (see /raw)")
+):
     """Get detailed workflow information including raw JSON."""
     try:
-        # Get workflow metadata from database
-        workflows, _ = db.search_workflows(f'filename:"{filename}"', limit=1)
-        if not workflows:
+        # Get workflow metadata from database (unique filename index, cached)
+        workflow_meta = db.get_by_filename(filename)
+        if workflow_meta is None:
             raise HTTPException(status_code=404, detail="Workflow not found in database")
+        if not include_raw:
+            return {"metadata": workflow_meta}
         
-        workflow_meta = workflows[0]
-        
-        # file_path = Path(__file__).parent / "workflows" / workflow_meta.name / filename
-        # print(f"当前工作目录: {workflow_meta}")
-        # Load raw JSON from file
-        workflows_path = Path('workflows')
-        json_files = list(workflows_path.rglob("*.json"))
-        file_path = [f for f in json_files if f.name == filename][0]
-        if not file_path.exists():
-            print(f"Warning: File {file_path} not found on filesystem but exists in database")
+        # The file's bytes go into the response as they are
+        data = db.read_workflow_bytes(filename)
+        if data is None:
+            print(f"Warning: File {filename} not found on filesystem but exists in database")
             raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            raw_json = json.load(f)
-        
-        return {
-            "metadata": workflow_meta,
-            "raw_json": raw_json
-        }
+        with metrics.timer('splice'):
+            body = splice_json({"metadata": workflow_meta}, "raw_json", verified_raw_json(workflow_meta, data))
+        return Response(content=body, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading workflow: {str(e)}")
 
+@app.get("/api/workflows/{filename}/raw")
+async def get_workflow_raw(filename: str):
+    """The workflow JSON exactly as stored, for clients that fetch metadata
+    with ``include_raw=false``."""
+    # One read beats FileResponse's chunked threadpool reads at workflow sizes
+    data = db.read_workflow_bytes(filename)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
+    return Response(content=data, media_type="application/json")
+
+def load_batch_item(filename: str, metadata: Optional[Dict[str, Any]],
+                    include_raw: bool, include_diagram: bool) -> bytes:
+    """One NDJSON line of a batch response; runs on a batch_executor thread."""
+    item: Dict[str, Any] = {"filename": filename}
+    raw = None
+    if metadata is None:
+        item["error"] = "Workflow not found in database"
+    else:
+        item["metadata"] = metadata
+        if include_raw or include_diagram:
+            data = db.read_workflow_bytes(filename)
+            if data is None:
+                item["error"] = f"Workflow file '{filename}' not found on filesystem"
+            else:
+                try:
+                    if include_raw:
+                        raw = verified_raw_json(metadata, data)
+                    if include_diagram:
+                        with metrics.timer('json_load'):
+                            parsed = json.loads(data)
+                        item["diagram"] = generate_mermaid_diagram(parsed.get('nodes', []),
+                                                                   parsed.get('connections', {}))
+                except ValueError as e:
+                    raw = None
+                    item["error"] = f"Error loading workflow: {str(e)}"
+    if raw is not None:
+        # Keep the record on one NDJSON line
+        return splice_json(item, "raw_json", single_line_json(raw)) + b"\n"
+    return (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+
+@app.post("/api/workflows/batch")
+async def get_workflows_batch(batch: BatchRequest):
+    """Metadata, and optionally raw JSON and diagrams, for many workflows at once.
+    
+    Streams one NDJSON line per filename as soon as it is ready, so the
+    order follows completion; every line carries its ``filename``.
+    """
+    filenames = list(dict.fromkeys(batch.filenames))
+    try:
+        found = db.get_many_by_filenames(filenames)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading workflows: {str(e)}")
+    
+    if not (batch.include_raw or batch.include_diagram):
+        # Metadata only: nothing to read from disk
+        async def lines():
+            for filename in filenames:
+                yield load_batch_item(filename, found.get(filename), False, False)
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    # Readers run in a copy of this request's context, so their stage timers
+    # reach its Server-Timing header
+    loop = asyncio.get_running_loop()
+    pending = asyncio.as_completed([
+        loop.run_in_executor(batch_executor, contextvars.copy_context().run, load_batch_item,
+                             filename, found.get(filename), batch.include_raw, batch.include_diagram)
+        for filename in filenames
+    ])
+    # Headers go out with the first line: Server-Timing covers the lookup and
+    # the reads finished by then (/metrics records every read)
+    first = await next(pending)
+    
+    async def stream():
+        yield first
+        for line in pending:
+            yield await line
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+EXPORT_MEDIA_TYPES = {'ndjson': "application/x-ndjson", 'csv': "text/csv; charset=utf-8"}
+
+@app.get("/api/export")
+async def export_workflows(
+    fmt: str = Query("ndjson", alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$",
+                     description="Output format: ndjson (one workflow per line) or csv"),
+    include_raw: bool = Query(False, description="Add each workflow's JSON as raw_json"),
+    include_graph: bool = Query(False, description="Add the node graph (nodes and typed edges) as graph")
+):
+    """All workflow metadata in one streamed response, read from a single cursor.
+    
+    Rows are in filename order and form a consistent snapshot of the index;
+    memory use stays flat however large the corpus is.
+    """
+    return StreamingResponse(
+        db.iter_export(fmt, include_raw=include_raw, include_graph=include_graph),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": attachment_disposition(f"workflows.{fmt}")}
+    )
+
+@app.post("/api/workflows/ingest")
+async def ingest_workflows(request: Request):
+    """Index workflows sent in the request body, without files on disk.
+    
+    The body is NDJSON (``{"filename", "workflow"}`` per line) or a tar or
+    zip archive of workflow JSON files; the format is detected from its
+    first bytes. Returns counts and a per-item result in input order.
+    """
+    if db.read_only:
+        raise HTTPException(status_code=403, detail="This worker opens the database read-only; "
+                                                    "ingest through a single-process server")
+    # Archives need random access, so the body is buffered (in memory up to a point)
+    body = tempfile.SpooledTemporaryFile(max_size=INGEST_SPOOL_BYTES)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > INGEST_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Request body exceeds {INGEST_MAX_BYTES} bytes")
+            body.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty request body")
+        body.seek(0)
+        
+        # Analysis and commits block, so they run off the event loop (in this
+        # request's context, for Server-Timing)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, contextvars.copy_context().run,
+                                          lambda: ingester.ingest(iter_entries(body)))
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error ingesting workflows: {str(e)}")
+    finally:
+        body.close()
+
+def attachment_disposition(filename: str) -> str:
+    """Content-Disposition for a download, as FileResponse builds it."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
 @app.get("/api/workflows/{filename}/download")
 async def download_workflow(filename: str):
     """Download workflow JSON file."""
     try:
-        workflows_path = Path('workflows')
-        json_files = list(workflows_path.rglob("*.json"))
-        file_path = [f for f in json_files if f.name == filename][0]
-        if not os.path.exists(file_path):
-            print(f"Warning: Download requested for missing file: {file_path}")
+        # Read through the database so a corpus pack is served like the files
+        data = db.read_workflow_bytes(filename)
+        if data is None:
+            print(f"Warning: Download requested for missing file: {filename}")
             raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
         
-        return FileResponse(
-            file_path,
+        return Response(
+            content=data,
             media_type="application/json",
-            filename=filename
+            headers={"Content-Disposition": attachment_disposition(filename)}
         )
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error downloading workflow {filename}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error downloading workflow: {str(e)}")
 
+@app.get("/api/workflows/{filename}/similar", response_model=SimilarResponse)
+async def get_similar_workflows(
+    filename: str,
+    min_similarity: float = Query(0.5, ge=0.0, le=1.0, description="Minimum estimated structural similarity"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results")
+):
+    """Find structurally similar (near-duplicate) workflows via MinHash/LSH."""
+    try:
+        similar = db.find_similar(filename, limit=limit, min_similarity=min_similarity)
+        if similar is None:
+            raise HTTPException(status_code=404, detail="Workflow not found in database")
+        
+        with metrics.timer('pydantic'):
+            similar_workflows = [SimilarWorkflow(**workflow_summary_fields(workflow),
+                                                 similarity=workflow['similarity'])
+                                 for workflow in similar]
+        
+        return SimilarResponse(
+            filename=filename,
+            similar=similar_workflows,
+            min_similarity=min_similarity
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding similar workflows: {str(e)}")
+
 @app.get("/api/workflows/{filename}/diagram")
 async def get_workflow_diagram(filename: str):
     """Get Mermaid diagram code for workflow visualization."""
     try:
-        workflows_path = Path('workflows')
-        json_files = list(workflows_path.rglob("*.json"))
-        file_path = [f for f in json_files if f.name == filename][0]
-        print(f'{file_path}')
-        if not file_path.exists():
-            print(f"Warning: Diagram requested for missing file: {file_path}")
+        raw = db.read_workflow_bytes(filename)
+        if raw is None:
+            print(f"Warning: Diagram requested for missing file: {filename}")
             raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with metrics.timer('json_load'):
+            data = json.loads(raw.decode('utf-8'))
         
         nodes = data.get('nodes', [])
         connections = data.get('connections', {})
@@ -272,8 +541,6 @@ async def get_workflow_diagram(filename: str):
         return {"diagram": diagram}
     except HTTPException:
         raise
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found")
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON in {filename}: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Invalid JSON in workflow file: {str(e)}")
@@ -352,6 +619,9 @@ def generate_mermaid_diagram(nodes: List[Dict], connections: Dict) -> str:
 @app.post("/api/reindex")
 async def reindex_workflows(background_tasks: BackgroundTasks, force: bool = False):
     """Trigger workflow reindexing in the background."""
+    if db.read_only:
+        raise HTTPException(status_code=403, detail="This worker opens the database read-only; "
+                                                    "reindex through the indexer process")
     def run_indexing():
         db.index_all_workflows(force_reindex=force)
     
@@ -368,61 +638,35 @@ async def get_integrations():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching integrations: {str(e)}")
 
+def cached_json_response(body: CachedBody, request: Request) -> Response:
+    """Serve a pre-serialized body, gzipped when the client accepts it.
+    
+    GZipMiddleware passes responses that already have a Content-Encoding
+    through untouched, so Vary is set here only for those; on the others
+    the middleware adds it.
+    """
+    content, encoding = body.encoded(request.headers.get("accept-encoding", ""))
+    headers = {}
+    if encoding:
+        headers = {"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    return Response(content=content, media_type="application/json", headers=headers)
+
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get available workflow categories for filtering."""
     try:
-        # Try to load from the generated unique categories file
-        categories_file = Path("context/unique_categories.json")
-        if categories_file.exists():
-            with open(categories_file, 'r', encoding='utf-8') as f:
-                categories = json.load(f)
-            return {"categories": categories}
-        else:
-            # Fallback: extract categories from search_categories.json
-            search_categories_file = Path("context/search_categories.json")
-            if search_categories_file.exists():
-                with open(search_categories_file, 'r', encoding='utf-8') as f:
-                    search_data = json.load(f)
-                
-                unique_categories = set()
-                for item in search_data:
-                    if item.get('category'):
-                        unique_categories.add(item['category'])
-                    else:
-                        unique_categories.add('Uncategorized')
-                
-                categories = sorted(list(unique_categories))
-                return {"categories": categories}
-            else:
-                # Last resort: return basic categories
-                return {"categories": ["Uncategorized"]}
-                
+        category_cache.refresh()
+        return cached_json_response(category_cache.categories_body, request)
     except Exception as e:
         print(f"Error loading categories: {e}")
         raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
 
 @app.get("/api/category-mappings")
-async def get_category_mappings():
+async def get_category_mappings(request: Request):
     """Get filename to category mappings for client-side filtering."""
     try:
-        search_categories_file = Path("context/search_categories.json")
-        if not search_categories_file.exists():
-            return {"mappings": {}}
-        
-        with open(search_categories_file, 'r', encoding='utf-8') as f:
-            search_data = json.load(f)
-        
-        # Convert to a simple filename -> category mapping
-        mappings = {}
-        for item in search_data:
-            filename = item.get('filename')
-            category = item.get('category') or 'Uncategorized'
-            if filename:
-                mappings[filename] = category
-        
-        return {"mappings": mappings}
-        
+        category_cache.refresh()
+        return cached_json_response(category_cache.mappings_body, request)
     except Exception as e:
         print(f"Error loading category mappings: {e}")
         raise HTTPException(status_code=500, detail=f"Error fetching category mappings: {str(e)}")
@@ -445,26 +689,13 @@ async def search_workflows_by_category(
         
         # Convert to Pydantic models with error handling
         workflow_summaries = []
-        for workflow in workflows:
-            try:
-                clean_workflow = {
-                    'id': workflow.get('id'),
-                    'filename': workflow.get('filename', ''),
-                    'name': workflow.get('name', ''),
-                    'active': workflow.get('active', False),
-                    'description': workflow.get('description', ''),
-                    'trigger_type': workflow.get('trigger_type', 'Manual'),
-                    'complexity': workflow.get('complexity', 'low'),
-                    'node_count': workflow.get('node_count', 0),
-                    'integrations': workflow.get('integrations', []),
-                    'tags': workflow.get('tags', []),
-                    'created_at': workflow.get('created_at'),
-                    'updated_at': workflow.get('updated_at')
-                }
-                workflow_summaries.append(WorkflowSummary(**clean_workflow))
-            except Exception as e:
-                print(f"Error converting workflow {workflow.get('filename', 'unknown')}: {e}")
-                continue
+        with metrics.timer('pydantic'):
+            for workflow in workflows:
+                try:
+                    workflow_summaries.append(WorkflowSummary(**workflow_summary_fields(workflow)))
+                except Exception as e:
+                    print(f"Error converting workflow {workflow.get('filename', 'unknown')}: {e}")
+                    continue
         
         pages = (total + per_page - 1) // per_page
         
@@ -492,9 +723,6 @@ async def global_exception_handler(request, exc):
 static_dir = Path("static")
 if static_dir.exists():
     app.mount("/static", StaticFiles(directory="static"), name="static")
-    print(f"✅ Static files mounted from {static_dir.absolute()}")
-else:
-    print(f"❌ Warning: Static directory not found at {static_dir.absolute()}")
 
 def create_static_directory():
     """Create static directory if it doesn't exist."""
@@ -502,29 +730,23 @@ def create_static_directory():
     static_dir.mkdir(exist_ok=True)
     return static_dir
 
-def run_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
-    """Run the FastAPI server."""
+def run_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False, workers: int = 1):
+    """Run the FastAPI server; with workers > 1 this process is the indexer and
+    the uvicorn workers open the database read-only."""
     # Ensure static directory exists
     create_static_directory()
     
-    # Debug: Check database connectivity
+    # Index before serving only when there is nothing to serve; the startup
+    # hook refreshes a stale index in the background
+    db = WorkflowDatabase()
     try:
-        stats = db.get_stats()
-        print(f"✅ Database connected: {stats['total']} workflows found")
-        if stats['total'] == 0:
+        if not db.has_workflows():
             print("🔄 Database is empty. Indexing workflows...")
             db.index_all_workflows()
-            stats = db.get_stats()
+        total = db.get_manifest().get('corpus_files', '0')
     except Exception as e:
-        print(f"❌ Database error: {e}")
-        print("🔄 Attempting to create and index database...")
-        try:
-            db.index_all_workflows()
-            stats = db.get_stats()
-            print(f"✅ Database created: {stats['total']} workflows indexed")
-        except Exception as e2:
-            print(f"❌ Failed to create database: {e2}")
-            stats = {'total': 0}
+        print(f"❌ Failed to create database: {e}")
+        total = 0
     
     # Debug: Check static files
     static_path = Path("static")
@@ -535,15 +757,23 @@ def run_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
         print(f"❌ Static directory not found at: {static_path.absolute()}")
     
     print(f"🚀 Starting N8N Workflow Documentation API")
-    print(f"📊 Database contains {stats['total']} workflows")
+    print(f"📊 Database contains {total} workflows")
     print(f"🌐 Server will be available at: http://{host}:{port}")
     print(f"📁 Static files at: http://{host}:{port}/static/")
     
+    if workers > 1:
+        os.environ['WORKFLOW_DB_READONLY'] = '1'
+        os.environ['WORKFLOW_DB_PATH'] = os.path.abspath(db.db_path)
+        if not db.is_index_current():
+            db.start_background_reindex(force_reindex=db.needs_full_reindex(db.get_manifest()))
+    
+    import uvicorn
     uvicorn.run(
         "api_server:app",
         host=host,
         port=port,
         reload=reload,
+        workers=workers if not reload else None,
         access_log=True,  # Enable access logs for debugging
         log_level="info"
     )
@@ -555,7 +785,8 @@ if __name__ == "__main__":
     parser.add_argument('--host', default='127.0.0.1', help='Host to bind to')
     parser.add_argument('--port', type=int, default=8000, help='Port to bind to')
     parser.add_argument('--reload', action='store_true', help='Enable auto-reload for development')
+    parser.add_argument('--workers', type=int, default=1, help='Number of read-only worker processes')
     
     args = parser.parse_args()
     
-    run_server(host=args.host, port=args.port, reload=args.reload)
\ No newline at end of file
+    run_server(host=args.host, port=args.port, reload=args.reload, workers=args.workers)
\ No newline at end of file
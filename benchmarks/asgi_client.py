@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Minimal in-process ASGI client for timing API endpoints without a socket
+or an HTTP client dependency.
+"""
+
+import asyncio
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class ASGIClient:
+    """Send HTTP requests straight into an ASGI app on a private event loop.
+
+    With ``lifespan=True`` the app's startup hooks run before the first
+    request and its shutdown hooks on ``close()``, as under a real server.
+    """
+
+    def __init__(self, app, lifespan: bool = False):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self._lifespan = None
+        if lifespan:
+            self._lifespan_events = asyncio.Queue()
+            self._lifespan_sent = []
+            self._lifespan = self.loop.create_task(self.app(
+                {'type': 'lifespan', 'asgi': {'version': '3.0'}},
+                self._lifespan_events.get, self._lifespan_send))
+            self._lifespan_event('lifespan.startup')
+
+    async def _lifespan_send(self, message):
+        self._lifespan_sent.append(message)
+
+    def _lifespan_event(self, event: str):
+        self._lifespan_events.put_nowait({'type': event})
+        while not self._lifespan.done() and not self._lifespan_sent:
+            self.loop.run_until_complete(asyncio.sleep(0))
+        message = self._lifespan_sent.pop() if self._lifespan_sent else {'type': event + '.failed'}
+        if message['type'] != event + '.complete':
+            raise RuntimeError(f"{event} failed: {message.get('message', '')}")
+
+    def close(self):
+        if self._lifespan is not None:
+            self._lifespan_event('lifespan.shutdown')
+            self.loop.run_until_complete(self._lifespan)
+        self.loop.close()
+
+    def request(self, method: str, url: str, body: bytes = b"",
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Return (status, headers, body) for one request."""
+        return self.loop.run_until_complete(self._request(method, url, body, headers or {}))
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None):
+        return self.request("GET", url, headers=headers)
+
+    async def _request(self, method, url, body, headers):
+        parts = urlsplit(url)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': parts.path,
+            'raw_path': parts.path.encode(),
+            'query_string': parts.query.encode(),
+            'root_path': '',
+            'headers': [(key.lower().encode('latin-1'), value.encode('latin-1'))
+                        for key, value in {'host': 'bench', **headers}.items()],
+            'client': ('127.0.0.1', 0),
+            'server': ('bench', 80),
+        }
+        sent = False
+        response = {'status': 0, 'headers': {}, 'body': []}
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                # Requests are complete; wait like a client that never disconnects
+                await asyncio.Event().wait()
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = {key.decode('latin-1'): value.decode('latin-1')
+                                       for key, value in message.get('headers', [])}
+            elif message['type'] == 'http.response.body':
+                response['body'].append(message.get('body', b''))
+
+        await self.app(scope, receive, send)
+        return response['status'], response['headers'], b''.join(response['body'])
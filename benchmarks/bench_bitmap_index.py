@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare SQLite and in-memory bitmap index paths for filter-only searches.
+
+Usage: python -m benchmarks.bench_bitmap_index [--scale N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import build_database, measure, print_results
+from workflow_db import WorkflowDatabase
+
+FILTER_MIX = [
+    {'trigger_filter': 'all', 'complexity_filter': 'all', 'active_only': False},
+    {'trigger_filter': 'Webhook', 'complexity_filter': 'all', 'active_only': False},
+    {'trigger_filter': 'all', 'complexity_filter': 'high', 'active_only': False},
+    {'trigger_filter': 'Scheduled', 'complexity_filter': 'medium', 'active_only': True},
+    {'trigger_filter': 'Manual', 'complexity_filter': 'low', 'active_only': False},
+]
+
+PAGES = [(20, 0), (20, 200), (100, 1000)]
+CATEGORIES = ['messaging', 'ai_ml', 'database']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bitmap index vs SQLite filter benchmark')
+    parser.add_argument('--scale', type=int, default=1, help='Replicate the corpus N times')
+    parser.add_argument('--repeat', type=int, default=50, help='Timed iterations per case')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        build_database(db_path, args.scale)
+        sql_db = WorkflowDatabase(db_path, use_bitmap_index=False)
+        bitmap_db = WorkflowDatabase(db_path, use_bitmap_index=True)
+        bitmap_db.get_bitmap_index()
+
+        results = {'rows': sql_db.get_stats()['total'], 'filters': [], 'categories': []}
+        for filters in FILTER_MIX:
+            for limit, offset in PAGES:
+                sql_rows, sql_total = sql_db.search_workflows(limit=limit, offset=offset, **filters)
+                bm_rows, bm_total = bitmap_db.search_workflows(limit=limit, offset=offset, **filters)
+                assert sql_total == bm_total, (filters, sql_total, bm_total)
+                assert [r['id'] for r in sql_rows] == [r['id'] for r in bm_rows], filters
+                results['filters'].append({
+                    **filters, 'limit': limit, 'offset': offset, 'total': sql_total,
+                    'sqlite': measure(lambda: sql_db.search_workflows(limit=limit, offset=offset, **filters), args.repeat),
+                    'bitmap': measure(lambda: bitmap_db.search_workflows(limit=limit, offset=offset, **filters), args.repeat),
+                })
+
+        for category in CATEGORIES:
+            sql_total = sql_db.search_by_category(category)[1]
+            assert sql_total == bitmap_db.search_by_category(category)[1], category
+            results['categories'].append({
+                'category': category, 'total': sql_total,
+                'sqlite': measure(lambda: sql_db.search_by_category(category, limit=20), args.repeat),
+                'bitmap': measure(lambda: bitmap_db.search_by_category(category, limit=20), args.repeat),
+            })
+
+        print_results(f"Bitmap index benchmark ({results['rows']} rows)", results)
+
+
+if __name__ == '__main__':
+    main()
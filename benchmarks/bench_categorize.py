@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Compare per-file categorization (find_matching_category + categorize_by_filename)
+with the batched CategoryEngine on synthetic filenames, checking identical output.
+
+Usage: python -m benchmarks.bench_categorize [--count 100000] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from benchmarks.common import print_results
+from create_categories import (CategoryEngine, categorize_by_filename, extract_tokens_from_filename,
+                               find_matching_category, load_def_categories)
+
+
+def synthetic_filenames(count, seed):
+    """Recombine tokens of real filenames into new ones, plus some unseen words."""
+    rng = random.Random(seed)
+    tokens = set()
+    for path in Path("workflows").rglob("*.json"):
+        tokens.update(part for part in path.stem.split('_')[1:] if part)
+    tokens = sorted(tokens)
+    noise = ['Acme', 'Foo', 'Xyz', 'Data-Sync', 'V2', 'Beta!']
+    filenames = []
+    for i in range(count):
+        parts = rng.sample(tokens, rng.randint(1, 4))
+        if rng.random() < 0.2:
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(noise))
+        filenames.append(f"{i:06d}_{'_'.join(parts)}.json")
+    return filenames
+
+
+def reference(filenames, integration_to_category):
+    results = []
+    for filename in filenames:
+        category = find_matching_category(extract_tokens_from_filename(filename), integration_to_category)
+        results.append(category or categorize_by_filename(filename))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Categorization engine benchmark')
+    parser.add_argument('--count', type=int, default=100000, help='Number of synthetic filenames')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    integration_to_category = load_def_categories()
+    filenames = synthetic_filenames(args.count, args.seed)
+
+    start = time.perf_counter()
+    expected = reference(filenames, integration_to_category)
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = CategoryEngine(integration_to_category)
+    build_seconds = time.perf_counter() - start
+    actual = engine.categorize_all(filenames)
+    engine_seconds = time.perf_counter() - start
+
+    mismatches = [(f, e, a) for f, e, a in zip(filenames, expected, actual) if e != a]
+    print_results(f"Categorization benchmark ({args.count} filenames)", {
+        'reference_s': round(reference_seconds, 3),
+        'engine_s': round(engine_seconds, 3),
+        'engine_build_s': round(build_seconds, 3),
+        'speedup': round(reference_seconds / engine_seconds, 1),
+        'identical': not mismatches,
+        'mismatches': mismatches[:10],
+    })
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
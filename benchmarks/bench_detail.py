@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Detail endpoint cost for the largest workflows: the spliced response
+(file bytes embedded verbatim) against the previous parse and re-encode of
+``raw_json``, plus the metadata-only and ``/raw`` resources.
+
+Usage: python -m benchmarks.bench_detail [--count 10] [--repeat 30]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.asgi_client import ASGIClient
+from benchmarks.common import build_database, measure, print_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detail endpoint benchmark')
+    parser.add_argument('--count', type=int, default=10, help='Number of largest workflows to request')
+    parser.add_argument('--repeat', type=int, default=30, help='Timed iterations per case')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        os.environ['WORKFLOW_DB_PATH'] = db_path
+        db = build_database(db_path)
+        import api_server
+        api_server.db = db
+        client = ASGIClient(api_server.app)
+
+        files = sorted(db.get_workflow_files(), key=lambda path: path.stat().st_size, reverse=True)[:args.count]
+        results = {'workflows': [{'filename': path.name, 'bytes': path.stat().st_size} for path in files]}
+
+        def parsed_detail(path):
+            # What the endpoint did before: parse the file and serialize it again
+            metadata = db.get_by_filename(path.name)
+            with open(path, 'r', encoding='utf-8') as f:
+                raw_json = json.load(f)
+            return json.dumps({"metadata": metadata, "raw_json": raw_json},
+                              ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        def each(fn):
+            return lambda: [fn(path) for path in files]
+
+        results['parse_and_reencode'] = measure(each(parsed_detail), args.repeat)
+        results['detail_spliced'] = measure(each(lambda path: client.get(f'/api/workflows/{path.name}')), args.repeat)
+        results['metadata_only'] = measure(
+            each(lambda path: client.get(f'/api/workflows/{path.name}?include_raw=false')), args.repeat)
+        results['raw_file'] = measure(each(lambda path: client.get(f'/api/workflows/{path.name}/raw')), args.repeat)
+        client.close()
+
+    print_results(f"Detail endpoint benchmark ({args.count} largest workflows per iteration)", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Import throughput against a stub ``npx`` that simulates n8n's Node startup
+cost, comparing one process per file with batched and concurrent imports.
+Every configuration must attribute failures to the same files, and a
+rerun must skip everything in the import ledger except the failures.
+
+Usage: python -m benchmarks.bench_import [--count 200] [--startup-ms 300]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_results
+from import_workflows import WorkflowImporter
+from workflow_db import WorkflowDatabase
+
+# Fails any import whose input contains a file named *_fail_*.json
+STUB_NPX = '''#!{python}
+import os, sys, time
+time.sleep({startup})
+args = sys.argv[1:]
+if '--version' in args:
+    print('1.0.0-stub')
+    sys.exit(0)
+if 'list:workflow' in args:
+    sys.exit(0)
+target = next(a.split('=', 1)[1] for a in args if a.startswith('--input='))
+names = os.listdir(target) if os.path.isdir(target) else [os.path.basename(target)]
+bad = [n for n in names if '_fail_' in n]
+if bad:
+    print('Could not import workflow: ' + bad[0], file=sys.stderr)
+    sys.exit(1)
+print('Successfully imported %d workflows.' % len(names))
+'''
+
+CONFIGURATIONS = [
+    {'batch_size': 1, 'workers': 1},
+    {'batch_size': 25, 'workers': 1},
+    {'batch_size': 25, 'workers': 4},
+]
+
+
+def make_corpus(source_dir: Path, target: Path, count: int, db: WorkflowDatabase):
+    """Copy real workflows (keeping their category folders), marking every 50th
+    as failing and every 70th as invalid."""
+    sources = sorted(source_dir.rglob("*.json"))[:count]
+    expected_failures = set()
+    for i, source in enumerate(sources):
+        name = source.name
+        if i % 50 == 49:
+            name = f"{source.stem}_fail_.json"
+            expected_failures.add(name)
+        destination = target / source.parent.name / name
+        destination.parent.mkdir(exist_ok=True)
+        shutil.copyfile(source, destination)
+        if i % 70 == 69:
+            destination.write_text("{not json", encoding='utf-8')
+            expected_failures.add(name)
+    # Some corpus files are not importable workflows either
+    validator = WorkflowImporter(str(target), db=db)
+    expected_failures.update(path.name for path in target.rglob("*.json")
+                             if not validator.validate_workflow(path))
+    return expected_failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Workflow import throughput benchmark')
+    parser.add_argument('--count', type=int, default=200, help='Workflows to import')
+    parser.add_argument('--startup-ms', type=float, default=300, help='Simulated Node startup per process')
+    args = parser.parse_args()
+
+    root = Path.cwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        corpus = tmp / "workflows"
+        corpus.mkdir()
+
+        npx = tmp / "npx"
+        npx.write_text(STUB_NPX.format(python=sys.executable, startup=args.startup_ms / 1000))
+        npx.chmod(npx.stat().st_mode | stat.S_IEXEC)
+
+        # The importer writes context/search_categories.json relative to the cwd
+        (tmp / "context").mkdir()
+        os.chdir(tmp)
+        db = WorkflowDatabase(str(tmp / "ledger.db"))
+        expected_failures = make_corpus(root / "workflows", corpus, args.count, db)
+        results = {'workflows': args.count, 'startup_ms': args.startup_ms, 'runs': []}
+        try:
+            for config in CONFIGURATIONS:
+                importer = WorkflowImporter(str(corpus), npx=str(npx), db=db, force=True, **config)
+                start = time.perf_counter()
+                summary = importer.import_all()
+                elapsed = time.perf_counter() - start
+                assert summary['failed'] == len(summary['errors']) == len(expected_failures), config
+                assert all(any(name in error for error in summary['errors'])
+                           for name in expected_failures), config
+                results['runs'].append({**config, 'seconds': round(elapsed, 3),
+                                        'workflows_per_s': round(args.count / elapsed, 1),
+                                        'imported': summary['imported'], 'failed': summary['failed']})
+
+            # A rerun skips everything in the import ledger and retries the failures
+            resumed = WorkflowImporter(str(corpus), npx=str(npx), db=db,
+                                       **CONFIGURATIONS[-1]).import_all()
+            assert resumed['skipped'] == args.count - len(expected_failures), resumed
+            assert resumed['failed'] == len(expected_failures), resumed
+            categories = json.loads((tmp / "context" / "search_categories.json").read_text(encoding='utf-8'))
+            assert len(categories) == args.count - len(expected_failures)
+            results['resume'] = {'skipped': resumed['skipped'], 'retried': resumed['failed']}
+        finally:
+            os.chdir(root)
+        print_results("Import benchmark", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Cold-start cost of the project's modules and CLI entry points, measured in
+fresh interpreters with ``-X importtime`` (bytecode is written by a warm-up
+run first, as in a deployed checkout).
+
+Usage: python -m benchmarks.bench_importtime [--repeat 5] [--db PATH]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import build_database, print_results
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+MODULES = ['workflow_db', 'api_server', 'import_workflows', 'workflow_validator']
+
+COMMANDS = {
+    'workflow_db --search': ['workflow_db.py', '--search', 'telegram'],
+    'workflow_db --stats': ['workflow_db.py', '--stats'],
+    'run.py --help': ['run.py', '--help'],
+}
+
+
+def run(args, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{args} failed: {result.stderr[-500:]}")
+    return elapsed, result.stderr
+
+
+def parse_importtime(stderr):
+    """Top-level module cumulative times and the slowest nested imports (microseconds)."""
+    top_level, imports = {}, []
+    for self_us, cumulative_us, indent, name in IMPORT_LINE.findall(stderr):
+        imports.append((int(cumulative_us), int(self_us), name))
+        if len(indent) == 1:
+            top_level[name] = int(cumulative_us)
+    return top_level, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time / cold start benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per target')
+    parser.add_argument('--db', default=None, help='Indexed database to use (default: build one)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, 'bench.db')
+        if not args.db:
+            build_database(db_path)
+        env = {key: value for key, value in os.environ.items() if key != 'PYTHONDONTWRITEBYTECODE'}
+        env['WORKFLOW_DB_PATH'] = db_path
+
+        results = {'modules': {}, 'commands': {}}
+        for module in MODULES:
+            run(['-c', f'import {module}'], env)  # warm-up writes bytecode
+            samples, slowest = [], []
+            for _ in range(args.repeat):
+                _, stderr = run(['-X', 'importtime', '-c', f'import {module}'], env)
+                top_level, imports = parse_importtime(stderr)
+                samples.append(top_level.get(module, 0) / 1000)
+                slowest = imports
+            results['modules'][module] = {
+                'median_ms': round(statistics.median(samples), 2),
+                'slowest_imports': [
+                    {'module': name, 'cumulative_ms': round(cumulative / 1000, 2), 'self_ms': round(own / 1000, 2)}
+                    for cumulative, own, name in sorted(slowest, reverse=True)[1:8]
+                ],
+            }
+
+        for label, command in COMMANDS.items():
+            run(command, env)
+            samples = [run(command, env)[0] for _ in range(args.repeat)]
+            results['commands'][label] = {'median_ms': round(statistics.median(samples), 2),
+                                          'max_ms': round(max(samples), 2)}
+
+        print_results("Cold start benchmark", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Cold-cache detail latency: workflow files in their category folders against
+corpus packs (see corpus_pack.py).
+
+Every round evicts the workflow files and the packs from the OS page cache
+(``posix_fadvise(DONTNEED)``, which drops clean pages without root), starts
+from a fresh WorkflowDatabase so no path listing or pack mapping is cached,
+and requests the detail of a sample of workflows through the ASGI app.
+``first_request_ms`` includes the directory scan or the pack open, ``cold``
+covers the rest of the sample and ``warm`` repeats it with every cache hot.
+Directory entries and inodes stay cached, so on a local disk this
+understates the directory layout's cost on network and overlay filesystems.
+
+Usage: python -m benchmarks.bench_pack [--sample 200] [--rounds 5] [--compression none,zlib,zlib-dict]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.asgi_client import ASGIClient
+from benchmarks.common import build_database, measure, print_results
+from corpus_pack import COMPRESSIONS, build_pack, zstandard
+from workflow_db import WorkflowDatabase
+
+
+def evict(paths):
+    """Drop the files' pages from the page cache; False where unsupported."""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'mean_ms': round(statistics.mean(samples), 4),
+        'p50_ms': round(samples[len(samples) // 2], 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'max_ms': round(samples[-1], 4),
+    }
+
+
+def main():
+    available = [c for c in COMPRESSIONS if zstandard is not None or not c.startswith('zstd')]
+    parser = argparse.ArgumentParser(description='Corpus pack cold-cache benchmark')
+    parser.add_argument('--sample', type=int, default=200, help='Workflows requested per round')
+    parser.add_argument('--rounds', type=int, default=5, help='Cold rounds per layout')
+    parser.add_argument('--compression', default=','.join(available),
+                        help=f'Comma-separated pack compressions (default: {",".join(available)})')
+    parser.add_argument('--seed', type=int, default=0, help='Sampling seed')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        os.environ['WORKFLOW_DB_PATH'] = db_path
+        os.environ.pop('WORKFLOW_CORPUS_PACK', None)
+        db = build_database(db_path)
+        import api_server
+
+        files = [str(path) for path in db.get_workflow_files()]
+        names = [os.path.basename(path) for path in files]
+        sample = random.Random(args.seed).sample(names, min(args.sample, len(names)))
+        urls = [f'/api/workflows/{name}' for name in sample]
+
+        layouts = {'directory': ''}
+        results = {'workflows': len(names), 'sample': len(sample), 'packs': {}}
+        for compression in args.compression.split(','):
+            pack_path = os.path.join(tmp, f'{compression}.pack')
+            stats = build_pack(db.workflows_dir, pack_path, compression)
+            results['packs'][compression] = {'bytes': stats['pack_bytes'], 'build_s': stats['seconds']}
+            layouts[f'pack_{compression}'] = pack_path
+        results['original_bytes'] = stats['original_bytes']
+        evictable = files + [path for path in layouts.values() if path]
+
+        for layout, pack_path in layouts.items():
+            first, cold = [], []
+            for _ in range(args.rounds):
+                results['page_cache_evicted'] = evict(evictable)
+                api_server.db = WorkflowDatabase(db_path, use_bitmap_index=False, pack_path=pack_path)
+                client = ASGIClient(api_server.app)
+                for position, url in enumerate(urls):
+                    start = time.perf_counter()
+                    status, _, _ = client.get(url)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    assert status == 200, (layout, url, status)
+                    (first if position == 0 else cold).append(elapsed)
+                client.close()
+            position = iter(range(len(urls) * (args.rounds + 10) * 4))
+            client = ASGIClient(api_server.app)
+            results[layout] = {
+                'first_request_ms': round(statistics.median(first), 4),
+                'cold': summarize(cold),
+                'warm': measure(lambda: client.get(urls[next(position) % len(urls)]), len(urls) * 2),
+            }
+            client.close()
+
+    print_results(f"Corpus pack benchmark ({len(sample)} detail requests per cold round)", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Offline relevance benchmark for search ranking.
+
+Each query in data/relevance_queries.json lists substrings; a result is
+relevant when its filename or name contains one of them, i.e. the workflow is
+named after the service rather than merely mentioning it. Reports P@10, MRR
+and nDCG@10 for FTS5's default ranking and the configured weighted ranking.
+
+Usage: python -m benchmarks.bench_relevance [--weights name=5,description=0.5] [--boost 1.0]
+"""
+
+import argparse
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import build_database, print_results
+from workflow_db import WorkflowDatabase, FTS_COLUMNS, parse_bm25_weights
+
+QUERIES_FILE = Path(__file__).parent / "data" / "relevance_queries.json"
+CUTOFF = 10
+
+
+def is_relevant(workflow, needles):
+    haystack = f"{workflow['filename']} {workflow['name']}".lower()
+    return any(needle in haystack for needle in needles)
+
+
+def evaluate(db, queries):
+    precision, reciprocal_rank, ndcg = 0.0, 0.0, 0.0
+    for item in queries:
+        results, _ = db.search_workflows(item['query'], limit=CUTOFF)
+        flags = [is_relevant(workflow, item['relevant']) for workflow in results]
+
+        precision += sum(flags) / CUTOFF
+        first = next((i for i, flag in enumerate(flags) if flag), None)
+        reciprocal_rank += 1 / (first + 1) if first is not None else 0
+        dcg = sum(1 / math.log2(i + 2) for i, flag in enumerate(flags) if flag)
+        ideal = sum(1 / math.log2(i + 2) for i in range(min(CUTOFF, max(sum(flags), 1))))
+        ndcg += dcg / ideal
+
+    count = len(queries)
+    return {
+        'p@10': round(precision / count, 4),
+        'mrr': round(reciprocal_rank / count, 4),
+        'ndcg@10': round(ndcg / count, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search relevance benchmark')
+    parser.add_argument('--weights', default='', help="bm25 column weights, e.g. 'name=5,description=0.5'")
+    parser.add_argument('--boost', type=float, default=None, help='Static boost weight')
+    args = parser.parse_args()
+
+    queries = json.loads(QUERIES_FILE.read_text(encoding='utf-8'))
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        build_database(db_path)
+
+        weights = parse_bm25_weights(args.weights)
+        configurations = {
+            'fts5_default': WorkflowDatabase(db_path, bm25_weights={c: 1.0 for c in FTS_COLUMNS},
+                                             static_boost_weight=0),
+            'weighted': WorkflowDatabase(db_path, bm25_weights=weights, static_boost_weight=0),
+            'weighted_boosted': WorkflowDatabase(db_path, bm25_weights=weights,
+                                                 static_boost_weight=args.boost),
+        }
+        results = {
+            'queries': len(queries),
+            'weights': weights,
+            'metrics': {name: evaluate(db, queries) for name, db in configurations.items()},
+        }
+        print_results("Relevance benchmark", results)
+
+
+if __name__ == '__main__':
+    main()
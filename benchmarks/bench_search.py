@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Search latency over a mixed query set: exact words, prefixes, substrings,
+typos (with correction suggestions) and inputs containing FTS5 syntax, alone
+and combined with the trigger and complexity filters.
+
+Usage: python -m benchmarks.bench_search [--scale N] [--repeat N] [--budget-ms 10]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.common import build_database, measure, print_results
+
+QUERY_MIX = [
+    'telegram',
+    'slack notification',
+    'telegr',           # prefix
+    'goog shee',        # prefixes
+    'egram',            # substring, trigram fallback
+    'telegarm',         # typo
+    'slak notificaton', # typos
+    '"unbalanced',      # FTS syntax characters
+    'AND OR (',
+    'name:openai',
+    'filename:"0001_Telegram_Schedule_Automation_Scheduled.json"',
+]
+
+# (query, trigger filter, complexity filter) as sent by the filter dropdowns
+FILTERED_MIX = [
+    ('telegram', 'Manual', 'low'),
+    ('egram', 'Webhook', 'all'),
+    ('slak notificaton', 'all', 'high'),
+]
+
+
+def search(db, query, trigger_filter='all', complexity_filter='all'):
+    results, total = db.search_workflows(query, trigger_filter, complexity_filter, limit=20)
+    if total == 0:
+        db.suggest_query(query)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search latency benchmark')
+    parser.add_argument('--scale', type=int, default=1, help='Replicate the corpus N times')
+    parser.add_argument('--repeat', type=int, default=50, help='Timed iterations per query')
+    parser.add_argument('--budget-ms', type=float, default=10.0, help='p95 latency budget')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = build_database(os.path.join(tmp, 'bench.db'), args.scale)
+        results = {'rows': db.get_stats()['total'], 'budget_ms': args.budget_ms, 'queries': []}
+        over_budget = []
+        for query in QUERY_MIX:
+            timing = measure(lambda: search(db, query), args.repeat)
+            results['queries'].append({'query': query, 'total': search(db, query),
+                                       'suggestion': db.suggest_query(query), **timing})
+            if timing['p95_ms'] > args.budget_ms:
+                over_budget.append(query)
+        for query, trigger_filter, complexity_filter in FILTERED_MIX:
+            label = f"{query} [trigger={trigger_filter}, complexity={complexity_filter}]"
+            timing = measure(lambda: search(db, query, trigger_filter, complexity_filter), args.repeat)
+            results['queries'].append({'query': label, 'total': search(db, query, trigger_filter, complexity_filter),
+                                       'suggestion': None, **timing})
+            if timing['p95_ms'] > args.budget_ms:
+                over_budget.append(label)
+
+        results['over_budget'] = over_budget
+        print_results(f"Search benchmark ({results['rows']} rows)", results)
+        sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-request for the API server: from process spawn until
+/api/stats answers. Compares an index whose manifest matches the workflows
+directory, a stale index (served immediately, reindexed in the background)
+and the blocking full reindex that startup used to do.
+
+Usage: python -m benchmarks.bench_startup [--repeat 3]
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.common import print_results
+from workflow_db import WorkflowDatabase
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(db_path: str, timeout: float = 120.0) -> float:
+    """Spawn uvicorn and poll until the first successful response."""
+    port = free_port()
+    env = {**os.environ, 'WORKFLOW_DB_PATH': db_path}
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api_server:app', '--port', str(port), '--log-level', 'warning'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/stats', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("server did not answer")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def mark_stale(db_path: str):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE index_meta SET value = 'stale' WHERE key = 'corpus_fingerprint'")
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API startup benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Server starts per scenario')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, 'base.db')
+        WorkflowDatabase(base, use_bitmap_index=False).index_all_workflows(force_reindex=True)
+
+        def scenario(prepare):
+            samples = []
+            for i in range(args.repeat):
+                db_path = os.path.join(tmp, f'run{i}.db')
+                shutil.copyfile(base, db_path)
+                start = time.perf_counter()
+                prepare(db_path)
+                prepared = time.perf_counter() - start
+                samples.append(prepared + time_to_first_request(db_path))
+            return {'mean_s': round(statistics.mean(samples), 3), 'max_s': round(max(samples), 3)}
+
+        results = {
+            'current_manifest': scenario(lambda path: None),
+            'stale_background_reindex': scenario(mark_stale),
+            'blocking_full_reindex': scenario(
+                lambda path: WorkflowDatabase(path, use_bitmap_index=False).index_all_workflows(force_reindex=True)),
+        }
+        print_results("Startup benchmark (time to first request)", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Request throughput of ``uvicorn --workers N`` with read-only query workers
+(WORKFLOW_DB_READONLY=1) for N = 1, 2, 4, 8, driven by concurrent
+keep-alive client processes over a fixed request mix.
+
+Usage: python -m benchmarks.bench_workers [--workers 1,2,4,8] [--clients 16] [--seconds 10]
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.bench_startup import free_port
+from benchmarks.common import build_database, print_results
+
+REQUEST_MIX = [
+    '/api/workflows?q=telegram&per_page=20',
+    '/api/workflows?q=slack%20notification&per_page=20',
+    '/api/workflows?trigger=Webhook&complexity=high&per_page=20',
+    '/api/workflows?page=5&per_page=20',
+    '/api/stats',
+    '/api/workflows/0001_Telegram_Schedule_Automation_Scheduled.json',
+]
+
+
+def client(port, seconds, queue):
+    """Issue requests round-robin on one keep-alive connection until time is up."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies, errors, i = [], 0, 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        path = REQUEST_MIX[i % len(REQUEST_MIX)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    queue.put((latencies, errors))
+
+
+def wait_until_ready(port, timeout=120.0):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/stats', timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("server did not start")
+
+
+def run_workers(db_path, workers, clients, seconds):
+    port = free_port()
+    env = {**os.environ, 'WORKFLOW_DB_PATH': db_path, 'WORKFLOW_DB_READONLY': '1'}
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api_server:app', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning', '--no-access-log'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port)
+        # Let every worker finish starting before measuring
+        time.sleep(1 + workers * 0.5)
+        queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=client, args=(port, seconds, queue)) for _ in range(clients)]
+        for process in processes:
+            process.start()
+        outcomes = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for samples, _ in outcomes for latency in samples)
+    return {
+        'workers': workers,
+        'requests': len(latencies),
+        'errors': sum(errors for _, errors in outcomes),
+        'requests_per_s': round(len(latencies) / seconds, 1),
+        'p50_ms': round(latencies[len(latencies) // 2], 2) if latencies else None,
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)], 2) if latencies else None,
+        'mean_ms': round(statistics.mean(latencies), 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-worker throughput benchmark')
+    parser.add_argument('--workers', default='1,2,4,8', help='Comma-separated worker counts')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent client processes')
+    parser.add_argument('--seconds', type=float, default=10, help='Measurement time per worker count')
+    parser.add_argument('--scale', type=int, default=1, help='Replicate the corpus N times')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        build_database(db_path, args.scale)
+        results = {'cpus': os.cpu_count(), 'clients': args.clients, 'seconds': args.seconds, 'runs': []}
+        for workers in (int(value) for value in args.workers.split(',')):
+            results['runs'].append(run_workers(db_path, workers, args.clients, args.seconds))
+        print_results("Multi-worker throughput benchmark", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the benchmark scripts.
+Run benchmarks from the repository root, e.g. ``python -m benchmarks.bench_bitmap_index``.
+"""
+
+import json
+import sqlite3
+import statistics
+import time
+from typing import Callable, Dict
+
+from workflow_db import WorkflowDatabase
+
+
+def measure(fn: Callable, repeat: int = 50, warmup: int = 3) -> Dict[str, float]:
+    """Time ``fn`` and return latency statistics in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': round(statistics.mean(samples), 4),
+        'p50_ms': round(samples[len(samples) // 2], 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'max_ms': round(samples[-1], 4),
+    }
+
+
+def build_database(db_path: str, scale: int = 1) -> WorkflowDatabase:
+    """Index the real corpus into ``db_path`` and replicate rows ``scale`` times.
+
+    Replicas are plain row copies with a suffixed filename, which is enough to
+    exercise filter/search paths at fork-sized row counts without writing
+    thousands of files.
+    """
+    db = WorkflowDatabase(db_path, use_bitmap_index=False)
+    db.index_all_workflows(force_reindex=True)
+
+    if scale > 1:
+        conn = sqlite3.connect(db_path)
+        columns = ("name, workflow_id, active, description, trigger_type, complexity, node_count, "
+                   "integrations, tags, created_at, updated_at, file_hash, file_size, analyzed_at")
+        for copy in range(1, scale):
+            conn.execute(f"""
+                INSERT INTO workflows (filename, {columns})
+                SELECT filename || '.{copy}', {columns}
+                FROM workflows WHERE filename NOT LIKE '%.json.%'
+            """)
+        db.copy_to_summary(conn)
+        db.bump_index_generation(conn)
+        conn.commit()
+        conn.close()
+    return db
+
+
+def print_results(title: str, results: Dict):
+    """Print benchmark results as a titled JSON document."""
+    print(f"\n{title}")
+    print("=" * len(title))
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark suite result files and flag regressions.
+
+Every timing (keys ending in ``_ms`` or ``_s``) present in both files is
+compared; the exit status is 1 when any got slower than ``--threshold``.
+
+Usage: python -m benchmarks.compare baseline.json candidate.json [--threshold 1.2] [--metric p50_ms]
+"""
+
+import argparse
+import json
+import sys
+
+
+def timings(results, prefix=""):
+    """Flatten nested results into {path: seconds-or-ms} for timing keys."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(timings(value, path))
+        elif isinstance(value, (int, float)) and (key.endswith('_ms') or key.endswith('_s')):
+            flat[path] = value
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare benchmark suite results')
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Slowdown ratio counted as a regression')
+    parser.add_argument('--metric', default='p50_ms',
+                        help='Latency statistic to compare (index timings are always compared)')
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = timings(json.load(f)['sizes'])
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = timings(json.load(f)['sizes'])
+
+    regressions = 0
+    for path in sorted(baseline.keys() & candidate.keys()):
+        leaf = path.rsplit('/', 1)[-1]
+        if leaf.endswith('_ms') and leaf != args.metric:
+            continue
+        before, after = baseline[path], candidate[path]
+        ratio = after / before if before else float('inf') if after else 1.0
+        marker = ""
+        if ratio > args.threshold:
+            marker = "  ❌ slower"
+            regressions += 1
+        elif ratio < 1 / args.threshold:
+            marker = "  ✅ faster"
+        print(f"{path:<80} {before:>10.3f} -> {after:>10.3f}  x{ratio:.2f}{marker}")
+
+    print(f"\n{regressions} regressions over x{args.threshold}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
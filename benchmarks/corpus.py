@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Synthetic workflow corpora built by mutating the real templates.
+
+Every generated file is a valid workflow with its own name, node names,
+positions and parameter text, so indexing, hashing, FTS and MinHash all do
+real work. Generation is deterministic for a given size and seed.
+
+Usage: python -m benchmarks.corpus --size 20000 --output /tmp/corpus-20k
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+WORDS = ['alpha', 'bravo', 'sync', 'report', 'daily', 'invoice', 'lead', 'ticket', 'digest',
+         'backup', 'alert', 'review', 'summary', 'customer', 'order', 'pipeline']
+
+
+def load_templates(source_dir: str = "workflows") -> List[Dict]:
+    """Real workflows that have nodes, with their category folder and filename."""
+    templates = []
+    for path in sorted(Path(source_dir).rglob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict) and isinstance(data.get('nodes'), list) and data['nodes']:
+            templates.append({'folder': path.parent.name, 'stem': path.stem, 'data': data})
+    return templates
+
+
+def mutate(data: Dict, index: int, rng: random.Random) -> Dict:
+    """Copy a workflow with renamed nodes (connections updated), a new name,
+    shifted positions and extra words in string parameters."""
+    suffix = f" {index}"
+    renamed = {}
+    nodes = []
+    for node in data.get('nodes', []):
+        if not isinstance(node, dict):
+            continue
+        node = dict(node)
+        if node.get('name'):
+            renamed[node['name']] = node['name'] + suffix
+            node['name'] += suffix
+        if isinstance(node.get('position'), list) and len(node['position']) == 2:
+            node['position'] = [node['position'][0] + rng.randint(-40, 40),
+                                node['position'][1] + rng.randint(-40, 40)]
+        if isinstance(node.get('parameters'), dict):
+            node['parameters'] = {
+                key: f"{value} {rng.choice(WORDS)}" if isinstance(value, str) else value
+                for key, value in node['parameters'].items()
+            }
+        node.pop('id', None)
+        nodes.append(node)
+
+    connections = {}
+    for source, outputs in (data.get('connections') or {}).items():
+        if not isinstance(outputs, dict):
+            continue
+        connections[renamed.get(source, source)] = {
+            kind: [[{**target, 'node': renamed.get(target.get('node'), target.get('node'))}
+                    for target in branch if isinstance(target, dict)]
+                   for branch in branches if isinstance(branch, list)]
+            for kind, branches in outputs.items() if isinstance(branches, list)
+        }
+
+    return {
+        **data,
+        'id': f"synthetic-{index}",
+        'name': f"{data.get('name') or 'Workflow'} {rng.choice(WORDS)} {index}",
+        'active': rng.random() < 0.1,
+        'nodes': nodes,
+        'connections': connections,
+    }
+
+
+def generate_corpus(output_dir: str, size: int, seed: int = 0, source_dir: str = "workflows") -> Path:
+    """Write ``size`` mutated workflows under ``output_dir`` in category folders.
+
+    An existing directory with a matching marker file is reused as is.
+    """
+    output = Path(output_dir)
+    marker = output / ".corpus.json"
+    spec = {'size': size, 'seed': seed}
+    if marker.exists() and json.loads(marker.read_text()) == spec:
+        return output
+
+    templates = load_templates(source_dir)
+    rng = random.Random(seed)
+    output.mkdir(parents=True, exist_ok=True)
+    for index in range(size):
+        template = templates[index % len(templates)]
+        folder = output / template['folder']
+        folder.mkdir(exist_ok=True)
+        # Keep the NNNN_ prefix convention so filename parsing stays realistic
+        stem = template['stem'].split('_', 1)[-1]
+        path = folder / f"{index:06d}_{stem}.json"
+        path.write_text(json.dumps(mutate(template['data'], index, rng), ensure_ascii=False), encoding='utf-8')
+    marker.write_text(json.dumps(spec))
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic workflow corpus')
+    parser.add_argument('--size', type=int, default=2000, help='Number of workflows')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--output', required=True, help='Output directory')
+    args = parser.parse_args()
+    path = generate_corpus(args.output, args.size, args.seed)
+    print(f"Generated {args.size} workflows in {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite for the indexer, the query layer and the API.
+
+For each corpus size a synthetic corpus is generated from the real
+templates (see benchmarks/corpus.py) and the suite times:
+
+- cold (fresh database) and warm (nothing changed) ``index_all_workflows``
+- ``search_workflows`` over a fixed query mix
+- ``search_by_category`` and ``get_stats``
+- the detail, download and diagram endpoints through an in-process ASGI client,
+  and one batch request for the same workflows
+
+Results are written as JSON so runs can be compared between commits with
+``python -m benchmarks.compare old.json new.json``.
+
+Usage: python -m benchmarks.suite [--sizes 2000,20000,200000] [--repeat 20] [--output results.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.asgi_client import ASGIClient
+from benchmarks.bench_bitmap_index import CATEGORIES
+from benchmarks.bench_search import QUERY_MIX
+from benchmarks.common import measure, print_results
+from benchmarks.corpus import generate_corpus
+from workflow_db import WorkflowDatabase
+
+ENDPOINTS = {
+    'detail': '/api/workflows/{filename}',
+    'download': '/api/workflows/{filename}/download',
+    'diagram': '/api/workflows/{filename}/diagram',
+}
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return round(time.perf_counter() - start, 3), result
+
+
+def bench_size(size, work_dir, corpus_root, repeat, seed):
+    corpus_dir = generate_corpus(os.path.join(corpus_root, f'corpus-{size}'), size, seed)
+    db_path = os.path.join(work_dir, f'bench-{size}.db')
+    db = WorkflowDatabase(db_path, use_bitmap_index=False)
+    db.workflows_dir = str(corpus_dir)
+
+    cold_s, cold = timed(lambda: db.index_all_workflows(force_reindex=True))
+    warm_s, warm = timed(lambda: db.index_all_workflows())
+    results = {
+        'workflows': db.get_stats()['total'],
+        'index': {'cold_s': cold_s, 'warm_s': warm_s,
+                  'cold_processed': cold['processed'], 'warm_skipped': warm['skipped']},
+        'search': {query: measure(lambda: db.search_workflows(query, limit=20), repeat)
+                   for query in QUERY_MIX},
+        'search_by_category': {category: measure(lambda: db.search_by_category(category, limit=20), repeat)
+                               for category in CATEGORIES},
+        'get_stats': measure(db.get_stats, repeat),
+    }
+
+    # Endpoints go through the real app, pointed at this corpus
+    import api_server
+    api_server.db = db
+    client = ASGIClient(api_server.app, lifespan=True)
+    filenames = [path.name for path in db.get_workflow_files()[:: max(1, size // 5)][:5]]
+    results['endpoints'] = {}
+    for name, template in ENDPOINTS.items():
+        urls = [template.format(filename=filename) for filename in filenames]
+        for url in urls:
+            status, _, _ = client.get(url)
+            assert status == 200, (url, status)
+        position = iter(range(sys.maxsize))
+        results['endpoints'][name] = measure(lambda: client.get(urls[next(position) % len(urls)]), repeat)
+    # All sampled workflows with raw JSON and diagram in one batch request
+    body = json.dumps({'filenames': filenames, 'include_raw': True, 'include_diagram': True}).encode()
+    headers = {'content-type': 'application/json'}
+    results['endpoints']['batch'] = measure(
+        lambda: client.request('POST', '/api/workflows/batch', body, headers), repeat)
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite')
+    parser.add_argument('--sizes', default='2000,20000', help='Comma-separated corpus sizes (e.g. 2000,20000,200000)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed iterations per case')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus generation seed')
+    parser.add_argument('--corpus-dir', default=None,
+                        help='Keep generated corpora here and reuse them across runs (default: temporary)')
+    parser.add_argument('--output', default=None, help='Write results JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # api_server builds its default database at import time; keep it out of the repo
+        os.environ['WORKFLOW_DB_PATH'] = os.path.join(tmp, 'api.db')
+        corpus_root = args.corpus_dir or tmp
+        results = {'environment': environment(), 'repeat': args.repeat, 'sizes': {}}
+        for size in (int(value) for value in args.sizes.split(',')):
+            results['sizes'][str(size)] = bench_size(size, tmp, corpus_root, args.repeat, args.seed)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print_results("Benchmark suite", results)
+
+
+if __name__ == '__main__':
+    main()
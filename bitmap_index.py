@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+In-memory bitmap index for workflow facet filters.
+Answers trigger/complexity/active/category/integration filters and counts by
+intersecting precomputed bitsets instead of running SQL plans.
+"""
+
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Iterable
+
+
+def popcount(bits: int) -> int:
+    """Count set bits (int.bit_count is only available on Python 3.10+)."""
+    return bin(bits).count('1')
+
+
+class BitmapIndex:
+    """Facet value -> bitset mapping built from the SQLite workflows table.
+
+    Bit ``i`` of every bitset refers to the i-th workflow in list order
+    (``analyzed_at DESC, id DESC``), so paging a filter result is a matter of
+    walking set bits from the lowest one upwards. Python ints are used as the
+    bitsets: they are arbitrary precision, stored packed (one bit per row) and
+    AND/OR/popcount run in C.
+    """
+
+    FACETS = ('trigger_type', 'complexity', 'active', 'integration', 'category')
+
+    def __init__(self, service_categories: Optional[Dict[str, List[str]]] = None):
+        self.service_categories = service_categories or {}
+        self.generation = None
+        self.order: List[int] = []
+        self.all_bits = 0
+        self.facets: Dict[str, Dict[Any, int]] = {facet: {} for facet in self.FACETS}
+
+    def build(self, conn: sqlite3.Connection, generation: Optional[int] = None):
+        """(Re)build all bitsets from the workflows table."""
+        facets = {facet: {} for facet in self.FACETS}
+        order = []
+
+        cursor = conn.execute("""
+            SELECT id, trigger_type, complexity, active, integrations
+            FROM workflows
+            ORDER BY analyzed_at DESC, id DESC
+        """)
+        for position, (rowid, trigger_type, complexity, active, integrations) in enumerate(cursor):
+            bit = 1 << position
+            order.append(rowid)
+            self._set(facets['trigger_type'], trigger_type, bit)
+            self._set(facets['complexity'], complexity, bit)
+            self._set(facets['active'], bool(active), bit)
+            for integration in json.loads(integrations or '[]'):
+                self._set(facets['integration'], integration, bit)
+
+        # Service categories are unions of their integrations' bitsets
+        for category, services in self.service_categories.items():
+            bits = 0
+            for service in services:
+                bits |= facets['integration'].get(service, 0)
+            facets['category'][category] = bits
+
+        self.facets = facets
+        self.order = order
+        self.all_bits = (1 << len(order)) - 1
+        self.generation = generation
+
+    @staticmethod
+    def _set(values: Dict[Any, int], value, bit: int):
+        values[value] = values.get(value, 0) | bit
+
+    def match(self, trigger_type: str = "all", complexity: str = "all",
+              active_only: bool = False, integration: Optional[str] = None,
+              category: Optional[str] = None) -> int:
+        """Return the bitset of workflows matching every given filter."""
+        bits = self.all_bits
+        if trigger_type != "all":
+            bits &= self.facets['trigger_type'].get(trigger_type, 0)
+        if complexity != "all":
+            bits &= self.facets['complexity'].get(complexity, 0)
+        if active_only:
+            bits &= self.facets['active'].get(True, 0)
+        if integration:
+            bits &= self.facets['integration'].get(integration, 0)
+        if category:
+            bits &= self.facets['category'].get(category, 0)
+        return bits
+
+    def count(self, bits: int) -> int:
+        """Number of workflows in a bitset."""
+        return popcount(bits)
+
+    def page(self, bits: int, limit: int, offset: int = 0) -> List[int]:
+        """Rowids of one page of a bitset, in list order."""
+        # Reversed binary string puts bit 0 first; str.find scans in C
+        flags = bin(bits)[:1:-1]
+        rowids = []
+        position = -1
+        skipped = 0
+        while len(rowids) < limit:
+            position = flags.find('1', position + 1)
+            if position < 0:
+                break
+            if skipped < offset:
+                skipped += 1
+                continue
+            rowids.append(self.order[position])
+        return rowids
+
+    def facet_counts(self, facet: str, bits: Optional[int] = None) -> Dict[Any, int]:
+        """Per-value counts of a facet, optionally restricted to a bitset."""
+        if bits is None:
+            bits = self.all_bits
+        return {value: popcount(value_bits & bits)
+                for value, value_bits in self.facets[facet].items()}
+
+    def values(self, facet: str) -> Iterable:
+        """Known values of a facet."""
+        return self.facets[facet].keys()
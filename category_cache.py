@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+In-memory cache of the generated category files.
+The files are parsed once and re-read only when their mtime changes; API
+responses are kept pre-serialized and gzip-compressed so serving them is a
+byte copy. ``accepts_gzip`` decides between the two encodings, and
+``AcceptEncodingMiddleware`` applies the same rule to GZipMiddleware.
+"""
+
+import gzip
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from metrics import metrics
+
+SEARCH_CATEGORIES_FILE = Path("context/search_categories.json")
+UNIQUE_CATEGORIES_FILE = Path("context/unique_categories.json")
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _serialize(payload) -> bytes:
+    # Same encoding as FastAPI's default JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values.
+
+    ``gzip;q=0`` refuses gzip; without a gzip entry ``*`` decides. Entries with
+    an unparseable q-value are ignored.
+    """
+    qualities = {}
+    for token in accept_encoding.lower().split(","):
+        coding, _, params = token.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = None
+        if coding.strip() and quality is not None:
+            qualities[coding.strip()] = quality
+    quality = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return quality > 0
+
+
+class AcceptEncodingMiddleware:
+    """ASGI middleware, added outside GZipMiddleware, that hides an
+    Accept-Encoding header refusing gzip (e.g. ``gzip;q=0``) from it: the
+    middleware only looks for the substring "gzip"."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            headers = scope.get('headers', [])
+            for name, value in headers:
+                if name == b'accept-encoding' and b'gzip' in value.lower() \
+                        and not accepts_gzip(value.decode('latin-1')):
+                    scope = dict(scope)
+                    scope['headers'] = [(key, b'identity' if key == b'accept-encoding' else item)
+                                        for key, item in headers]
+                    break
+        await self.app(scope, receive, send)
+
+
+class CachedBody:
+    """A serialized JSON response body with its gzip encoding."""
+
+    def __init__(self, payload):
+        self.raw = _serialize(payload)
+        self.gzipped = gzip.compress(self.raw, compresslevel=6, mtime=0)
+
+    def encoded(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Body and Content-Encoding for a request's Accept-Encoding header."""
+        if accepts_gzip(accept_encoding):
+            return self.gzipped, "gzip"
+        return self.raw, None
+
+
+class CategoryCache:
+    """Category mappings and category list, reloaded on file change."""
+
+    def __init__(self, search_path: Path = SEARCH_CATEGORIES_FILE,
+                 unique_path: Path = UNIQUE_CATEGORIES_FILE):
+        self.search_path = Path(search_path)
+        self.unique_path = Path(unique_path)
+        self._lock = threading.Lock()
+        self._key = None
+        self.mappings: Dict[str, str] = {}
+        self.categories: List[str] = []
+        self.mappings_body: Optional[CachedBody] = None
+        self.categories_body: Optional[CachedBody] = None
+
+    def refresh(self):
+        """Reload if either file was created, removed or modified."""
+        key = (_mtime(self.search_path), _mtime(self.unique_path))
+        # No bodies yet means no load has succeeded: retry even if the files did not change
+        loaded = self.mappings_body is not None and self.categories_body is not None
+        metrics.cache('categories', hit=loaded and key == self._key)
+        if loaded and key == self._key:
+            return
+        with self._lock:
+            if key != self._key or self.mappings_body is None or self.categories_body is None:
+                self._load()
+                self._key = key
+
+    def _load(self):
+        search_data = []
+        if self.search_path.exists():
+            with open(self.search_path, 'r', encoding='utf-8') as f:
+                search_data = json.load(f)
+
+        # Convert to a simple filename -> category mapping
+        mappings = {}
+        for item in search_data:
+            filename = item.get('filename')
+            if filename:
+                mappings[filename] = item.get('category') or 'Uncategorized'
+
+        if self.unique_path.exists():
+            with open(self.unique_path, 'r', encoding='utf-8') as f:
+                categories = json.load(f)
+        elif search_data:
+            # Fallback: extract categories from search_categories.json
+            categories = sorted({item.get('category') or 'Uncategorized' for item in search_data})
+        else:
+            # Last resort: return basic categories
+            categories = ["Uncategorized"]
+
+        self.mappings = mappings
+        self.categories = categories
+        self.mappings_body = CachedBody({"mappings": mappings})
+        self.categories_body = CachedBody({"categories": categories})
+        print(f"📂 Loaded {len(mappings)} category mappings, {len(categories)} categories")
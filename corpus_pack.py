@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Packed workflow corpus: every workflow JSON in one file, read through mmap.
+
+A pack replaces thousands of small files spread over category folders (one
+open and stat per cold read, slow on network volumes and overlay
+filesystems) with a single file holding:
+
+    MAGIC | entry bytes ... | dictionary | index JSON | footer
+
+The index maps each filename to its offset, stored length, original size
+and MD5 (the same ``file_hash`` the indexer records). Entries are stored as
+is or compressed one by one, so any entry can be read without touching the
+others. Compression ``zlib-dict`` and ``zstd-dict`` share a dictionary
+trained on the corpus, which matters for small, repetitive JSON documents.
+zstd needs the optional ``zstandard`` package; zlib is always available.
+
+Build a pack, then point the API and the indexer at it with
+``WORKFLOW_CORPUS_PACK=workflows.pack``:
+
+    python corpus_pack.py --build [--compression zlib-dict] [--output workflows.pack]
+    python corpus_pack.py --info
+    python corpus_pack.py --verify
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for zstd packs
+    zstandard = None
+
+DEFAULT_PACK_PATH = "workflows.pack"
+FORMAT_VERSION = 1
+MAGIC = b"N8NPACK1"
+# index offset, index length, magic
+FOOTER = struct.Struct("<QQ8s")
+
+COMPRESSIONS = ('none', 'zlib', 'zlib-dict', 'zstd', 'zstd-dict')
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 19
+# zlib only looks back 32 KiB, so a larger preset dictionary is wasted
+ZLIB_DICT_SIZE = 32 * 1024
+ZSTD_DICT_SIZE = 112 * 1024
+# Files sampled to train a dictionary
+DICT_SAMPLES = 2000
+
+
+class PackEntry(NamedTuple):
+    path: str         # path relative to the packed workflows directory
+    offset: int
+    length: int       # stored bytes
+    size: int         # original bytes
+    file_hash: str    # MD5 of the original bytes
+    compressed: bool
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("zstd compression needs the 'zstandard' package: pip install zstandard")
+
+
+def train_zlib_dictionary(samples: List[bytes], size: int = ZLIB_DICT_SIZE) -> bytes:
+    """Preset dictionary of the lines most workflows share (node types,
+    parameter keys, typeVersion, ...), weighted by how much they would save."""
+    counts = Counter()
+    for data in samples:
+        counts.update({line.strip() for line in data.splitlines() if len(line.strip()) >= 8})
+    candidates = sorted((line for line, count in counts.items() if count > 1),
+                        key=lambda line: counts[line] * len(line), reverse=True)
+    chosen, total = [], 0
+    for line in candidates:
+        if total + len(line) + 1 > size:
+            continue
+        chosen.append(line)
+        total += len(line) + 1
+    # Matches closer to the end of the dictionary are cheaper: most useful last
+    return b"\n".join(reversed(chosen))
+
+
+def make_compressor(compression: str, samples: List[bytes]):
+    """Return (compress function or None, dictionary bytes or None)."""
+    if compression == 'none':
+        return None, None
+    if compression == 'zlib':
+        return lambda data: zlib.compress(data, ZLIB_LEVEL), None
+    if compression == 'zlib-dict':
+        dictionary = train_zlib_dictionary(samples)
+
+        def compress(data):
+            compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary)
+            return compressor.compress(data) + compressor.flush()
+        return compress, dictionary
+    require_zstandard()
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress, None
+    if compression == 'zstd-dict':
+        dictionary = zstandard.train_dictionary(ZSTD_DICT_SIZE, samples)
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary).compress, dictionary.as_bytes()
+    raise ValueError(f"Unknown compression '{compression}' (choose from {', '.join(COMPRESSIONS)})")
+
+
+def corpus_digest(entries: Dict[str, PackEntry]) -> str:
+    """Digest of filenames and content hashes: the pack's corpus fingerprint."""
+    lines = "\n".join(f"{name}\0{entry.file_hash}" for name, entry in sorted(entries.items()))
+    return hashlib.blake2b(lines.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def collect_workflow_files(workflows_dir: str) -> Dict[str, Path]:
+    """Workflow files by filename; the first occurrence wins, as in the index."""
+    paths = {}
+    for path in sorted(Path(workflows_dir).rglob("*.json")):
+        paths.setdefault(path.name, path)
+    return paths
+
+
+def build_pack(workflows_dir: str = "workflows", output: str = DEFAULT_PACK_PATH,
+               compression: str = 'none') -> Dict[str, Any]:
+    """Pack every workflow under ``workflows_dir`` into ``output``.
+
+    The pack is written next to ``output`` and renamed into place, so
+    readers holding the previous pack keep a consistent mapping.
+    """
+    start = time.time()
+    paths = collect_workflow_files(workflows_dir)
+    if not paths:
+        raise FileNotFoundError(f"No workflow JSON files found in '{workflows_dir}'")
+
+    samples = []
+    if compression.endswith('-dict'):
+        step = max(1, len(paths) // DICT_SAMPLES)
+        samples = [path.read_bytes() for path in list(paths.values())[::step]]
+    compress, dictionary = make_compressor(compression, samples)
+
+    entries: Dict[str, PackEntry] = {}
+    original_bytes = 0
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, 'wb') as out:
+        out.write(MAGIC)
+        for name, path in paths.items():
+            data = path.read_bytes()
+            stored = compress(data) if compress else data
+            # Keep incompressible entries as they are
+            compressed = compress is not None and len(stored) < len(data)
+            if not compressed:
+                stored = data
+            entries[name] = PackEntry(path.relative_to(workflows_dir).as_posix(), out.tell(), len(stored),
+                                      len(data), hashlib.md5(data).hexdigest(), compressed)
+            out.write(stored)
+            original_bytes += len(data)
+
+        dictionary_range = None
+        if dictionary:
+            dictionary_range = [out.tell(), len(dictionary)]
+            out.write(dictionary)
+        index = {
+            'version': FORMAT_VERSION,
+            'compression': compression,
+            'dictionary': dictionary_range,
+            'digest': corpus_digest(entries),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'entries': {name: [entry.path, entry.offset, entry.length, entry.size,
+                               entry.file_hash, int(entry.compressed)]
+                        for name, entry in entries.items()},
+        }
+        index_bytes = json.dumps(index, separators=(",", ":")).encode('utf-8')
+        index_offset = out.tell()
+        out.write(index_bytes)
+        out.write(FOOTER.pack(index_offset, len(index_bytes), MAGIC))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, output)
+
+    return {
+        'entries': len(entries),
+        'original_bytes': original_bytes,
+        'pack_bytes': os.path.getsize(output),
+        'compression': compression,
+        'seconds': round(time.time() - start, 2),
+    }
+
+
+class CorpusPack:
+    """Read-only view of a pack file; entries are sliced from a shared mmap.
+
+    Reads are thread-safe: slicing the map does not move a file position,
+    and zstd decompressors are kept per thread.
+    """
+
+    def __init__(self, path: str = DEFAULT_PACK_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # The mapping stays valid after the descriptor is closed
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Identifies the file on disk, to notice a rebuilt pack
+        self.stat_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        if len(self._map) < len(MAGIC) + FOOTER.size or self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a workflow pack")
+        index_offset, index_length, magic = FOOTER.unpack_from(self._map, len(self._map) - FOOTER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is truncated (no pack footer)")
+        index = json.loads(self._map[index_offset:index_offset + index_length])
+        if index.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path} has pack format version {index.get('version')}, expected {FORMAT_VERSION}")
+
+        self.compression = index['compression']
+        self.digest = index['digest']
+        self.created_at = index.get('created_at')
+        self.entries = {name: PackEntry(path, offset, length, size, file_hash, bool(compressed))
+                        for name, (path, offset, length, size, file_hash, compressed)
+                        in index['entries'].items()}
+        self.dictionary = None
+        if index.get('dictionary'):
+            offset, length = index['dictionary']
+            self.dictionary = self._map[offset:offset + length]
+        self._local = threading.local()
+        if self.compression.startswith('zstd'):
+            require_zstandard()
+            self._zstd_dict = (zstandard.ZstdCompressionDict(self.dictionary)
+                               if self.dictionary else None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self.entries
+
+    def names(self) -> List[str]:
+        """Filenames in pack order (the same order the indexer walks files)."""
+        return list(self.entries)
+
+    def entry(self, filename: str) -> Optional[PackEntry]:
+        return self.entries.get(filename)
+
+    def read(self, filename: str) -> Optional[bytes]:
+        """Original bytes of a workflow, or None if it is not in the pack."""
+        entry = self.entries.get(filename)
+        if entry is None:
+            return None
+        stored = self._map[entry.offset:entry.offset + entry.length]
+        if not entry.compressed:
+            return stored
+        return self._decompress(stored, entry.size)
+
+    def _decompress(self, stored: bytes, size: int) -> bytes:
+        if self.compression == 'zlib':
+            return zlib.decompress(stored)
+        if self.compression == 'zlib-dict':
+            decompressor = zlib.decompressobj(zdict=self.dictionary)
+            return decompressor.decompress(stored) + decompressor.flush()
+        decompressor = getattr(self._local, 'zstd', None)
+        if decompressor is None:
+            decompressor = self._local.zstd = zstandard.ZstdDecompressor(dict_data=self._zstd_dict)
+        return decompressor.decompress(stored, max_output_size=size)
+
+    def verify(self) -> List[str]:
+        """Filenames whose bytes no longer match their recorded hash."""
+        return [name for name, entry in self.entries.items()
+                if hashlib.md5(self.read(name)).hexdigest() != entry.file_hash]
+
+    def close(self):
+        self._map.close()
+
+
+def main():
+    """Command-line interface for building and inspecting packs."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pack the workflow corpus into one mmap-able file')
+    parser.add_argument('--build', action='store_true', help='Pack all workflows')
+    parser.add_argument('--info', action='store_true', help='Show pack statistics')
+    parser.add_argument('--verify', action='store_true', help='Check every entry against its hash')
+    parser.add_argument('--dir', default='workflows', help='Workflows directory to pack (default: workflows)')
+    parser.add_argument('--output', default=os.environ.get('WORKFLOW_CORPUS_PACK') or DEFAULT_PACK_PATH,
+                        help=f'Pack file (default: WORKFLOW_CORPUS_PACK or {DEFAULT_PACK_PATH})')
+    parser.add_argument('--compression', default='none', choices=COMPRESSIONS,
+                        help='Per-entry compression (zstd needs the zstandard package)')
+
+    args = parser.parse_args()
+
+    if args.build:
+        stats = build_pack(args.dir, args.output, args.compression)
+        ratio = stats['pack_bytes'] / stats['original_bytes']
+        print(f"📦 Packed {stats['entries']} workflows into {args.output}: "
+              f"{stats['original_bytes'] / 1e6:.1f} MB -> {stats['pack_bytes'] / 1e6:.1f} MB "
+              f"({ratio:.0%}, {stats['compression']}) in {stats['seconds']}s")
+
+    elif args.info:
+        pack = CorpusPack(args.output)
+        original = sum(entry.size for entry in pack.entries.values())
+        print(f"Pack {args.output}:")
+        print(f"  Workflows: {len(pack)}")
+        print(f"  Compression: {pack.compression}")
+        print(f"  Size: {os.path.getsize(args.output) / 1e6:.1f} MB ({original / 1e6:.1f} MB unpacked)")
+        print(f"  Corpus digest: {pack.digest}")
+        print(f"  Built: {pack.created_at}")
+
+    elif args.verify:
+        pack = CorpusPack(args.output)
+        corrupt = pack.verify()
+        if corrupt:
+            print(f"❌ {len(corrupt)} of {len(pack)} entries do not match their hash:")
+            for name in corrupt:
+                print(f"  - {name}")
+            raise SystemExit(1)
+        print(f"✅ All {len(pack)} entries match their hashes")
+
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
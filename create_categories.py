@@ -4,6 +4,17 @@ from pathlib import Path
 import glob
 import re
 
+NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+# Vote weights for content-based categorization: an integration that names a
+# def_categories entry exactly counts fully, a partial name match counts
+# less, and plumbing integrations present in most workflows count least
+EXACT_VOTE_WEIGHT = 1.0
+PARTIAL_VOTE_WEIGHT = 0.5
+GENERIC_VOTE_WEIGHT = 0.25
+GENERIC_INTEGRATIONS = {'webhook', 'http', 'httprequest', 'code', 'form', 'formtrigger', 'n8n'}
+MIN_INTEGRATION_KEY = 4
+
 def load_def_categories():
     """Load the definition categories from def_categories.json"""
     def_categories_path = Path("context/def_categories.json")
@@ -47,104 +58,257 @@ def find_matching_category(tokens, integration_to_category):
     
     return ""
 
-def categorize_by_filename(filename):
-    """
-    Categorize workflow based on filename patterns.
-    Returns the most likely category or None if uncertain.
-    """
-    filename_lower = filename.lower()
-    
+# Filename keyword rules, checked in order; the first rule with a keyword
+# contained in the lowercased filename decides the category
+FILENAME_RULES = [
     # Security & Authentication
-    if any(word in filename_lower for word in ['totp', 'bitwarden', 'auth', 'security']):
-        return "Technical Infrastructure & DevOps"
-
+    (['totp', 'bitwarden', 'auth', 'security'],
+     "Technical Infrastructure & DevOps"),
     # Data Processing & File Operations
-    if any(word in filename_lower for word in ['process', 'writebinaryfile', 'readbinaryfile', 'extractfromfile', 'converttofile', 'googlefirebasecloudfirestore', 'supabase', 'surveymonkey', 'renamekeys', 'readpdf', 'wufoo', 'splitinbatches', 'airtop', 'comparedatasets', 'spreadsheetfile']):
-        return "Data Processing & Analysis"
-
+    (['process', 'writebinaryfile', 'readbinaryfile', 'extractfromfile', 'converttofile', 'googlefirebasecloudfirestore', 'supabase', 'surveymonkey', 'renamekeys', 'readpdf', 'wufoo', 'splitinbatches', 'airtop', 'comparedatasets', 'spreadsheetfile'],
+     "Data Processing & Analysis"),
     # Utility & Business Process Automation
-    if any(word in filename_lower for word in ['noop', 'code', 'schedule', 'filter', 'splitout', 'wait', 'limit', 'aggregate', 'acuityscheduling', 'eventbrite', 'philipshue', 'stickynote', 'n8ntrainingcustomerdatastore', 'n8n']):
-        return "Business Process Automation"
-
+    (['noop', 'code', 'schedule', 'filter', 'splitout', 'wait', 'limit', 'aggregate', 'acuityscheduling', 'eventbrite', 'philipshue', 'stickynote', 'n8ntrainingcustomerdatastore', 'n8n'],
+     "Business Process Automation"),
     # Webhook & API related
-    if any(word in filename_lower for word in ['webhook', 'respondtowebhook', 'http', 'rssfeedread']):
-        return "Web Scraping & Data Extraction"
-
+    (['webhook', 'respondtowebhook', 'http', 'rssfeedread'],
+     "Web Scraping & Data Extraction"),
     # Form & Data Collection
-    if any(word in filename_lower for word in ['form', 'typeform', 'jotform']):
-        return "Data Processing & Analysis"
-
+    (['form', 'typeform', 'jotform'],
+     "Data Processing & Analysis"),
     # Local file operations
-    if any(word in filename_lower for word in ['localfile', 'filemaker']):
-        return "Cloud Storage & File Management"
-
+    (['localfile', 'filemaker'],
+     "Cloud Storage & File Management"),
     # Database operations
-    if any(word in filename_lower for word in ['postgres', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'snowflake']):
-        return "Data Processing & Analysis"
-
+    (['postgres', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'snowflake'],
+     "Data Processing & Analysis"),
     # AI & Machine Learning
-    if any(word in filename_lower for word in ['openai', 'awstextract', 'awsrekognition', 'humanticai', 'openthesaurus', 'googletranslate', 'summarize']):
-        return "AI Agent Development"
-
+    (['openai', 'awstextract', 'awsrekognition', 'humanticai', 'openthesaurus', 'googletranslate', 'summarize'],
+     "AI Agent Development"),
     # E-commerce specific
-    if any(word in filename_lower for word in ['woocommerce', 'gumroad']):
-        return "E-commerce & Retail"
-
+    (['woocommerce', 'gumroad'],
+     "E-commerce & Retail"),
     # Social media specific
-    if any(word in filename_lower for word in ['facebook', 'linkedin', 'instagram']):
-        return "Social Media Management"
-
+    (['facebook', 'linkedin', 'instagram'],
+     "Social Media Management"),
     # Customer support
-    if any(word in filename_lower for word in ['zendesk', 'intercom', 'drift', 'pagerduty']):
-        return "Communication & Messaging"
-
+    (['zendesk', 'intercom', 'drift', 'pagerduty'],
+     "Communication & Messaging"),
     # Analytics & Tracking
-    if any(word in filename_lower for word in ['googleanalytics', 'segment', 'mixpanel']):
-        return "Data Processing & Analysis"
-
+    (['googleanalytics', 'segment', 'mixpanel'],
+     "Data Processing & Analysis"),
     # Development tools
-    if any(word in filename_lower for word in ['git', 'github', 'gitlab', 'travisci', 'jenkins', 'uptimerobot', 'gsuiteadmin', 'debughelper', 'bitbucket']):
-        return "Technical Infrastructure & DevOps"
-
+    (['git', 'github', 'gitlab', 'travisci', 'jenkins', 'uptimerobot', 'gsuiteadmin', 'debughelper', 'bitbucket'],
+     "Technical Infrastructure & DevOps"),
     # CRM & Sales tools
-    if any(word in filename_lower for word in ['pipedrive', 'hubspot', 'salesforce', 'copper', 'orbit', 'agilecrm']):
-        return "CRM & Sales"
-
+    (['pipedrive', 'hubspot', 'salesforce', 'copper', 'orbit', 'agilecrm'],
+     "CRM & Sales"),
     # Marketing tools
-    if any(word in filename_lower for word in ['mailchimp', 'convertkit', 'sendgrid', 'mailerlite', 'lemlist', 'sendy', 'postmark', 'mailgun']):
-        return "Marketing & Advertising Automation"
-
+    (['mailchimp', 'convertkit', 'sendgrid', 'mailerlite', 'lemlist', 'sendy', 'postmark', 'mailgun'],
+     "Marketing & Advertising Automation"),
     # Project management
-    if any(word in filename_lower for word in ['asana', 'mondaycom', 'clickup', 'trello', 'notion', 'toggl', 'microsofttodo', 'calendly', 'jira']):
-        return "Project Management"
-
+    (['asana', 'mondaycom', 'clickup', 'trello', 'notion', 'toggl', 'microsofttodo', 'calendly', 'jira'],
+     "Project Management"),
     # Communication
-    if any(word in filename_lower for word in ['slack', 'telegram', 'discord', 'mattermost', 'twilio', 'emailreadimap', 'teams', 'gotowebinar']):
-        return "Communication & Messaging"
-
+    (['slack', 'telegram', 'discord', 'mattermost', 'twilio', 'emailreadimap', 'teams', 'gotowebinar'],
+     "Communication & Messaging"),
     # Cloud storage
-    if any(word in filename_lower for word in ['dropbox', 'googledrive', 'onedrive', 'awss3', 'googledocs']):
-        return "Cloud Storage & File Management"
-
+    (['dropbox', 'googledrive', 'onedrive', 'awss3', 'googledocs'],
+     "Cloud Storage & File Management"),
     # Creative tools
-    if any(word in filename_lower for word in ['canva', 'figma', 'bannerbear', 'editimage']):
-        return "Creative Design Automation"
-
+    (['canva', 'figma', 'bannerbear', 'editimage'],
+     "Creative Design Automation"),
     # Video & content
-    if any(word in filename_lower for word in ['youtube', 'vimeo', 'storyblok', 'strapi']):
-        return "Creative Content & Video Automation"
-
+    (['youtube', 'vimeo', 'storyblok', 'strapi'],
+     "Creative Content & Video Automation"),
     # Financial tools
-    if any(word in filename_lower for word in ['stripe', 'chargebee', 'quickbooks', 'harvest']):
-        return "Financial & Accounting"
-
+    (['stripe', 'chargebee', 'quickbooks', 'harvest'],
+     "Financial & Accounting"),
     # Weather & external APIs
-    if any(word in filename_lower for word in ['openweathermap', 'nasa', 'crypto', 'coingecko']):
-        return "Web Scraping & Data Extraction"
+    (['openweathermap', 'nasa', 'crypto', 'coingecko'],
+     "Web Scraping & Data Extraction"),
+]
+
+def categorize_by_filename(filename):
+    """
+    Categorize workflow based on filename patterns.
+    Returns the most likely category or None if uncertain.
+    """
+    filename_lower = filename.lower()
+    
+    for words, category in FILENAME_RULES:
+        if any(word in filename_lower for word in words):
+            return category
 
     return ""
 
-def main():
+class AhoCorasick:
+    """Aho-Corasick automaton reporting the lowest value among matched patterns."""
+
+    def __init__(self, patterns):
+        # patterns: mapping of pattern string -> value (lower wins)
+        self.goto = [{}]
+        self.best = [None]
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.best.append(None)
+                state = next_state
+            self.best[state] = self._min(self.best[state], value)
+
+        # Breadth-first failure links; fold each state's failure output into it
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.best[next_state] = self._min(self.best[next_state], self.best[self.fail[next_state]])
+                queue.append(next_state)
+
+    @staticmethod
+    def _min(a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a, b)
+
+    def min_match(self, text):
+        """Lowest value of any pattern occurring in text, or None."""
+        goto, fail, best = self.goto, self.fail, self.best
+        state = 0
+        result = best[0]
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best[state] is not None and (result is None or best[state] < result):
+                result = best[state]
+        return result
+
+
+class CategoryEngine:
+    """Batch categorizer producing the same results as find_matching_category
+    followed by categorize_by_filename.
+
+    All integration keys and filename keywords are compiled once into
+    Aho-Corasick automata, and results are memoized per token / filename
+    segment, which repeat heavily across the corpus.
+    """
+
+    def __init__(self, integration_to_category):
+        self.integration_to_category = integration_to_category
+        self.keys = list(integration_to_category)
+
+        # "key in token": automaton over the keys, valued by dict order
+        self.key_matcher = AhoCorasick({key: index for index, key in enumerate(self.keys)})
+        # Integration names only match keys they contain, and not very short
+        # ones: "Httprequest" contains "http", but "Chat" is not "Rocket.Chat"
+        self.integration_key_matcher = AhoCorasick(
+            {key: index for index, key in enumerate(self.keys) if len(key) >= MIN_INTEGRATION_KEY}
+        )
+        # "token in key": every substring of every key -> first key containing it
+        self.key_substrings = {}
+        for index, key in enumerate(self.keys):
+            for start in range(len(key) + 1):
+                for end in range(start, len(key) + 1):
+                    self.key_substrings.setdefault(key[start:end], index)
+
+        # Filename keywords, valued by rule order; keywords never contain '_'
+        # so a filename's result is the best result over its '_' segments
+        keywords = {}
+        for rule_index, (words, _category) in enumerate(FILENAME_RULES):
+            for word in words:
+                keywords.setdefault(word, rule_index)
+        self.rule_matcher = AhoCorasick(keywords)
+
+        self._token_cache = {}
+        self._segment_cache = {}
+
+    def _token_matches(self, token):
+        """(exact category or None, partial key index or None) for one token."""
+        cached = self._token_cache.get(token)
+        if cached is None:
+            norm = NON_ALNUM.sub("", token.lower())
+            exact = self.integration_to_category.get(norm)
+            partial = AhoCorasick._min(self.key_substrings.get(norm), self.key_matcher.min_match(norm))
+            cached = self._token_cache[token] = (exact, partial)
+        return cached
+
+    def _segment_rule(self, segment):
+        if segment not in self._segment_cache:
+            self._segment_cache[segment] = self.rule_matcher.min_match(segment)
+        return self._segment_cache[segment]
+
+    def match_tokens(self, tokens):
+        """Same result as find_matching_category(tokens, integration_to_category)."""
+        matches = [self._token_matches(token) for token in tokens]
+        for exact, _partial in matches:
+            if exact is not None:
+                return exact
+        for _exact, partial in matches:
+            if partial is not None:
+                return self.integration_to_category[self.keys[partial]]
+        return ""
+
+    def categorize(self, filename):
+        category = self.match_tokens(extract_tokens_from_filename(filename))
+        if category:
+            return category
+
+        rule = None
+        for segment in filename.lower().split('_'):
+            rule = AhoCorasick._min(rule, self._segment_rule(segment))
+        return FILENAME_RULES[rule][1] if rule is not None else ""
+
+    def categorize_integrations(self, integrations, filename=""):
+        """Categorize from a workflow's extracted integrations by weighted vote.
+
+        Falls back to the filename category when no integration maps to a
+        category, and prefers it among tied leaders.
+        """
+        votes = {}
+        for integration in integrations:
+            norm = NON_ALNUM.sub("", integration.lower())
+            if not norm:
+                continue
+            exact = self.integration_to_category.get(norm)
+            partial = self.integration_key_matcher.min_match(norm) if exact is None else None
+            if exact is not None:
+                category, weight = exact, EXACT_VOTE_WEIGHT
+            elif partial is not None:
+                category, weight = self.integration_to_category[self.keys[partial]], PARTIAL_VOTE_WEIGHT
+            else:
+                continue
+            if not category:
+                continue
+            if norm in GENERIC_INTEGRATIONS:
+                weight = min(weight, GENERIC_VOTE_WEIGHT)
+            votes[category] = votes.get(category, 0) + weight
+
+        fallback = self.categorize(filename) if filename else ""
+        if not votes:
+            return fallback
+        top = max(votes.values())
+        leaders = sorted(category for category, weight in votes.items() if weight == top)
+        return fallback if fallback in leaders else leaders[0]
+
+    def categorize_all(self, filenames):
+        """Categorize a whole file list in one pass."""
+        return [self.categorize(filename) for filename in filenames]
+
+
+def categorize_from_filenames():
+    """Legacy categorization from filename tokens only."""
     # Load definition categories
     integration_to_category = load_def_categories()
     
@@ -155,35 +319,17 @@ def main():
         recursive=True
     ) 
     
-    # Process each file
-    search_categories = []
-    
-    for json_file in json_files:
-        path_obj = Path(json_file)
-        filename = path_obj.name
-        tokens = extract_tokens_from_filename(filename)
-        category = find_matching_category(tokens, integration_to_category)
-        
-        search_categories.append({
-            "filename": filename,
-            "category": category
-        })
-
-    # Second pass for categorization
-    for item in search_categories:
-        if not item['category']:
-            item['category'] = categorize_by_filename(item['filename'])
+    # Categorize all files in one batched pass
+    filenames = [Path(json_file).name for json_file in json_files]
+    engine = CategoryEngine(integration_to_category)
+    search_categories = [
+        {"filename": filename, "category": category}
+        for filename, category in zip(filenames, engine.categorize_all(filenames))
+    ]
     
     # Sort by filename for consistency
     search_categories.sort(key=lambda x: x['filename'])
     
-    # Write to search_categories.json
-    output_path = Path("context/search_categories.json")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(search_categories, f, indent=2, ensure_ascii=False)
-    
-    print(f"Generated search_categories.json with {len(search_categories)} entries")
-    
     # Generate unique categories list for API
     unique_categories = set()
     for item in search_categories:
@@ -194,7 +340,38 @@ def main():
     unique_categories.add('Uncategorized')
     
     # Sort categories alphabetically
-    categories_list = sorted(list(unique_categories))
+    return search_categories, sorted(list(unique_categories))
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Generate workflow category files')
+    parser.add_argument('--db', default=None, help='Workflow database path (default: WORKFLOW_DB_PATH or workflows.db)')
+    parser.add_argument('--from-filenames', action='store_true',
+                        help='Categorize from filename tokens instead of indexed integrations')
+    args = parser.parse_args()
+    
+    search_categories = None
+    if not args.from_filenames:
+        from workflow_db import WorkflowDatabase
+        db = WorkflowDatabase(args.db)
+        search_categories, categories_list = db.export_categories()
+        if not any(item['category'] for item in search_categories):
+            print("⚠️  No categorized workflows in the index (run workflow_db.py --index), using filenames")
+            search_categories = None
+        else:
+            print(f"📂 Using integration-based categories from {db.db_path}")
+    
+    if search_categories is None:
+        search_categories, categories_list = categorize_from_filenames()
+    
+    # Write to search_categories.json
+    output_path = Path("context/search_categories.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(search_categories, f, indent=2, ensure_ascii=False)
+    
+    print(f"Generated search_categories.json with {len(search_categories)} entries")
     
     # Write unique categories to a separate file for API consumption
     categories_output_path = Path("context/unique_categories.json")
@@ -4,127 +4,316 @@ N8N Workflow Importer
 Python replacement for import-workflows.sh with better error handling and progress tracking.
 """
 
+import hashlib
 import json
+import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-from categorize_workflows import categorize_by_filename
+from create_categories import categorize_by_filename
+from workflow_db import WorkflowDatabase
+from workflow_validator import WorkflowValidator, validate_file
 
+# Command used to run the n8n CLI; point N8N_NPX at a stub script for local testing
+DEFAULT_NPX = os.environ.get('N8N_NPX', 'npx')
+IMPORT_TIMEOUT = 30
 
-def load_categories():
+
+CATEGORIES_FILE = Path('context/search_categories.json')
+FLUSH_EVERY = 100
+
+
+def load_categories(path: Path = CATEGORIES_FILE):
     """Load the search categories file."""
     try:
-        with open('context/search_categories.json', 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         return []
 
-def save_categories(data):
+def atomic_write_json(path: Path, data):
+    """Write JSON to a temp file next to ``path`` and rename it into place,
+    so readers and crashes never see a partially written file."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def save_categories(data, path: Path = CATEGORIES_FILE):
     """Save the search categories file."""
-    with open('context/search_categories.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    atomic_write_json(path, data)
+
+
+class CategoryStore:
+    """search_categories.json buffered in memory as a filename -> entry dict.
+    
+    Updates are flushed every ``flush_every`` changes and on ``flush()``.
+    Imports are added to the ledger only after the categories they produced
+    are on disk, so the ledger never gets ahead of search_categories.json.
+    """
+    
+    def __init__(self, path: Path = CATEGORIES_FILE, ledger: Optional[WorkflowDatabase] = None,
+                 flush_every: int = FLUSH_EVERY):
+        self.path = Path(path)
+        self.ledger = ledger
+        self.flush_every = max(1, flush_every)
+        self.entries: Dict[str, Dict] = {}
+        self.unnamed: List[Dict] = []
+        for entry in load_categories(self.path):
+            if isinstance(entry, dict) and entry.get('filename'):
+                self.entries[entry['filename']] = entry
+            else:
+                self.unnamed.append(entry)
+        self.pending_imports: List[Tuple[str, str]] = []
+        self.pending = 0
+    
+    def set_category(self, filename: str, category: str, name: str, file_hash: Optional[str] = None):
+        """Record an imported workflow's category."""
+        entry = self.entries.get(filename)
+        if entry is not None:
+            entry['category'] = category
+        else:
+            # Add new workflow entry if not found (e.g., first import)
+            self.entries[filename] = {
+                "filename": filename,
+                "category": category,
+                "name": name,
+                "description": "", # Placeholder, can be updated manually
+                "nodes": [] # Placeholder, can be updated manually
+            }
+        if file_hash:
+            self.pending_imports.append((file_hash, filename))
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+    
+    def flush(self):
+        """Atomically write categories, then record the imports in the ledger."""
+        if not self.pending:
+            return
+        save_categories(list(self.entries.values()) + self.unnamed, self.path)
+        if self.ledger:
+            self.ledger.record_imports(self.pending_imports)
+        self.pending_imports = []
+        self.pending = 0
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
 
 class WorkflowImporter:
-    """Import n8n workflows with progress tracking and error handling."""
+    """Import n8n workflows with progress tracking and error handling.
     
-    def __init__(self, workflows_dir: str = "workflows"):
-        self.workflows_dir = Path(workflows_dir)
+    With ``batch_size > 1`` workflows are staged into temporary directories and
+    imported with ``n8n import:workflow --separate --input=<dir>``, so one Node
+    process handles a whole batch. ``workers`` batches run concurrently. Staged
+    copies carry a stable workflow ``id``, which n8n upserts on, and the CLI
+    may stop part way through a failed batch: the importer asks n8n which of
+    the batch's workflows it created and imports only the others, one at a
+    time, so nothing is imported twice and every error names its workflow.
+    
+    Workflows are discovered through the same WorkflowDatabase file listing the
+    API uses, and successful imports are recorded in its ``import_ledger`` by
+    content hash and filename, so reruns skip unchanged workflows unless
+    ``force`` is set.
+    """
+    
+    def __init__(self, workflows_dir: Optional[str] = None, batch_size: int = 1, workers: int = 1,
+                 npx: Optional[str] = None, timeout: int = IMPORT_TIMEOUT,
+                 category_store: Optional[CategoryStore] = None, db: Optional[WorkflowDatabase] = None,
+                 force: bool = False):
+        self.db = db or WorkflowDatabase()
+        if workflows_dir:
+            self.db.workflows_dir = str(workflows_dir)
+        self.workflows_dir = Path(self.db.workflows_dir)
+        self.category_store = category_store
+        self.force = force
+        self.file_hashes: Dict[Path, str] = {}
+        self.prevalidated = set()
+        self.existing_ids: Optional[set] = None
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.npx = npx or DEFAULT_NPX
+        self.timeout = timeout
         self.imported_count = 0
         self.failed_count = 0
         self.errors = []
 
     def validate_workflow(self, file_path: Path) -> bool:
-        """Validate workflow JSON before import."""
+        """Validate workflow structure before import."""
+        return not self.validation_error(file_path)
+
+    def validation_error(self, file_path: Path) -> str:
+        """First structural error of a workflow, or '' if it can be imported."""
+        if file_path in self.prevalidated:
+            return ""
+        errors = validate_file(str(file_path))["errors"]
+        return f"Invalid workflow {file_path.name}: {errors[0]}" if errors else ""
+
+    def run_n8n_import(self, input_path: Path, separate: bool = False,
+                       timeout: Optional[int] = None) -> Tuple[bool, str]:
+        """Run ``n8n import:workflow`` and return (success, error message)."""
+        command = [self.npx, 'n8n', 'import:workflow']
+        if separate:
+            command.append('--separate')
+        command.append(f'--input={input_path}')
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Basic validation
-            if not isinstance(data, dict):
-                return False
-            
-            # Check required fields
-            required_fields = ['nodes', 'connections']
-            for field in required_fields:
-                if field not in data:
-                    return False
+            result = subprocess.run(command, capture_output=True, text=True,
+                                    timeout=timeout or self.timeout)
+        except subprocess.TimeoutExpired:
+            return False, "Timeout"
+        if result.returncode == 0:
+            return True, ""
+        return False, result.stderr.strip() or result.stdout.strip()
+
+    def import_file(self, file_path: Path) -> Tuple[Path, bool, str]:
+        """Validate and import one workflow file; safe to call from worker threads."""
+        try:
+            error = self.validation_error(file_path)
+            if error:
+                return file_path, False, error
+            return self.import_path(file_path, file_path)
+        except Exception as e:
+            return file_path, False, f"Error importing {file_path.name}: {str(e)}"
+
+    def import_path(self, file_path: Path, input_path: Path) -> Tuple[Path, bool, str]:
+        """Import ``input_path`` (the workflow file or its staged copy) on its own."""
+        success, error_msg = self.run_n8n_import(input_path)
+        if success:
+            return file_path, True, ""
+        if error_msg == "Timeout":
+            return file_path, False, f"Timeout importing {file_path.name}"
+        return file_path, False, f"Import failed for {file_path.name}: {error_msg}"
+
+    def list_workflow_ids(self) -> Optional[set]:
+        """IDs of the workflows stored in n8n, or None if the CLI cannot list them."""
+        try:
+            result = subprocess.run([self.npx, 'n8n', 'list:workflow', '--onlyId'],
+                                    capture_output=True, text=True, timeout=self.timeout)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            return None
+        if result.returncode != 0:
+            return None
+        return {line.strip() for line in result.stdout.splitlines() if line.strip()}
+
+    def stage_workflow(self, file_path: Path, staged_path: Path) -> str:
+        """Copy a workflow for a batch import and return its n8n workflow id.
+        
+        Workflows without an ``id`` get one derived from their path, so a
+        retry updates the workflow a failed batch already created instead of
+        adding a duplicate.
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('id') in (None, ''):
+            try:
+                key = file_path.relative_to(self.workflows_dir).as_posix()
+            except ValueError:
+                key = str(file_path)
+            data['id'] = hashlib.md5(key.encode('utf-8')).hexdigest()[:16]
+            with open(staged_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        else:
+            shutil.copyfile(file_path, staged_path)
+        return str(data['id'])
+
+    def import_batch(self, batch: List[Path]) -> List[Tuple[Path, bool, str]]:
+        """Import a batch with one n8n process, retrying its unimported files one by one on failure."""
+        results = []
+        valid = []
+        for file_path in batch:
+            error = self.validation_error(file_path)
+            if error:
+                results.append((file_path, False, error))
+            else:
+                valid.append(file_path)
+        return results + self.import_valid(valid)
+
+    def import_valid(self, batch: List[Path]) -> List[Tuple[Path, bool, str]]:
+        if len(batch) <= 1:
+            return [self.import_file(file_path) for file_path in batch]
+        
+        with tempfile.TemporaryDirectory(prefix='n8n-import-') as staging:
+            # Prefix with the batch position so equal names from different folders cannot clash
+            staged = [Path(staging) / f"{position:05d}_{file_path.name}"
+                      for position, file_path in enumerate(batch)]
+            ids = [self.stage_workflow(file_path, staged_path)
+                   for file_path, staged_path in zip(batch, staged)]
+            success, _ = self.run_n8n_import(Path(staging), separate=True,
+                                             timeout=self.timeout * len(batch))
+            if success:
+                return [(file_path, True, "") for file_path in batch]
             
-            return True
-        except (json.JSONDecodeError, FileNotFoundError, PermissionError):
-            return False
+            # The CLI reports a batch failure without naming the file, after
+            # importing the workflows ahead of it. Workflows that n8n did not
+            # know before this run and knows now came from this batch; import
+            # the rest one at a time so each failure names its workflow.
+            current = self.list_workflow_ids() if self.existing_ids is not None else None
+            results = []
+            for file_path, staged_path, workflow_id in zip(batch, staged, ids):
+                if current is not None and workflow_id in current and workflow_id not in self.existing_ids:
+                    results.append((file_path, True, ""))
+                else:
+                    results.append(self.import_path(file_path, staged_path))
+            return results
+
+    def record_result(self, file_path: Path, success: bool, error: str):
+        """Update counters and categories for one imported file (main thread only)."""
+        if not success:
+            self.failed_count += 1
+            self.errors.append(error)
+            print(f"{'⏰ Timeout' if error.startswith('Timeout') else '❌ Failed'}: {file_path.name}")
+            return
+        
+        self.imported_count += 1
+        print(f"✅ Imported: {file_path.name}")
+        
+        # Categorize the workflow; the store writes search_categories.json in batches
+        suggested_category = categorize_by_filename(file_path.name)
+        if self.category_store is None:
+            self.category_store = CategoryStore(ledger=self.db)
+        self.category_store.set_category(file_path.name, suggested_category, file_path.stem,
+                                         self.file_hashes.get(file_path))
+        print(f"  Categorized '{file_path.name}' as '{suggested_category or 'Uncategorized'}'")
 
     def import_workflow(self, file_path: Path) -> bool:
         """Import a single workflow file."""
-        try:
-            # Validate first
-            if not self.validate_workflow(file_path):
-                self.errors.append(f"Invalid JSON: {file_path.name}")
-                return False
-            
-            # Run n8n import command
-            result = subprocess.run([
-                'npx', 'n8n', 'import:workflow', 
-                f'--input={file_path}'
-            ], capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                print(f"✅ Imported: {file_path.name}")
-                
-                # Categorize the workflow and update search_categories.json
-                suggested_category = categorize_by_filename(file_path.name)
-                
-                all_workflows_data = load_categories()
-                
-                found = False
-                for workflow_entry in all_workflows_data:
-                    if workflow_entry.get('filename') == file_path.name:
-                        workflow_entry['category'] = suggested_category
-                        found = True
-                        break
-                
-                if not found:
-                    # Add new workflow entry if not found (e.g., first import)
-                    all_workflows_data.append({
-                        "filename": file_path.name,
-                        "category": suggested_category,
-                        "name": file_path.stem, # Assuming workflow name is filename without extension
-                        "description": "", # Placeholder, can be updated manually
-                        "nodes": [] # Placeholder, can be updated manually
-                    })
-                
-                save_categories(all_workflows_data)
-                print(f"  Categorized '{file_path.name}' as '{suggested_category or 'Uncategorized'}'")
-                
-                return True
-            else:
-                error_msg = result.stderr.strip() or result.stdout.strip()
-                self.errors.append(f"Import failed for {file_path.name}: {error_msg}")
-                print(f"❌ Failed: {file_path.name}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            self.errors.append(f"Timeout importing {file_path.name}")
-            print(f"⏰ Timeout: {file_path.name}")
-            return False
-        except Exception as e:
-            self.errors.append(f"Error importing {file_path.name}: {str(e)}")
-            print(f"❌ Error: {file_path.name} - {str(e)}")
-            return False
+        if file_path not in self.file_hashes and file_path.exists():
+            self.file_hashes[file_path] = self.db.get_file_hash(str(file_path))
+        file_path, success, error = self.import_file(file_path)
+        self.record_result(file_path, success, error)
+        if self.category_store:
+            self.category_store.flush()
+        return success
 
     def get_workflow_files(self) -> List[Path]:
-        """Get all workflow JSON files."""
+        """Get all workflow JSON files, including category subfolders."""
         if not self.workflows_dir.exists():
             print(f"❌ Workflows directory not found: {self.workflows_dir}")
             return []
         
-        json_files = list(self.workflows_dir.glob("*.json"))
+        json_files = self.db.get_workflow_files(refresh=True)
         if not json_files:
             print(f"❌ No JSON files found in: {self.workflows_dir}")
             return []
         
-        return sorted(json_files)
+        return json_files
 
     def import_all(self) -> Dict[str, Any]:
         """Import all workflow files."""
@@ -134,16 +323,60 @@ class WorkflowImporter:
         if total_files == 0:
             return {"success": False, "message": "No workflow files found"}
         
-        print(f"🚀 Starting import of {total_files} workflows...")
+        if self.category_store is None:
+            self.category_store = CategoryStore(ledger=self.db)
+        self.file_hashes = {path: self.db.get_file_hash(str(path)) for path in workflow_files}
+        skipped = 0
+        if not self.force:
+            imported = self.db.get_imported()
+            workflow_files = [path for path in workflow_files
+                              if (self.file_hashes[path], path.name) not in imported]
+            skipped = total_files - len(workflow_files)
+            if skipped:
+                print(f"⏭️  Skipping {skipped} unchanged workflows already imported (use --force to re-import)")
+        
+        # Reject malformed workflows up front instead of after an n8n spawn
+        validation = WorkflowValidator(self.db).validate_paths(workflow_files)
+        invalid = [result for result in validation if not result["valid"]]
+        self.prevalidated = {Path(result["path"]) for result in validation if result["valid"]}
+        workflow_files = [path for path in workflow_files if path in self.prevalidated]
+        if invalid:
+            print(f"🔍 {len(invalid)} workflows failed validation and will not be imported")
+        
+        batches = [workflow_files[i:i + self.batch_size]
+                   for i in range(0, len(workflow_files), self.batch_size)]
+        if any(len(batch) > 1 for batch in batches):
+            # Snapshot n8n's workflows so a failed batch can tell what it created
+            self.existing_ids = self.list_workflow_ids()
+        print(f"🚀 Starting import of {len(workflow_files)} workflows "
+              f"({len(batches)} batches of up to {self.batch_size}, {self.workers} workers)...")
         print("-" * 50)
         
-        for i, file_path in enumerate(workflow_files, 1):
-            print(f"[{i}/{total_files}] Processing {file_path.name}...")
-            
-            if self.import_workflow(file_path):
-                self.imported_count += 1
-            else:
-                self.failed_count += 1
+        for result in invalid:
+            self.record_result(Path(result["path"]), False,
+                               f"Invalid workflow {result['filename']}: {result['errors'][0]}")
+        
+        offset = skipped + len(invalid)
+        done = 0
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = [executor.submit(self.import_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                for file_path, success, error in future.result():
+                    done += 1
+                    print(f"[{offset + done}/{total_files}] ", end="")
+                    self.record_result(file_path, success, error)
+                
+                elapsed = time.time() - start_time
+                rate = done / elapsed if elapsed > 0 else 0.0
+                eta = (len(workflow_files) - done) / rate if rate else 0.0
+                print(f"📈 {offset + done}/{total_files} · {rate:.1f} workflows/s · "
+                      f"elapsed {format_duration(elapsed)} · ETA {format_duration(eta)}")
+        finally:
+            # On Ctrl-C or a crash, drop queued batches and keep what finished
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.category_store.flush()
         
         # Summary
         print("\n" + "=" * 50)
@@ -163,16 +396,17 @@ class WorkflowImporter:
             "success": self.failed_count == 0,
             "imported": self.imported_count,
             "failed": self.failed_count,
+            "skipped": skipped,
             "total": total_files,
             "errors": self.errors
         }
 
 
-def check_n8n_available() -> bool:
+def check_n8n_available(npx: str = DEFAULT_NPX) -> bool:
     """Check if n8n CLI is available."""
     try:
         result = subprocess.run(
-            ['npx', 'n8n', '--version'], 
+            [npx, 'n8n', '--version'], 
             capture_output=True, text=True, timeout=10
         )
         return result.returncode == 0
@@ -182,18 +416,33 @@ def check_n8n_available() -> bool:
 
 def main():
     """Main entry point."""
+    import argparse
+    
     sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description='Import workflows into n8n')
+    parser.add_argument('--dir', default=None, help='Directory containing workflow JSON files (default: workflows)')
+    parser.add_argument('--db', default=None, help='Database holding the import ledger (default: WORKFLOW_DB_PATH or workflows.db)')
+    parser.add_argument('--batch-size', type=int, default=50,
+                        help='Workflows per n8n process (1 imports files one at a time)')
+    parser.add_argument('--workers', type=int, default=1, help='Concurrent n8n import processes')
+    parser.add_argument('--npx', default=DEFAULT_NPX, help='npx command (default: $N8N_NPX or npx)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-import workflows already recorded in the import ledger')
+    args = parser.parse_args()
+    
     print("🔧 N8N Workflow Importer")
     print("=" * 40)
     
     # Check if n8n is available
-    if not check_n8n_available():
+    if not check_n8n_available(args.npx):
         print("❌ n8n CLI not found. Please install n8n first:")
         print("   npm install -g n8n")
         sys.exit(1)
     
     # Create importer and run
-    importer = WorkflowImporter()
+    importer = WorkflowImporter(args.dir, batch_size=args.batch_size,
+                                workers=args.workers, npx=args.npx,
+                                db=WorkflowDatabase(args.db), force=args.force)
     result = importer.import_all()
     
     # Exit with appropriate code
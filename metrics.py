@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Lightweight in-process metrics for the indexer and the API.
+
+Stage timers feed a histogram per stage (sql, decode, pydantic, resolve,
+json_load, ...) and, during an HTTP request, a per-request total that the
+``ServerTimingMiddleware`` reports in the ``Server-Timing`` header.
+Counters cover indexing and cache hit rates. ``render()`` produces the
+Prometheus text exposition format served at ``/metrics``.
+
+Recording costs a few microseconds, so it stays on by default; set
+``WORKFLOW_METRICS=0`` to disable it. Metrics are per process, so with
+``--workers`` > 1 each scrape sees the worker that answered it.
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKET_LABELS = tuple(f'le="{bound:g}"' for bound in BUCKETS) + ('le="+Inf"',)
+
+HELP = {
+    'workflow_stage_seconds': ('histogram', 'Time spent per processing stage'),
+    'workflow_http_request_seconds': ('histogram', 'HTTP request latency by route'),
+    'workflow_index_files_total': ('counter', 'Workflow files seen by the indexer, by result'),
+    'workflow_index_bytes_read_total': ('counter', 'Bytes of workflow JSON read by the indexer'),
+    'workflow_cache_requests_total': ('counter', 'In-process cache lookups, by cache and result'),
+    'workflow_index_generation': ('gauge', 'Current index generation'),
+}
+
+# Stage totals (ms) for the request being handled; None outside a request
+_request_timings: contextvars.ContextVar = contextvars.ContextVar('request_timings', default=None)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class _Timer:
+    __slots__ = ('registry', 'stage', 'start')
+
+    def __init__(self, registry: 'Metrics', stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe_stage(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and latency histograms."""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = _env_flag('WORKFLOW_METRICS', True) if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple], _Histogram] = {}
+        self._stage_keys: Dict[str, Tuple[str, Tuple]] = {}
+
+    def timer(self, stage: str):
+        """Context manager timing one stage: ``with metrics.timer('sql'): ...``"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe_stage(self, stage: str, seconds: float):
+        key = self._stage_keys.get(stage)
+        if key is None:
+            key = self._stage_keys[stage] = ('workflow_stage_seconds', (('stage', stage),))
+        self._observe(key, seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            # Executor threads working for one request share its dict
+            with self._lock:
+                timings[stage] = timings.get(stage, 0.0) + seconds * 1000
+
+    def observe(self, name: str, seconds: float, **labels):
+        if self.enabled:
+            self._observe((name, tuple(sorted(labels.items()))), seconds)
+
+    def _observe(self, key: Tuple[str, Tuple], seconds: float):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.counts[index] += 1
+            histogram.total += seconds
+            histogram.count += 1
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def cache(self, cache: str, hit: bool):
+        """Count one lookup in a named in-process cache."""
+        if not self.enabled:
+            return
+        key = ('workflow_cache_requests_total', (('cache', cache), ('result', 'hit' if hit else 'miss')))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: (list(h.counts), h.total, h.count) for key, h in self._histograms.items()}
+
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described:
+                described.add(name)
+                kind, text = HELP.get(name, ('untyped', name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            describe(name)
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), value in sorted(gauges.items()):
+            describe(name)
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            describe(name)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_LABELS[:-1], counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels(labels, bound)} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, BUCKET_LABELS[-1])} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by the database and the API
+metrics = Metrics()
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding a ``Server-Timing`` header with per-stage totals
+    and recording request latency per route template."""
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                elapsed = (time.perf_counter() - start) * 1000
+                with self.registry._lock:
+                    # Batch readers may still be adding to it
+                    stages = list(timings.items())
+                entries = [f"{stage};dur={ms:.2f}" for stage, ms in stages]
+                entries.append(f"total;dur={elapsed:.2f}")
+                message = dict(message)
+                message['headers'] = list(message.get('headers', [])) + [
+                    (b'server-timing', ", ".join(entries).encode('latin-1'))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            # Route templates keep label cardinality bounded (no filenames)
+            route = (getattr(scope.get('route'), 'path', None)
+                     or getattr(scope.get('endpoint'), '__name__', None) or 'unmatched')
+            self.registry.observe('workflow_http_request_seconds', time.perf_counter() - start,
+                                  route=route, status=str(status))
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Query plan and slow-query profiler for WorkflowDatabase.
+
+With profiling on (``WORKFLOW_PROFILE_QUERIES=1`` or ``--profile-queries``)
+every connection is a ``ProfilingConnection``. Each distinct query shape
+(whitespace collapsed, LIMIT/OFFSET and IN lists parameterized) gets its
+``EXPLAIN QUERY PLAN`` captured once, plus call count and wall time. SELECT
+results are fetched inside the timing so the figures include row
+production, not just the first step. Queries slower than
+``WORKFLOW_SLOW_QUERY_MS`` (default 50) are logged with their plan.
+
+``suggest_index()`` reads a plan for full scans of ``workflows`` and
+temporary sort B-trees, and proposes an index on the query's equality
+filters followed by its ORDER BY columns. ``verify_suggestion()`` tries it
+on an in-memory copy of the database.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_SLOW_QUERY_MS = 50.0
+
+# Statements worth profiling; PRAGMA/BEGIN/COMMIT and DDL are skipped
+PROFILED_PREFIXES = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Replayed by ``workflow_db.py --profile-queries``: (method, kwargs)
+PROFILE_QUERY_MIX = [
+    ('search_workflows', {}),
+    ('search_workflows', {'offset': 100}),
+    ('search_workflows', {'trigger_filter': 'Webhook'}),
+    ('search_workflows', {'trigger_filter': 'Scheduled', 'complexity_filter': 'high'}),
+    ('search_workflows', {'complexity_filter': 'medium', 'offset': 40}),
+    ('search_workflows', {'active_only': True}),
+    ('search_workflows', {'query': 'telegram'}),
+    ('search_workflows', {'query': 'slack notification', 'trigger_filter': 'Webhook'}),
+    ('search_workflows', {'query': 'openai', 'complexity_filter': 'high'}),
+    ('search_workflows', {'query': 'googl'}),
+    ('search_workflows', {'query': 'gmial'}),
+    ('search_by_category', {'category': 'messaging'}),
+    ('search_by_category', {'category': 'ai_ml', 'offset': 20}),
+    ('get_stats', {}),
+]
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"IN \((?:\?, ?)+\?\)", re.IGNORECASE)
+_LIMIT = re.compile(r"LIMIT \d+ OFFSET \d+", re.IGNORECASE)
+_TABLE = re.compile(r"\b(?:FROM|JOIN)\s+workflows\b(?:\s+(?:AS\s+)?(?!WHERE|JOIN|ON|ORDER|LIMIT|GROUP)(\w+))?",
+                    re.IGNORECASE)
+_EQUALITY = re.compile(r"(?:\b(\w+)\.)?\b(\w+)\s*=\s*(?:\?|\d+)")
+_ORDER_BY = re.compile(r"\bORDER BY\s+(.+?)(?:\s+LIMIT\b|\)|$)", re.IGNORECASE)
+
+
+def query_shape(sql: str) -> str:
+    """Normalize SQL so the same query with other values maps to one shape."""
+    shape = _WHITESPACE.sub(" ", sql).strip()
+    shape = _IN_LIST.sub("IN (?...)", shape)
+    return _LIMIT.sub("LIMIT ? OFFSET ?", shape)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name, '').strip()
+    return float(value) if value else default
+
+
+class QueryStats:
+    """Accumulated timings and the captured plan for one query shape."""
+
+    __slots__ = ('shape', 'sql', 'params', 'plan', 'calls', 'total_ms', 'max_ms', 'slow')
+
+    def __init__(self, shape: str, sql: str, params: Sequence, plan: List[str]):
+        self.shape = shape
+        self.sql = sql
+        self.params = params
+        self.plan = plan
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'shape': self.shape,
+            'calls': self.calls,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'slow': self.slow,
+            'plan': self.plan,
+            'issues': plan_issues(self.plan),
+        }
+
+
+class QueryProfiler:
+    """Per-shape plans and timings, shared by all connections of a database."""
+
+    def __init__(self, slow_ms: Optional[float] = None, log_slow: bool = True):
+        self.slow_ms = _env_float('WORKFLOW_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS) if slow_ms is None else slow_ms
+        self.log_slow = log_slow
+        self.shapes: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stats: QueryStats, seconds: float):
+        elapsed_ms = seconds * 1000
+        with self._lock:
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            slow = elapsed_ms >= self.slow_ms
+            if slow:
+                stats.slow += 1
+        if slow and self.log_slow:
+            print(f"🐢 Slow query ({elapsed_ms:.1f} ms): {stats.shape[:300]}")
+            for line in stats.plan:
+                print(f"     {line}")
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Shapes ordered by total time, with plan issues."""
+        with self._lock:
+            shapes = sorted(self.shapes.values(), key=lambda s: s.total_ms, reverse=True)
+            return [s.as_dict() for s in shapes]
+
+    def reset(self):
+        with self._lock:
+            self.shapes.clear()
+
+
+class _FetchedCursor:
+    """Cursor stand-in over rows that were already fetched for timing."""
+
+    def __init__(self, cursor: sqlite3.Cursor, rows: List[Any]):
+        self.description = cursor.description
+        self.rowcount = cursor.rowcount
+        self.lastrowid = cursor.lastrowid
+        self._rows = rows
+        self._position = 0
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchmany(self, size: int = 1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._rows = []
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """sqlite3 connection that reports each statement to ``self.profiler``."""
+
+    profiler: Optional[QueryProfiler] = None
+
+    def execute(self, sql, parameters=()):
+        profiler = self.profiler
+        keyword = sql.lstrip()[:7].upper()
+        if profiler is None or not keyword.startswith(PROFILED_PREFIXES):
+            return super().execute(sql, parameters)
+
+        shape = query_shape(sql)
+        stats = profiler.shapes.get(shape)
+        if stats is None:
+            plan = explain(self, sql, parameters)
+            with profiler._lock:
+                stats = profiler.shapes.setdefault(shape, QueryStats(shape, sql, parameters, plan))
+
+        start = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        if keyword.startswith(('SELECT', 'WITH')):
+            cursor = _FetchedCursor(cursor, cursor.fetchall())
+        profiler.record(stats, time.perf_counter() - start)
+        return cursor
+
+
+def explain(conn: sqlite3.Connection, sql: str, parameters: Sequence = ()) -> List[str]:
+    """``EXPLAIN QUERY PLAN`` detail lines, indented by nesting depth."""
+    try:
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    except sqlite3.Error as e:
+        return [f"(plan unavailable: {e})"]
+    depth = {0: -1}
+    lines = []
+    for row in rows:
+        node, parent, detail = row[0], row[1], row[3]
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+def plan_issues(plan: List[str]) -> List[str]:
+    """Full table scans and temporary sorts in a plan."""
+    issues = []
+    for line in plan:
+        detail = line.strip()
+        if detail.startswith("SCAN ") and "VIRTUAL TABLE" not in detail and "COVERING INDEX" not in detail:
+            issues.append(f"full scan: {detail}")
+        elif detail.startswith("USE TEMP B-TREE"):
+            issues.append(f"temporary sort: {detail}")
+        elif "VIRTUAL TABLE INDEX" in detail and ":=" in detail:
+            # FTS5 idxStr starting with '=' means a rowid lookup per outer row:
+            # the join runs from workflows into the full-text index
+            issues.append(f"per-row full-text lookup: {detail}")
+    return issues
+
+
+def _workflow_columns(conn: sqlite3.Connection) -> set:
+    return {row[1] for row in sqlite3.Connection.execute(conn, "PRAGMA table_info(workflows)")}
+
+
+def suggest_index(conn: sqlite3.Connection, sql: str, plan: List[str]) -> Optional[str]:
+    """CREATE INDEX for a workflows query whose plan scans or sorts, if one can help.
+
+    Equality-filtered columns come first, then the ORDER BY columns with
+    their direction, so SQLite can both narrow and read rows in order and
+    stop after LIMIT rows. Leading-wildcard LIKE filters and FTS rank
+    ordering cannot use a B-tree index, so they get no suggestion.
+    """
+    issues = plan_issues(plan)
+    tables = _TABLE.findall(sql)
+    if not issues or not tables:
+        return None
+    aliases = {alias or 'workflows' for alias in tables} | {'workflows'}
+    columns = _workflow_columns(conn)
+
+    equality = []
+    for alias, column in _EQUALITY.findall(sql):
+        if (not alias or alias in aliases) and column in columns and column not in equality and column != 'id':
+            equality.append(column)
+
+    ordering = []
+    sorts = any(issue.startswith("temporary sort") and "ORDER BY" in issue for issue in issues)
+    match = _ORDER_BY.search(sql)
+    if sorts and match:
+        for term in match.group(1).split(","):
+            parts = term.strip().split()
+            column = parts[0].split(".")[-1]
+            if column not in columns:
+                # Ordering by a computed value (e.g. bm25 rank): no index helps
+                ordering = []
+                break
+            direction = " DESC" if len(parts) > 1 and parts[1].upper() == "DESC" else ""
+            ordering.append(column + direction)
+        # The rowid is always the last key of an index; naming it is only
+        # needed for direction
+        if ordering and ordering[-1] == "id":
+            ordering.pop()
+
+    if not ordering and not equality:
+        return None
+    if not ordering and not any(issue.startswith("full scan") for issue in issues):
+        return None
+    keys = equality + ordering
+    name = "idx_workflows_" + "_".join(key.split()[0] for key in keys)
+    return f"CREATE INDEX {name} ON workflows({', '.join(keys)})"
+
+
+def verify_suggestion(db_path: str, sql: str, parameters: Sequence, index_sql: str,
+                      repeat: int = 5) -> Dict[str, Any]:
+    """Plan and best-of-``repeat`` time before and after adding an index, on an
+    in-memory copy so the real database is untouched."""
+    source = sqlite3.connect(db_path)
+    memory = sqlite3.connect(":memory:")
+    try:
+        source.backup(memory)
+    finally:
+        source.close()
+
+    def measure():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            memory.execute(sql, parameters).fetchall()
+            best = min(best, time.perf_counter() - start)
+        return round(best * 1000, 3)
+
+    try:
+        before = {'plan': explain(memory, sql, parameters), 'ms': measure()}
+        memory.execute(index_sql)
+        memory.execute("ANALYZE")
+        after = {'plan': explain(memory, sql, parameters), 'ms': measure()}
+    finally:
+        memory.close()
+    return {'index': index_sql, 'before': before, 'after': after}
+
+
+def replay_query_mix(db, rounds: int = 3):
+    """Run PROFILE_QUERY_MIX against a WorkflowDatabase ``rounds`` times."""
+    for _ in range(rounds):
+        for method, kwargs in PROFILE_QUERY_MIX:
+            getattr(db, method)(**kwargs)
+
+
+def print_profile(db, rounds: int = 3, verify: bool = True):
+    """Replay the query mix on a profiled database and print shapes, plans and suggestions."""
+    replay_query_mix(db, rounds)
+    report = db.profiler.report()
+    print(f"📊 {len(report)} query shapes, {sum(entry['calls'] for entry in report)} calls "
+          f"({rounds} rounds of {len(PROFILE_QUERY_MIX)} operations)\n")
+
+    suggestions = {}
+    conn = sqlite3.connect(db.db_path)
+    try:
+        for entry in report:
+            print(f"{entry['total_ms']:9.2f} ms total  {entry['mean_ms']:8.3f} ms mean  "
+                  f"{entry['calls']:4d} calls  {entry['shape'][:150]}")
+            for line in entry['plan']:
+                print(f"      {line}")
+            for issue in entry['issues']:
+                if issue.startswith("per-row"):
+                    print(f"      ⚠️  {issue}")
+            stats = db.profiler.shapes[entry['shape']]
+            index_sql = suggest_index(conn, stats.sql, entry['plan'])
+            if index_sql:
+                suggestions.setdefault(index_sql, stats)
+                print(f"      💡 {index_sql}")
+    finally:
+        conn.close()
+
+    if not suggestions:
+        print("\n✅ No missing indexes found")
+        return
+    print(f"\n💡 {len(suggestions)} suggested indexes:")
+    for index_sql, stats in suggestions.items():
+        if not verify:
+            print(f"  {index_sql};")
+            continue
+        result = verify_suggestion(db.db_path, stats.sql, stats.params, index_sql)
+        print(f"  {index_sql};  -- {result['before']['ms']} ms -> {result['after']['ms']} ms")
+        for line in result['after']['plan']:
+            print(f"        {line}")
@@ -18,22 +18,9 @@ def print_banner():
 
 def check_requirements() -> bool:
     """Check if required dependencies are installed."""
-    missing_deps = []
-    
-    try:
-        import sqlite3
-    except ImportError:
-        missing_deps.append("sqlite3")
-    
-    try:
-        import uvicorn
-    except ImportError:
-        missing_deps.append("uvicorn")
-    
-    try:
-        import fastapi
-    except ImportError:
-        missing_deps.append("fastapi")
+    # find_spec locates the packages without paying for importing them here
+    from importlib.util import find_spec
+    missing_deps = [name for name in ("sqlite3", "uvicorn", "fastapi") if find_spec(name) is None]
     
     if missing_deps:
         print(f"❌ Missing dependencies: {', '.join(missing_deps)}")
@@ -61,11 +48,12 @@ def setup_database(force_reindex: bool = False) -> str:
     db_path = "database/workflows.db"
     
     print(f"🔄 Setting up database: {db_path}")
+    # Applies any pending schema migrations once, before server workers start
     db = WorkflowDatabase(db_path)
     
-    # Check if database has data or force reindex
-    stats = db.get_stats()
-    if stats['total'] == 0 or force_reindex:
+    # Only block startup when there is nothing to serve yet; a stale index is
+    # refreshed in the background by the server
+    if force_reindex or not db.has_workflows():
         print("📚 Indexing workflows...")
         index_stats = db.index_all_workflows(force_reindex=True)
         print(f"✅ Indexed {index_stats['processed']} workflows")
@@ -73,17 +61,26 @@ def setup_database(force_reindex: bool = False) -> str:
         # Show final stats
         final_stats = db.get_stats()
         print(f"📊 Database contains {final_stats['total']} workflows")
+    elif db.is_index_current():
+        print(f"✅ Database ready: {db.get_manifest().get('corpus_files')} workflows (unchanged since last index)")
     else:
-        print(f"✅ Database ready: {stats['total']} workflows")
+        print("🔄 Workflow files changed; the server will reindex in the background")
     
     return db_path
 
 
-def start_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
-    """Start the FastAPI server."""
+def start_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False, workers: int = 1):
+    """Start the FastAPI server.
+    
+    With ``workers > 1`` this process stays the designated indexer: it
+    refreshes a stale index in a background thread while the uvicorn
+    workers serve queries from read-only connections.
+    """
     print(f"🌐 Starting server at http://{host}:{port}")
     print(f"📊 API Documentation: http://{host}:{port}/docs")
     print(f"🔍 Workflow Search: http://{host}:{port}/api/workflows")
+    if workers > 1:
+        print(f"👥 Workers: {workers} read-only query processes + 1 indexer")
     print()
     print("Press Ctrl+C to stop the server")
     print("-" * 50)
@@ -91,6 +88,14 @@ def start_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False
     # Configure database path
     os.environ['WORKFLOW_DB_PATH'] = "database/workflows.db"
     
+    if workers > 1:
+        from workflow_db import WorkflowDatabase
+        os.environ['WORKFLOW_DB_READONLY'] = '1'
+        indexer = WorkflowDatabase("database/workflows.db", read_only=False)
+        manifest = indexer.get_manifest()
+        if not indexer.is_index_current(manifest):
+            indexer.start_background_reindex(force_reindex=indexer.needs_full_reindex(manifest))
+    
     # Start uvicorn with better configuration
     import uvicorn
     uvicorn.run(
@@ -98,6 +103,7 @@ def start_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False
         host=host, 
         port=port, 
         reload=reload,
+        workers=workers if not reload else None,
         log_level="info",
         access_log=False  # Reduce log noise
     )
@@ -116,6 +122,7 @@ Examples:
   python run.py --host 0.0.0.0     # Accept external connections
   python run.py --reindex          # Force database reindexing
   python run.py --dev              # Development mode with auto-reload
+  python run.py --workers 4        # 4 read-only query workers + indexer
         """
     )
     
@@ -140,6 +147,12 @@ Examples:
         action="store_true", 
         help="Development mode with auto-reload"
     )
+    parser.add_argument(
+        "--workers", 
+        type=int, 
+        default=int(os.environ.get("WORKERS", "1")), 
+        help="Number of uvicorn worker processes (default: $WORKERS or 1)"
+    )
     
     args = parser.parse_args()
     
@@ -164,7 +177,8 @@ Examples:
         start_server(
             host=args.host, 
             port=args.port, 
-            reload=args.dev
+            reload=args.dev,
+            workers=args.workers
         )
     except KeyboardInterrupt:
         print("\n👋 Server stopped!")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Search query parsing for the workflow FTS indexes.
+Turns raw search box input into safe FTS5 MATCH expressions and suggests
+spelling corrections from the index vocabulary.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Columns of workflows_fts that may be addressed as ``column:value``
+FTS_COLUMNS = ('filename', 'name', 'description', 'integrations', 'tags')
+
+# Same token boundaries as the FTS5 unicode61 tokenizer (underscore separates)
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Quoted phrases, column filters and bare words, in that order of precedence
+TERM_PATTERN = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+
+MIN_TRIGRAM_TOKEN = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase tokens the way the FTS index does."""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+def quote(text: str) -> str:
+    """Quote a string as an FTS5 phrase, escaping embedded quotes."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def parse_query(query: str) -> List[Tuple[Optional[str], str, bool]]:
+    """Parse raw input into ``(column, text, is_phrase)`` terms.
+
+    Unknown ``column:`` prefixes are treated as part of the text, and
+    punctuation-only terms are dropped, so no input can produce an FTS5
+    syntax error.
+    """
+    terms = []
+    for match in TERM_PATTERN.finditer(query):
+        column, phrase, word = match.groups()
+        if column and column.lower() not in FTS_COLUMNS:
+            # Not a column filter: keep "foo:bar" as plain text
+            word = f"{column}:{phrase if phrase is not None else word}"
+            column, phrase = None, None
+        column = column.lower() if column else None
+
+        if phrase is not None:
+            if tokenize(phrase):
+                terms.append((column, phrase, True))
+        else:
+            for token in tokenize(word):
+                terms.append((column, token, False))
+    return terms
+
+
+def _match_expressions(terms: List[Tuple[Optional[str], str, bool]], prefix: str) -> List[str]:
+    """One MATCH expression per parsed term; see build_match_query for ``prefix``."""
+    parts = []
+    for position, (column, text, is_phrase) in enumerate(terms):
+        expression = quote(text)
+        is_last = position == len(terms) - 1
+        if not is_phrase and (prefix == "all" or (prefix == "last" and is_last)):
+            expression += '*'
+        if column:
+            expression = f"{column} : {expression}"
+        parts.append(expression)
+    return parts
+
+
+def build_match_query(query: str, prefix: str = "last") -> str:
+    """Build an FTS5 MATCH expression from raw input.
+
+    ``prefix`` selects which bare words become prefix queries: ``"last"``
+    (the word still being typed), ``"all"`` or ``"none"``.
+    """
+    return " ".join(_match_expressions(parse_query(query), prefix))
+
+
+def build_deep_match_query(query: str, prefix: str = "last") -> Tuple[str, str]:
+    """Split raw input for a deep search into ``(text, filters)`` MATCH expressions.
+
+    The deep index only has the columns name and content, so ``column:value``
+    filters go into ``filters``, to be matched against workflows_fts, and the
+    remaining words into ``text``, to be matched against the deep index.
+    Either may be empty.
+    """
+    terms = parse_query(query)
+    parts = _match_expressions(terms, prefix)
+    text = [part for part, (column, _, _) in zip(parts, terms) if not column]
+    filters = [part for part, (column, _, _) in zip(parts, terms) if column]
+    return " ".join(text), " ".join(filters)
+
+
+def build_trigram_query(query: str) -> str:
+    """Build a substring MATCH expression for the trigram-tokenized index."""
+    parts = []
+    for column, text, is_phrase in parse_query(query):
+        if len(text) < MIN_TRIGRAM_TOKEN:
+            continue  # trigram tokenizer cannot match shorter strings
+        expression = quote(text)
+        if column:
+            expression = f"{column} : {expression}"
+        parts.append(expression)
+    return " ".join(parts)
+
+
+def trigrams(term: str) -> set:
+    """Padded character trigrams of a term."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Vocabulary:
+    """Index-time vocabulary with a trigram inverted index for corrections."""
+
+    def __init__(self, terms: Iterable[Tuple[str, int]], generation: Optional[int] = None):
+        self.generation = generation
+        self.doc_counts: Dict[str, int] = {}
+        self.postings: Dict[str, List[str]] = {}
+        for term, doc_count in terms:
+            if term.isdigit():
+                continue
+            self.doc_counts[term] = doc_count
+            for gram in trigrams(term):
+                self.postings.setdefault(gram, []).append(term)
+
+    def correct_token(self, token: str, min_similarity: float = 0.8) -> Optional[str]:
+        """Best vocabulary term for a token that is not in the vocabulary."""
+        if token in self.doc_counts or token.isdigit() or len(token) < MIN_TRIGRAM_TOKEN:
+            return None
+
+        shared: Dict[str, int] = {}
+        for gram in trigrams(token):
+            for term in self.postings.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        # Only score the candidates sharing the most trigrams
+        candidates = sorted(shared, key=shared.get, reverse=True)[:50]
+        best, best_score = None, min_similarity
+        for term in candidates:
+            similarity = SequenceMatcher(None, token, term).ratio()
+            # Prefer common terms when similarities tie
+            score = similarity + min(self.doc_counts[term], 1000) / 1e6
+            if similarity >= min_similarity and score > best_score:
+                best, best_score = term, score
+        return best
+
+    def suggest(self, query: str) -> Optional[str]:
+        """Suggest a corrected query, or None if every token is known."""
+        changed = False
+        corrected = []
+        for token in tokenize(query):
+            replacement = self.correct_token(token)
+            if replacement:
+                changed = True
+            corrected.append(replacement or token)
+        return " ".join(corrected) if changed else None
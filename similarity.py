@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate workflow detection with MinHash and LSH banding.
+Signatures are computed over node-type and connection shingles, so workflows
+with the same structure match even when names and parameters differ.
+"""
+
+import hashlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Set
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+
+def workflow_shingles(nodes: List[Dict], connections: Dict) -> Set[str]:
+    """Structural shingles: node types, typed edges and typed two-hop paths."""
+    types = {}
+    shingles = set()
+    type_counts: Dict[str, int] = {}
+    for node in nodes:
+        if not isinstance(node, dict):
+            continue
+        node_type = node.get('type', '')
+        types[node.get('name', '')] = node_type
+        type_counts[node_type] = type_counts.get(node_type, 0) + 1
+        # Repeated node types are distinct shingles so counts matter
+        shingles.add(f"n:{node_type}#{type_counts[node_type]}")
+
+    edges: Dict[str, List[str]] = {}
+    if isinstance(connections, dict):
+        for source, outputs in connections.items():
+            if not isinstance(outputs, dict):
+                continue
+            for kind, branches in outputs.items():
+                for branch in branches if isinstance(branches, list) else []:
+                    for target in branch if isinstance(branch, list) else []:
+                        if isinstance(target, dict) and target.get('node') in types:
+                            edges.setdefault(source, []).append(target['node'])
+                            shingles.add(f"e:{kind}:{types.get(source, '')}>{types[target['node']]}")
+
+    for source, targets in edges.items():
+        for middle in targets:
+            for target in edges.get(middle, ()):
+                shingles.add(f"p:{types.get(source, '')}>{types[middle]}>{types[target]}")
+    return shingles
+
+
+def _shingle_hashes(shingle: str) -> array:
+    """NUM_PERM independent 32-bit hashes of one shingle from a single XOF call."""
+    return array('I', hashlib.shake_128(shingle.encode('utf-8')).digest(NUM_PERM * 4))
+
+
+def minhash_signature(shingles: Iterable[str]) -> Optional[List[int]]:
+    """MinHash signature of a shingle set, or None for an empty set, which
+    has no structure to compare (and would otherwise match every other one).
+    
+    Each of the NUM_PERM hash functions is one 32-bit lane of a SHAKE-128
+    output, and the column-wise minimum is taken with zip/min in C.
+    """
+    rows = [_shingle_hashes(shingle) for shingle in shingles]
+    if not rows:
+        return None
+    return [min(column) for column in zip(*rows)]
+
+
+def lsh_buckets(signature: List[int]) -> List[str]:
+    """One bucket key per band; workflows sharing any bucket are candidates."""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(array('I', rows).tobytes(), digest_size=8).hexdigest()
+        buckets.append(f"{band}:{digest}")
+    return buckets
+
+
+def estimate_similarity(first: List[int], second: List[int]) -> float:
+    """Estimated Jaccard similarity of the underlying shingle sets."""
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERM
+
+
+def pack_signature(signature: List[int]) -> bytes:
+    return array('I', signature).tobytes()
+
+
+def unpack_signature(blob: bytes) -> List[int]:
+    signature = array('I')
+    signature.frombytes(blob)
+    return signature.tolist()
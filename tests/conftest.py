@@ -0,0 +1,52 @@
+"""
+Shared fixtures: a small workflow corpus copied from the repository, an
+index built from it in a temporary directory, and an in-process API client.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# Keep any database opened with the default path out of the repo
+os.environ.setdefault('WORKFLOW_DB_PATH', os.path.join(tempfile.mkdtemp(prefix='workflow-tests-'), 'api.db'))
+
+from benchmarks.asgi_client import ASGIClient  # noqa: E402
+from workflow_db import WorkflowDatabase  # noqa: E402
+
+SAMPLE_FILES = 12
+
+
+@pytest.fixture
+def workflows_dir(tmp_path):
+    """A few real workflows in category subfolders, as in workflows/."""
+    target = tmp_path / 'workflows'
+    sources = sorted((ROOT / 'workflows').rglob('*.json'))[:SAMPLE_FILES]
+    for source in sources:
+        destination = target / source.parent.name / source.name
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(source, destination)
+    return target
+
+
+@pytest.fixture
+def db(tmp_path, workflows_dir):
+    database = WorkflowDatabase(str(tmp_path / 'workflows.db'), use_bitmap_index=False, pack_path='')
+    database.workflows_dir = str(workflows_dir)
+    database.index_all_workflows(force_reindex=True)
+    return database
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    import api_server
+    monkeypatch.setattr(api_server, 'db', db)
+    # Startup creates the batch executor and ingester for this db
+    asgi_client = ASGIClient(api_server.app, lifespan=True)
+    yield asgi_client
+    asgi_client.close()
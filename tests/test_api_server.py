@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+from workflow_db import WorkflowDatabase
+
+
+def test_import_opens_no_database_or_threads(tmp_path):
+    db_path = tmp_path / 'import.db'
+    check = ("import threading, api_server; "
+             "assert api_server.db is None and api_server.batch_executor is None and api_server.ingester is None; "
+             "assert threading.active_count() == 1")
+    subprocess.run([sys.executable, '-c', check], cwd=ROOT, check=True,
+                   env={**os.environ, 'WORKFLOW_DB_PATH': str(db_path)})
+    assert not db_path.exists()
+
+
+def test_search_and_workflow_endpoints(client):
+    status, _, body = client.get('/api/workflows?q=telegram')
+    assert status == 200
+    results = json.loads(body)
+    assert results['total'] > 0
+    filename = results['workflows'][0]['filename']
+
+    status, _, body = client.get(f'/api/workflows/{filename}')
+    assert status == 200
+    assert json.loads(body)['metadata']['filename'] == filename
+
+    status, headers, body = client.get(f'/api/workflows/{filename}/download')
+    assert status == 200
+    assert 'nodes' in json.loads(body)
+
+    status, _, body = client.get(f'/api/workflows/{filename}/diagram')
+    assert status == 200
+    assert json.loads(body)['diagram'].startswith('graph')
+
+
+def test_missing_workflow_is_404(client):
+    for url in ('/api/workflows/missing.json', '/api/workflows/missing.json/download',
+                '/api/workflows/missing.json/diagram'):
+        assert client.get(url)[0] == 404
+
+
+def test_server_timing_and_metrics(client):
+    status, headers, _ = client.get('/api/workflows?q=telegram')
+    assert status == 200
+    stages = [entry.split(';')[0] for entry in headers['server-timing'].split(', ')]
+    assert 'sql' in stages and stages[-1] == 'total'
+
+    status, _, body = client.get('/metrics')
+    assert status == 200
+    assert b'workflow_http_request_seconds_count{route="/api/workflows",status="200"}' in body
+
+
+def post_json(client, url, payload):
+    return client.request('POST', url, json.dumps(payload).encode(), {'content-type': 'application/json'})
+
+
+def test_batch_streams_one_line_per_filename(client, db):
+    results, _ = db.search_workflows('', limit=3)
+    filenames = [result['filename'] for result in results] + ['missing.json']
+
+    status, headers, body = post_json(client, '/api/workflows/batch',
+                                      {'filenames': filenames, 'include_raw': True, 'include_diagram': True})
+
+    assert status == 200
+    assert headers['content-type'] == 'application/x-ndjson'
+    items = {item['filename']: item for item in map(json.loads, body.decode().splitlines())}
+    assert sorted(items) == sorted(filenames)
+    assert items['missing.json']['error'] == 'Workflow not found in database'
+    for filename in filenames[:-1]:
+        assert items[filename]['metadata']['filename'] == filename
+        assert 'nodes' in items[filename]['raw_json']
+        assert items[filename]['diagram'].startswith('graph')
+
+
+def test_batch_server_timing_includes_file_reads(client, db):
+    results, _ = db.search_workflows('', limit=2)
+    filenames = [result['filename'] for result in results]
+
+    status, headers, _ = post_json(client, '/api/workflows/batch', {'filenames': filenames, 'include_raw': True})
+
+    assert status == 200
+    stages = [entry.split(';')[0] for entry in headers['server-timing'].split(', ')]
+    assert 'sql' in stages and 'file_read' in stages
+
+
+def test_batch_rejects_empty_and_oversized_requests(client):
+    assert post_json(client, '/api/workflows/batch', {'filenames': []})[0] == 422
+    import api_server
+    too_many = [f'{number}.json' for number in range(api_server.BATCH_MAX_FILENAMES + 1)]
+    assert post_json(client, '/api/workflows/batch', {'filenames': too_many})[0] == 422
+
+
+def test_detail_handles_fts_syntax_in_filenames(client):
+    assert client.get('/api/workflows/a%22b%20OR%20c.json')[0] == 404
+
+
+def test_detail_splices_the_stored_bytes(client, db, workflows_dir):
+    path = sorted(workflows_dir.rglob('*.json'))[0]
+
+    status, _, body = client.get(f'/api/workflows/{path.name}')
+    assert status == 200
+    assert path.read_bytes() in body
+    assert json.loads(body)['raw_json'] == json.loads(path.read_bytes())
+
+    status, _, body = client.get(f'/api/workflows/{path.name}?include_raw=false')
+    assert set(json.loads(body)) == {'metadata'}
+    assert client.get(f'/api/workflows/{path.name}/raw')[2] == path.read_bytes()
+
+    # Edited since indexing: parsed and re-encoded, still valid JSON
+    path.write_text('{"nodes": [],\n "connections": {}}', encoding='utf-8')
+    status, _, body = client.get(f'/api/workflows/{path.name}')
+    assert json.loads(body)['raw_json'] == {'nodes': [], 'connections': {}}
+
+
+def test_export_streams_every_workflow(client, db, workflows_dir):
+    paths = sorted(workflows_dir.rglob('*.json'), key=lambda path: path.name)
+    missing = paths[0]
+    missing.unlink()
+
+    status, headers, body = client.get('/api/export?include_raw=true&include_graph=true')
+    assert status == 200
+    assert headers['content-type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in body.decode().splitlines()]
+    assert [row['filename'] for row in rows] == [path.name for path in paths]
+    assert 'error' in rows[0] and 'raw_json' not in rows[0]
+    assert rows[1]['raw_json'] == json.loads(paths[1].read_bytes())
+    assert 'nodes' in rows[1]['graph']
+
+    status, headers, body = client.get('/api/export?format=csv')
+    assert headers['content-type'].startswith('text/csv')
+    records = list(csv.DictReader(io.StringIO(body.decode())))
+    assert [record['filename'] for record in records] == [path.name for path in paths]
+
+    assert client.get('/api/export?format=xml')[0] == 422
+
+
+def test_reindex_starts_on_writable_database(client):
+    status, _, body = client.request('POST', '/api/reindex')
+    assert status == 200
+    assert json.loads(body)['message'] == "Reindexing started in background"
+
+
+def test_reindex_rejected_by_read_only_worker(db, client, monkeypatch):
+    import api_server
+    read_only = WorkflowDatabase(db.db_path, use_bitmap_index=False, read_only=True, pack_path='')
+    read_only.workflows_dir = db.workflows_dir
+    monkeypatch.setattr(api_server, 'db', read_only)
+    generation = db.get_index_generation()
+
+    status, _, body = client.request('POST', '/api/reindex?force=true')
+
+    assert status == 403
+    assert 'read-only' in json.loads(body)['detail']
+    assert db.get_index_generation() == generation
+
+
+def test_deep_search_with_column_filter(client, db, monkeypatch):
+    import api_server
+    deep = WorkflowDatabase(str(db.db_path) + '.deep', use_bitmap_index=False, deep_index=True, pack_path='')
+    deep.workflows_dir = db.workflows_dir
+    deep.index_all_workflows(force_reindex=True)
+    monkeypatch.setattr(api_server, 'db', deep)
+
+    for query in ('filename:telegram', 'filename:telegram chat'):
+        status, _, body = client.get(f'/api/workflows?q={query}&scope=deep')
+        assert status == 200, body
+        assert all('telegram' in workflow['filename'].lower() for workflow in json.loads(body)['workflows'])
@@ -0,0 +1,19 @@
+import json
+
+from benchmarks.corpus import generate_corpus
+from conftest import ROOT
+
+
+def test_corpus_is_deterministic_and_valid(tmp_path):
+    first = generate_corpus(str(tmp_path / 'first'), 30, source_dir=str(ROOT / 'workflows'))
+    second = generate_corpus(str(tmp_path / 'second'), 30, source_dir=str(ROOT / 'workflows'))
+
+    paths = sorted(path.relative_to(first) for path in first.glob('*/*.json'))
+    assert len(paths) == 30
+    for path in paths:
+        data = json.loads((first / path).read_text(encoding='utf-8'))
+        assert data == json.loads((second / path).read_text(encoding='utf-8'))
+        names = {node['name'] for node in data['nodes'] if node.get('name')}
+        targets = {target['node'] for outputs in data['connections'].values()
+                   for branches in outputs.values() for branch in branches for target in branch}
+        assert targets <= names
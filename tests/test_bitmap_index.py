@@ -0,0 +1,34 @@
+import pytest
+
+from workflow_db import WorkflowDatabase
+
+
+@pytest.mark.parametrize('trigger_filter, complexity_filter, active_only', [
+    ('all', 'all', False),
+    ('Manual', 'all', False),
+    ('all', 'low', False),
+    ('Webhook', 'medium', False),
+    ('all', 'all', True),
+    ('Unknown', 'all', False),
+])
+def test_bitmap_index_matches_sql_filters(db, trigger_filter, complexity_filter, active_only):
+    bitmap = WorkflowDatabase(db.db_path, use_bitmap_index=True)
+
+    for limit, offset in ((50, 0), (3, 2)):
+        expected = db.search_workflows('', trigger_filter, complexity_filter, active_only, limit, offset)
+        actual = bitmap.search_workflows('', trigger_filter, complexity_filter, active_only, limit, offset)
+        assert [w['filename'] for w in actual[0]] == [w['filename'] for w in expected[0]]
+        assert actual[1] == expected[1]
+
+
+def test_bitmap_index_rebuilds_after_reindex(db, workflows_dir):
+    bitmap = WorkflowDatabase(db.db_path, use_bitmap_index=True)
+    bitmap.workflows_dir = str(workflows_dir)
+    index = bitmap.get_bitmap_index()
+    assert bitmap.get_bitmap_index() is index
+
+    bitmap.index_all_workflows(force_reindex=True)
+
+    rebuilt = bitmap.get_bitmap_index()
+    assert rebuilt is not index
+    assert rebuilt.count(rebuilt.all_bits) == index.count(index.all_bits)
@@ -0,0 +1,112 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from category_cache import CategoryCache, accepts_gzip
+
+
+def write_categories(tmp_path, text):
+    (tmp_path / 'search.json').write_text(text, encoding='utf-8')
+    return CategoryCache(tmp_path / 'search.json', tmp_path / 'unique.json')
+
+
+def test_categories_fall_back_to_search_file(tmp_path):
+    cache = write_categories(tmp_path, json.dumps([
+        {'filename': 'a.json', 'category': 'Sales'},
+        {'filename': 'b.json', 'category': ''},
+    ]))
+    cache.refresh()
+
+    assert cache.mappings == {'a.json': 'Sales', 'b.json': 'Uncategorized'}
+    assert cache.categories == ['Sales', 'Uncategorized']
+
+
+def test_missing_files_give_uncategorized(tmp_path):
+    cache = CategoryCache(tmp_path / 'search.json', tmp_path / 'unique.json')
+    cache.refresh()
+
+    assert cache.mappings == {}
+    assert json.loads(cache.categories_body.raw) == {'categories': ['Uncategorized']}
+
+
+def test_cache_reloads_when_a_file_changes(tmp_path):
+    cache = write_categories(tmp_path, json.dumps([{'filename': 'a.json', 'category': 'Sales'}]))
+    cache.refresh()
+    body = cache.mappings_body
+
+    cache.refresh()
+    assert cache.mappings_body is body
+
+    (tmp_path / 'unique.json').write_text(json.dumps(['Marketing', 'Sales']), encoding='utf-8')
+    cache.refresh()
+    assert cache.categories == ['Marketing', 'Sales']
+
+    path = tmp_path / 'search.json'
+    stat = path.stat()
+    path.write_text(json.dumps([{'filename': 'b.json', 'category': 'Marketing'}]), encoding='utf-8')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    cache.refresh()
+    assert cache.mappings == {'b.json': 'Marketing'}
+
+
+def test_body_is_precompressed(tmp_path):
+    cache = write_categories(tmp_path, json.dumps([{'filename': 'a.json', 'category': 'Sales'}]))
+    cache.refresh()
+
+    gzipped, encoding = cache.mappings_body.encoded('br, gzip')
+    assert encoding == 'gzip'
+    assert gzip.decompress(gzipped) == cache.mappings_body.raw
+    assert cache.mappings_body.encoded('identity') == (cache.mappings_body.raw, None)
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', True),
+    ('br, gzip;q=0.5', True),
+    ('*', True),
+    ('', False),
+    ('identity', False),
+    ('gzip;q=0', False),
+    ('GZIP;Q=0.0', False),
+    ('gzip;q=0, *', False),
+    ('*;q=0', False),
+])
+def test_accepts_gzip_honours_q_values(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def large_categories(tmp_path):
+    entries = [{'filename': f'{number:04d}_Workflow.json', 'category': 'Marketing'} for number in range(200)]
+    return write_categories(tmp_path, json.dumps(entries))
+
+
+@pytest.mark.parametrize('accept_encoding, encoded', [('gzip', True), ('gzip;q=0', False), ('', False)])
+def test_cached_response_has_one_vary_header(client, tmp_path, monkeypatch, accept_encoding, encoded):
+    import api_server
+    monkeypatch.setattr(api_server, 'category_cache', large_categories(tmp_path))
+
+    status, headers, body = client.get('/api/category-mappings', headers={'accept-encoding': accept_encoding})
+
+    assert status == 200
+    assert (headers.get('content-encoding') == 'gzip') is encoded
+    assert [value.strip() for value in headers['vary'].split(',')].count('Accept-Encoding') == 1
+    payload = json.loads(gzip.decompress(body) if encoded else body)
+    assert len(payload['mappings']) == 200
+
+
+def test_failed_first_load_is_retried(client, tmp_path, monkeypatch):
+    import api_server
+    cache = write_categories(tmp_path, '[{"filename": ')
+    monkeypatch.setattr(api_server, 'category_cache', cache)
+    assert client.get('/api/categories')[0] == 500
+
+    # Repaired without changing the modification time
+    path = tmp_path / 'search.json'
+    stat = path.stat()
+    path.write_text(json.dumps([{'filename': 'a.json', 'category': 'Sales'}]), encoding='utf-8')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    status, _, body = client.get('/api/categories')
+    assert status == 200
+    assert json.loads(body) == {'categories': ['Sales']}
@@ -0,0 +1,40 @@
+import pytest
+
+from corpus_pack import CorpusPack, build_pack
+from workflow_db import WorkflowDatabase
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib', 'zlib-dict'])
+def test_pack_round_trips_every_workflow(tmp_path, workflows_dir, compression):
+    output = str(tmp_path / 'workflows.pack')
+    summary = build_pack(str(workflows_dir), output, compression=compression)
+
+    pack = CorpusPack(output)
+    try:
+        paths = {path.name: path for path in workflows_dir.rglob('*.json')}
+        assert summary['entries'] == len(paths) == len(pack)
+        for name, path in paths.items():
+            assert pack.read(name) == path.read_bytes()
+        assert pack.read('missing.json') is None
+        assert pack.verify() == []
+    finally:
+        pack.close()
+
+
+def test_database_reads_through_the_pack(tmp_path, workflows_dir):
+    output = str(tmp_path / 'workflows.pack')
+    build_pack(str(workflows_dir), output, compression='zlib')
+    path = sorted(workflows_dir.rglob('*.json'))[0]
+    expected = path.read_bytes()
+    # The pack is the only source once configured
+    path.unlink()
+
+    db = WorkflowDatabase(str(tmp_path / 'packed.db'), use_bitmap_index=False, pack_path=output)
+    db.workflows_dir = str(workflows_dir)
+    stats = db.index_all_workflows(force_reindex=True)
+
+    assert stats['processed'] == len(CorpusPack(output))
+    assert db.read_workflow_bytes(path.name) == expected
+    assert db.get_by_filename(path.name) is not None
+    assert db.is_index_current()
+    assert db.index_all_workflows()['processed'] == 0
@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from create_categories import (AhoCorasick, CategoryEngine, categorize_by_filename, extract_tokens_from_filename,
+                               find_matching_category, load_def_categories)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope='module')
+def integration_to_category():
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        return load_def_categories()
+    finally:
+        os.chdir(cwd)
+
+
+def test_aho_corasick_reports_lowest_value():
+    matcher = AhoCorasick({'slack': 2, 'lack': 1, 'gmail': 0})
+
+    assert matcher.min_match('send_slack_message') == 1
+    assert matcher.min_match('gmail_to_slack') == 0
+    assert matcher.min_match('telegram') is None
+
+
+def test_engine_matches_per_file_categorization(integration_to_category):
+    engine = CategoryEngine(integration_to_category)
+    filenames = sorted(path.name for path in (ROOT / 'workflows').rglob('*.json'))
+
+    expected = []
+    for filename in filenames:
+        category = find_matching_category(extract_tokens_from_filename(filename), integration_to_category)
+        expected.append(category or categorize_by_filename(filename))
+
+    assert engine.categorize_all(filenames) == expected
+    assert any(expected)
+
+
+def test_integration_votes_decide_the_category(integration_to_category):
+    engine = CategoryEngine(integration_to_category)
+
+    assert engine.categorize_integrations(['Slack', 'Telegram', 'Hubspot']) == 'Communication & Messaging'
+    # Generic nodes only add a small vote
+    assert engine.categorize_integrations(['Hubspot', 'Webhook', 'Code']) == 'CRM & Sales'
+
+
+def test_integration_vote_falls_back_to_filename(integration_to_category):
+    engine = CategoryEngine(integration_to_category)
+
+    assert engine.categorize_integrations(['Unknownthing'], '0001_Foo_Telegram.json') == 'Communication & Messaging'
+    assert engine.categorize_integrations(['Unknownthing']) == ''
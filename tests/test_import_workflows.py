@@ -0,0 +1,139 @@
+import json
+import shutil
+
+from import_workflows import CategoryStore, WorkflowImporter
+from workflow_db import WorkflowDatabase
+
+
+def write_files(directory, count):
+    directory.mkdir()
+    for number in range(count):
+        workflow = {'name': f'Workflow {number}', 'nodes': [], 'connections': {}}
+        (directory / f'{number:04d}_Workflow.json').write_text(json.dumps(workflow), encoding='utf-8')
+
+
+def importer_db(tmp_path):
+    database = WorkflowDatabase(str(tmp_path / 'import.db'), use_bitmap_index=False)
+    database.workflows_dir = str(tmp_path / 'workflows')
+    return database
+
+
+def test_batches_share_one_n8n_process_and_name_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'context').mkdir()
+    write_files(tmp_path / 'workflows', 10)
+    (tmp_path / 'workflows' / '0010_Broken.json').write_text('{', encoding='utf-8')
+    calls = []
+
+    def run_n8n_import(importer, input_path, separate=False, timeout=None):
+        names = sorted(path.name for path in input_path.iterdir()) if separate else [input_path.name]
+        calls.append(names)
+        return not any('0003_Workflow.json' in name for name in names), "Failed"
+
+    monkeypatch.setattr(WorkflowImporter, 'run_n8n_import', run_n8n_import)
+    monkeypatch.setattr(WorkflowImporter, 'list_workflow_ids', lambda importer: set())
+    result = WorkflowImporter(batch_size=4, workers=2, db=importer_db(tmp_path)).import_all()
+
+    assert result['total'] == 11
+    assert result['imported'] == 9
+    assert result['failed'] == 2
+    assert any('0003_Workflow.json' in error for error in result['errors'])
+    assert any('0010_Broken.json' in error for error in result['errors'])
+    assert len(calls[0]) > 1
+    # Invalid workflows are rejected before any n8n process starts
+    assert not any('0010_Broken.json' in name for names in calls for name in names)
+
+
+def test_failed_batch_imports_every_other_workflow_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'context').mkdir()
+    write_files(tmp_path / 'workflows', 8)
+    # Like n8n, import files in order, upsert by id and stop at the first failure
+    stored = {}
+
+    def run_n8n_import(importer, input_path, separate=False, timeout=None):
+        for path in sorted(input_path.iterdir()) if separate else [input_path]:
+            if '0003_Workflow.json' in path.name:
+                return False, "Failed"
+            workflow = json.loads(path.read_text(encoding='utf-8'))
+            stored.setdefault(workflow['id'], []).append(path.name)
+        return True, ""
+
+    monkeypatch.setattr(WorkflowImporter, 'run_n8n_import', run_n8n_import)
+    monkeypatch.setattr(WorkflowImporter, 'list_workflow_ids', lambda importer: set(stored))
+    result = WorkflowImporter(batch_size=8, db=importer_db(tmp_path)).import_all()
+
+    assert result['imported'] == 7 and result['failed'] == 1
+    assert '0003_Workflow.json' in result['errors'][0]
+    assert len(stored) == 7
+    assert all(len(names) == 1 for names in stored.values())
+
+
+def test_rerun_imports_only_failed_and_edited_workflows(tmp_path, monkeypatch):
+    write_files(tmp_path / 'workflows', 5)
+    db = importer_db(tmp_path)
+    imported = []
+    interrupted = True
+
+    def run_n8n_import(importer, input_path, separate=False, timeout=None):
+        if input_path.name == '0003_Workflow.json' and interrupted:
+            return False, "Interrupted"
+        imported.append(input_path.name)
+        return True, ""
+
+    monkeypatch.setattr(WorkflowImporter, 'run_n8n_import', run_n8n_import)
+    categories = tmp_path / 'categories.json'
+
+    def run(**options):
+        imported.clear()
+        return WorkflowImporter(db=db, category_store=CategoryStore(categories, ledger=db, flush_every=2),
+                                **options).import_all()
+
+    assert run()['failed'] == 1
+    assert len(db.get_imported()) == 4
+
+    interrupted = False
+    second = run()
+    assert imported == ['0003_Workflow.json']
+    assert second['skipped'] == 4
+
+    edited = tmp_path / 'workflows' / '0001_Workflow.json'
+    edited.write_text(json.dumps({'name': 'Edited', 'nodes': [], 'connections': {}}), encoding='utf-8')
+    run()
+    assert imported == ['0001_Workflow.json']
+
+    run(force=True)
+    assert len(imported) == 5
+    entries = json.loads(categories.read_text(encoding='utf-8'))
+    assert sorted(entry['filename'] for entry in entries) == [f'{number:04d}_Workflow.json' for number in range(5)]
+
+
+def test_resume_imports_identical_workflows_under_each_filename(tmp_path, db, workflows_dir, monkeypatch):
+    original = sorted(workflows_dir.rglob('*.json'))[0]
+    copy = original.with_name('9001_Renamed_Copy.json')
+    shutil.copyfile(original, copy)
+    imported = []
+
+    def run_n8n_import(importer, input_path, separate=False, timeout=None):
+        # The first run is interrupted before the copy is imported
+        if input_path == copy and not resumed:
+            return False, "Interrupted"
+        imported.append(input_path.name)
+        return True, ""
+
+    monkeypatch.setattr(WorkflowImporter, 'run_n8n_import', run_n8n_import)
+    categories = tmp_path / 'search_categories.json'
+
+    resumed = False
+    first = WorkflowImporter(db=db, category_store=CategoryStore(categories, ledger=db)).import_all()
+    assert first['failed'] == 1 and copy.name not in imported
+
+    resumed = True
+    imported.clear()
+    second = WorkflowImporter(db=db, category_store=CategoryStore(categories, ledger=db)).import_all()
+
+    assert imported == [copy.name]
+    assert second['skipped'] == second['total'] - 1
+    ledger = db.get_imported()
+    assert (db.get_file_hash(str(copy)), original.name) in ledger
+    assert (db.get_file_hash(str(copy)), copy.name) in ledger
@@ -0,0 +1,27 @@
+from metrics import Metrics
+
+
+def test_registry_renders_prometheus_text():
+    registry = Metrics(enabled=True)
+    with registry.timer('sql'):
+        pass
+    registry.cache('vocabulary', hit=True)
+    registry.inc('workflow_index_files_total', 3, result='processed')
+    registry.set_gauge('workflow_index_generation', 7)
+
+    text = registry.render()
+
+    assert 'workflow_stage_seconds_count{stage="sql"} 1' in text
+    assert 'workflow_cache_requests_total{cache="vocabulary",result="hit"} 1' in text
+    assert 'workflow_index_files_total{result="processed"} 3' in text
+    assert 'workflow_index_generation 7' in text
+    assert 'workflow_stage_seconds_bucket{stage="sql",le="+Inf"} 1' in text
+
+
+def test_disabled_registry_records_nothing():
+    registry = Metrics(enabled=False)
+    with registry.timer('sql'):
+        pass
+    registry.inc('workflow_index_files_total')
+
+    assert registry.render() == "\n"
@@ -0,0 +1,34 @@
+import sqlite3
+
+from query_profiler import QueryProfiler, plan_issues, query_shape, suggest_index
+from workflow_db import WorkflowDatabase
+
+
+def test_query_shape_ignores_values():
+    assert query_shape("SELECT *\n  FROM workflows WHERE id IN (?, ?, ?) LIMIT 20 OFFSET 40") == \
+        "SELECT * FROM workflows WHERE id IN (?...) LIMIT ? OFFSET ?"
+
+
+def test_profiler_records_each_shape_with_its_plan(db):
+    profiler = QueryProfiler(slow_ms=0, log_slow=False)
+    profiled = WorkflowDatabase(db.db_path, use_bitmap_index=False, profiler=profiler)
+
+    profiled.search_workflows('telegram')
+    profiled.search_workflows('gmail')
+
+    report = profiler.report()
+    assert report and all(entry['plan'] for entry in report)
+    assert max(entry['calls'] for entry in report) >= 2
+    assert all(entry['slow'] == entry['calls'] for entry in report)
+
+
+def test_sorted_scan_gets_an_index_suggestion(db):
+    sql = "SELECT * FROM workflows WHERE trigger_type = ? ORDER BY analyzed_at DESC, id DESC LIMIT 20 OFFSET 0"
+    conn = sqlite3.connect(db.db_path)
+    try:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, ('Manual',))]
+        assert any(issue.startswith('temporary sort') for issue in plan_issues(plan))
+        assert suggest_index(conn, sql, plan) == \
+            "CREATE INDEX idx_workflows_trigger_type_analyzed_at_id ON workflows(trigger_type, analyzed_at DESC, id DESC)"
+    finally:
+        conn.close()
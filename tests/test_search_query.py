@@ -0,0 +1,39 @@
+from search_query import (Vocabulary, build_deep_match_query, build_match_query, build_trigram_query, parse_query,
+                          quote)
+
+
+def test_last_word_becomes_a_prefix():
+    assert build_match_query('slack notif') == '"slack" "notif"*'
+    assert build_match_query('slack notif', prefix='all') == '"slack"* "notif"*'
+    assert build_match_query('slack notif', prefix='none') == '"slack" "notif"'
+
+
+def test_fts_syntax_is_quoted():
+    assert build_match_query('AND OR (') == '"and" "or"*'
+    assert build_match_query('"unbalanced') == '"unbalanced"'
+    assert build_match_query('(*) ^') == ''
+    assert quote('say "hi"') == '"say ""hi"""'
+
+
+def test_column_filters():
+    assert build_match_query('name:openai') == 'name : "openai"*'
+    # Unknown prefixes are plain text
+    assert parse_query('http://example') == [(None, 'http', False), (None, 'example', False)]
+
+
+def test_deep_query_separates_column_filters():
+    assert build_deep_match_query('filename:slack xylophonic') == ('"xylophonic"*', 'filename : "slack"')
+    assert build_deep_match_query('xylophonic filename:slack') == ('"xylophonic"', 'filename : "slack"*')
+    assert build_deep_match_query('name:"daily digest"') == ('', 'name : "daily digest"')
+
+
+def test_trigram_query_drops_short_terms():
+    assert build_trigram_query('egram ab') == '"egram"'
+
+
+def test_vocabulary_suggests_corrections():
+    vocabulary = Vocabulary([('telegram', 10), ('slack', 5), ('notification', 7), ('2024', 3)])
+
+    assert vocabulary.suggest('telegarm') == 'telegram'
+    assert vocabulary.suggest('slak notificaton') == 'slack notification'
+    assert vocabulary.suggest('telegram') is None
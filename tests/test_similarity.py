@@ -0,0 +1,34 @@
+from similarity import (BANDS, estimate_similarity, lsh_buckets, minhash_signature, pack_signature,
+                        unpack_signature, workflow_shingles)
+
+
+def chain(*types, prefix='Node'):
+    nodes = [{'name': f'{prefix} {i}', 'type': node_type} for i, node_type in enumerate(types)]
+    connections = {
+        f'{prefix} {i}': {'main': [[{'node': f'{prefix} {i + 1}', 'type': 'main', 'index': 0}]]}
+        for i in range(len(types) - 1)
+    }
+    return nodes, connections
+
+
+def test_shingles_ignore_node_names():
+    first = workflow_shingles(*chain('webhook', 'set', 'slack'))
+    renamed = workflow_shingles(*chain('webhook', 'set', 'slack', prefix='Step'))
+
+    assert first == renamed
+    assert 'e:main:webhook>set' in first and 'p:webhook>set>slack' in first
+
+
+def test_signatures_estimate_jaccard_similarity():
+    same = minhash_signature(workflow_shingles(*chain('webhook', 'set', 'slack', 'gmail')))
+    close = minhash_signature(workflow_shingles(*chain('webhook', 'set', 'slack', 'telegram')))
+    other = minhash_signature(workflow_shingles(*chain('cron', 'postgres', 'airtable')))
+
+    assert estimate_similarity(same, same) == 1.0
+    assert estimate_similarity(same, close) > estimate_similarity(same, other)
+    assert len(lsh_buckets(same)) == BANDS
+    assert unpack_signature(pack_signature(same)) == same
+
+
+def test_empty_shingle_sets_have_no_signature():
+    assert minhash_signature(set()) is None
@@ -0,0 +1,378 @@
+import json
+import sqlite3
+
+import pytest
+
+import workflow_db
+
+from workflow_db import WorkflowDatabase, parse_bm25_weights
+
+
+def write_workflow(directory, filename, nodes, connections=None, **fields):
+    path = directory / 'Custom' / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+    workflow = {'name': filename[:-5], 'nodes': nodes, 'connections': connections or {}, **fields}
+    path.write_text(json.dumps(workflow), encoding='utf-8')
+    return path
+
+
+def filenames(results):
+    return [workflow['filename'] for workflow in results]
+
+
+def test_last_word_is_matched_as_a_prefix(db):
+    results, total = db.search_workflows('activecamp')
+
+    assert total == 1
+    assert filenames(results) == ['0057_Activecampaign_Create_Triggered.json']
+
+
+def test_substring_falls_back_to_trigram_index(db):
+    results, total = db.search_workflows('ctivecampaig')
+
+    assert total == 1
+    assert filenames(results) == ['0057_Activecampaign_Create_Triggered.json']
+
+
+@pytest.mark.parametrize('query', ['"unbalanced', 'AND OR (', '*', 'name:', 'NEAR(a b)'])
+def test_fts_syntax_in_input_does_not_raise(db, query):
+    db.search_workflows(query)
+
+
+def test_misspelled_query_gets_a_suggestion(db):
+    results, total = db.search_workflows('telegarm')
+
+    assert total == 0
+    assert db.suggest_query('telegarm') == 'telegram'
+
+
+def test_bm25_weights_parse_with_defaults():
+    weights = parse_bm25_weights('name=1, tags=0.25')
+
+    assert weights['name'] == 1.0 and weights['tags'] == 0.25
+    assert weights['filename'] == 5.0
+    with pytest.raises(ValueError):
+        parse_bm25_weights('nodes=3')
+
+
+def test_column_weights_decide_the_order(tmp_path):
+    directory = tmp_path / 'ranked'
+    write_workflow(directory, '9001_Digest_By_Name.json', [
+        {'name': 'Start', 'type': 'n8n-nodes-base.manualTrigger', 'parameters': {}},
+    ], name='Telegram digest')
+    write_workflow(directory, '9002_Digest_By_Node.json', [
+        {'name': 'Start', 'type': 'n8n-nodes-base.manualTrigger', 'parameters': {}},
+        {'name': 'Send', 'type': 'n8n-nodes-base.telegram', 'parameters': {}},
+    ], name='Daily digest')
+
+    def ranked(**weights):
+        db = WorkflowDatabase(str(tmp_path / 'ranked.db'), use_bitmap_index=False,
+                              bm25_weights=weights, static_boost_weight=0)
+        db.workflows_dir = str(directory)
+        db.index_all_workflows()
+        return filenames(db.search_workflows('telegram')[0])
+
+    assert ranked() == ['9001_Digest_By_Name.json', '9002_Digest_By_Node.json']
+    assert ranked(name=0.1) == ['9002_Digest_By_Node.json', '9001_Digest_By_Name.json']
+
+
+def test_static_boost_prefers_active_larger_workflows(db):
+    small = db.compute_static_boost({'active': False, 'node_count': 2})
+    active = db.compute_static_boost({'active': True, 'node_count': 2})
+    large = db.compute_static_boost({'active': False, 'node_count': 300})
+
+    assert 0 <= small < active <= 1
+    assert small < large == db.compute_static_boost({'active': False, 'node_count': 30})
+
+
+def test_deep_search_matches_node_parameters(tmp_path, workflows_dir):
+    write_workflow(workflows_dir, '9003_Quarterly_Report.json', [
+        {'name': 'Fetch', 'type': 'n8n-nodes-base.httpRequest',
+         'parameters': {'url': 'https://example.com/reports', 'options': {'query': 'xylophonic ledger'}}},
+    ])
+    db = WorkflowDatabase(str(tmp_path / 'deep.db'), use_bitmap_index=False, deep_index=True)
+    db.workflows_dir = str(workflows_dir)
+    db.index_all_workflows(force_reindex=True)
+
+    assert db.search_workflows('xylophonic')[1] == 0
+    results, total = db.search_workflows('xylophonic', scope='deep')
+
+    assert total == 1
+    assert filenames(results) == ['9003_Quarterly_Report.json']
+    assert '<mark>xylophonic</mark>' in results[0]['snippet']
+    assert db.has_deep_index()
+
+
+def test_deep_search_applies_column_filters_to_the_main_index(tmp_path, workflows_dir):
+    for filename in ('9003_Quarterly_Report.json', '9013_Slack_Report.json'):
+        write_workflow(workflows_dir, filename, [
+            {'name': 'Fetch', 'type': 'n8n-nodes-base.httpRequest', 'parameters': {'query': 'xylophonic ledger'}},
+        ])
+    db = WorkflowDatabase(str(tmp_path / 'deep.db'), use_bitmap_index=False, deep_index=True, pack_path='')
+    db.workflows_dir = str(workflows_dir)
+    db.index_all_workflows(force_reindex=True)
+
+    assert db.search_workflows('xylophonic', scope='deep')[1] == 2
+    results, total = db.search_workflows('filename:slack xylophonic', scope='deep')
+    assert filenames(results) == ['9013_Slack_Report.json']
+    assert '<mark>xylophonic</mark>' in results[0]['snippet']
+    assert db.search_workflows('filename:telegram xylophonic', scope='deep')[1] == 0
+
+    # Filters alone have no parameter text to match, so they search the main index
+    results, total = db.search_workflows('filename:slack', scope='deep')
+    assert filenames(results) == filenames(db.search_workflows('filename:slack')[0])
+
+
+def test_deep_index_is_opt_in(db):
+    assert not db.has_deep_index()
+    nodes = [{'parameters': {'text': 'hello', 'nested': [{'value': 'world'}]}}]
+    assert db.extract_parameter_text(nodes) == 'hello\nworld'
+
+
+def test_renamed_copy_is_found_as_similar(tmp_path, workflows_dir):
+    source = sorted(workflows_dir.rglob('*.json'))[0]
+    workflow = json.loads(source.read_text(encoding='utf-8'))
+    for node in workflow['nodes']:
+        node['parameters'] = {}
+    write_workflow(workflows_dir, '9004_Edited_Copy.json', workflow['nodes'], workflow['connections'])
+    (workflows_dir / 'Custom' / '9005_Exact_Copy.json').write_bytes(source.read_bytes())
+    db = WorkflowDatabase(str(tmp_path / 'similar.db'), use_bitmap_index=False)
+    db.workflows_dir = str(workflows_dir)
+    db.index_all_workflows(force_reindex=True)
+
+    similar = db.find_similar(source.name)
+
+    assert {'9004_Edited_Copy.json', '9005_Exact_Copy.json'} <= set(filenames(similar))
+    assert all(workflow['similarity'] == 1.0 for workflow in similar[:2])
+    assert db.find_similar('missing.json') is None
+    report = db.dedupe_report()
+    assert sorted([source.name, '9005_Exact_Copy.json']) in report['exact_duplicates']
+    assert any({source.name, '9004_Edited_Copy.json'} <= set(cluster) for cluster in report['near_duplicates'])
+
+
+def test_workflows_without_nodes_are_never_similar(db, workflows_dir):
+    write_workflow(workflows_dir, '9010_Empty.json', [])
+    write_workflow(workflows_dir, '9011_Also_Empty.json', [])
+    db.index_all_workflows()
+
+    assert db.find_similar('9010_Empty.json') == []
+    assert '9010_Empty.json' not in filenames(db.find_similar('9011_Also_Empty.json'))
+    report = db.dedupe_report()
+    assert not any('9010_Empty.json' in cluster for cluster in report['near_duplicates'])
+    assert db.index_all_workflows()['skipped'] == db.get_stats()['total']
+
+
+def test_categories_are_indexed_and_exported(db, workflows_dir):
+    write_workflow(workflows_dir, '9006_Alerts.json', [
+        {'name': 'Notify', 'type': 'n8n-nodes-base.slack', 'parameters': {}},
+        {'name': 'Forward', 'type': 'n8n-nodes-base.telegram', 'parameters': {}},
+    ])
+    db.index_all_workflows()
+
+    search_categories, unique_categories = db.export_categories()
+    by_filename = {item['filename']: item['category'] for item in search_categories}
+
+    assert by_filename['9006_Alerts.json'] == 'Communication & Messaging'
+    assert 'Uncategorized' in unique_categories
+    assert 'Communication & Messaging' in unique_categories
+
+
+def test_workflow_files_are_found_in_subfolders(db, workflows_dir):
+    paths = db.get_workflow_files()
+
+    assert len(paths) == len(list(workflows_dir.rglob('*.json')))
+    assert db.resolve_workflow_path(paths[0].name) == paths[0]
+    assert db.resolve_workflow_path('missing.json') is None
+
+    added = write_workflow(workflows_dir, '9007_Added_Later.json', [])
+    assert db.resolve_workflow_path(added.name) == added
+
+
+def test_manifest_tracks_the_corpus(db, workflows_dir):
+    assert db.is_index_current()
+    assert not db.needs_full_reindex(db.get_manifest())
+
+    added = write_workflow(workflows_dir, '9008_New.json', [])
+    assert not db.is_index_current()
+
+    db.start_background_reindex().join()
+    assert db.is_index_current()
+    assert db.resolve_workflow_path(added.name) is not None
+    assert db.needs_full_reindex({'index_version': '0'})
+    # Manifests from before index_version carry the schema version instead
+    assert db.needs_full_reindex({'schema_version': '5'})
+
+
+def test_unrelated_migrations_keep_the_index(db, monkeypatch):
+    manifest = db.get_manifest()
+    assert manifest['index_version'] == str(workflow_db.INDEX_VERSION)
+
+    # A migration that only adds tables (like the ledger) bumps SCHEMA_VERSION alone
+    monkeypatch.setattr(workflow_db, 'SCHEMA_VERSION', workflow_db.SCHEMA_VERSION + 1)
+    assert db.is_index_current(manifest)
+    assert not db.needs_full_reindex(manifest)
+
+    monkeypatch.setattr(workflow_db, 'INDEX_VERSION', workflow_db.INDEX_VERSION + 1)
+    assert not db.is_index_current(manifest)
+    assert db.needs_full_reindex(manifest)
+
+
+def test_migrations_run_once(tmp_path, capsys):
+    path = str(tmp_path / 'migrated.db')
+    WorkflowDatabase(path, use_bitmap_index=False)
+    assert 'Applying database migration 1' in capsys.readouterr().out
+
+    WorkflowDatabase(path, use_bitmap_index=False)
+    assert 'Applying database migration' not in capsys.readouterr().out
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(WorkflowDatabase.MIGRATIONS)
+    finally:
+        conn.close()
+
+
+def test_read_only_workers_cannot_write(db, tmp_path):
+    reader = WorkflowDatabase(db.db_path, use_bitmap_index=False, read_only=True)
+
+    assert reader.search_workflows('telegram')[1] == db.search_workflows('telegram')[1]
+    conn = reader.connect()
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM workflows")
+    finally:
+        conn.close()
+
+    unmigrated = str(tmp_path / 'unmigrated.db')
+    sqlite3.connect(unmigrated).close()
+    with pytest.raises(RuntimeError, match='--migrate'):
+        WorkflowDatabase(unmigrated, use_bitmap_index=False, read_only=True)
+
+
+def test_summary_projection_follows_reindex(db, workflows_dir):
+    def summary_ids():
+        conn = sqlite3.connect(db.db_path)
+        try:
+            workflows = conn.execute("SELECT id, filename FROM workflows ORDER BY id").fetchall()
+            summary = conn.execute("SELECT id, filename FROM workflow_summary ORDER BY id").fetchall()
+            return workflows, summary
+        finally:
+            conn.close()
+
+    workflows, summary = summary_ids()
+    assert summary == workflows
+
+    path = sorted(workflows_dir.rglob('*.json'))[0]
+    workflow = json.loads(path.read_text(encoding='utf-8'))
+    workflow['name'] = 'Renamed in place'
+    path.write_text(json.dumps(workflow), encoding='utf-8')
+    db.index_all_workflows()
+
+    workflows, summary = summary_ids()
+    assert summary == workflows
+    results, total = db.search_workflows('', limit=50)
+    assert total == len(workflows)
+    assert 'Renamed in place' in [result['name'] for result in results]
+
+
+def test_filename_lookup_is_cached_until_reindex(db, workflows_dir):
+    path = sorted(workflows_dir.rglob('*.json'))[0]
+    first = db.get_by_filename(path.name)
+    assert first['filename'] == path.name
+    assert db.get_by_filename('quote"and OR (missing).json') is None
+
+    # Returned rows are copies; the cache keeps its own
+    first['name'] = 'changed by the caller'
+    assert db.get_by_filename(path.name)['name'] != 'changed by the caller'
+
+    workflow = json.loads(path.read_text(encoding='utf-8'))
+    workflow['name'] = 'Renamed after caching'
+    path.write_text(json.dumps(workflow), encoding='utf-8')
+    db.index_all_workflows()
+
+    assert db.get_by_filename(path.name)['name'] == 'Renamed after caching'
+
+
+def test_deep_search_snippet_escapes_workflow_text(tmp_path, workflows_dir):
+    payload = 'Payroll <img src=x onerror="alert(1)"> <script>steal()</script> export'
+    write_workflow(workflows_dir, '9000_Sticky_Payload.json', [
+        {'name': 'Note', 'type': 'n8n-nodes-base.stickyNote', 'parameters': {'content': payload}},
+    ])
+    db = WorkflowDatabase(str(tmp_path / 'deep.db'), use_bitmap_index=False, deep_index=True, pack_path='')
+    db.workflows_dir = str(workflows_dir)
+    db.index_all_workflows(force_reindex=True)
+
+    results, total = db.search_workflows('payroll', scope='deep')
+
+    assert total == 1
+    snippet = results[0]['snippet']
+    assert '<mark>Payroll</mark>' in snippet
+    assert '<script>' not in snippet and '<img' not in snippet
+    assert '&lt;script&gt;' in snippet
+
+
+def test_filtered_substring_search_matches_unfiltered_results(db):
+    everything, total = db.search_workflows('egram', limit=100)
+    trigger = everything[0]['trigger_type']
+
+    results, filtered_total = db.search_workflows('egram', trigger_filter=trigger, limit=100)
+
+    expected = [workflow['filename'] for workflow in everything if workflow['trigger_type'] == trigger]
+    assert total > 0
+    assert filtered_total == len(expected)
+    assert [workflow['filename'] for workflow in results] == expected
+
+
+def test_export_with_missing_files_scans_and_connects_once(db, workflows_dir, monkeypatch):
+    removed = sorted(workflows_dir.rglob('*.json'))[:5]
+    for path in removed:
+        path.unlink()
+    refreshes, connections = [], []
+    get_workflow_files, connect = db.get_workflow_files, db.connect
+
+    def counting_get_workflow_files(refresh=False):
+        refreshes.append(refresh)
+        return get_workflow_files(refresh=refresh)
+
+    def counting_connect(*args, **kwargs):
+        connections.append(args)
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(db, 'get_workflow_files', counting_get_workflow_files)
+    monkeypatch.setattr(db, 'connect', counting_connect)
+
+    rows = [json.loads(line) for line in b''.join(db.iter_export(include_raw=True)).splitlines()]
+
+    assert refreshes.count(True) == 1
+    assert len(connections) == 1
+    missing = {row['filename'] for row in rows if 'error' in row}
+    assert missing == {path.name for path in removed}
+    assert all('raw_json' in row for row in rows if 'error' not in row)
+
+
+def test_abandoned_export_closes_its_connection(db, monkeypatch):
+    closed = []
+    connect = db.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        closed.append(False)
+        position = len(closed) - 1
+
+        class Tracked:
+            def __getattr__(self, name):
+                return getattr(conn, name)
+
+            def __setattr__(self, name, value):
+                setattr(conn, name, value)
+
+            def close(self):
+                closed[position] = True
+                conn.close()
+        return Tracked()
+
+    monkeypatch.setattr(db, 'connect', tracking_connect)
+    chunks = db.iter_export(include_raw=True, chunk_bytes=1)
+    next(chunks)
+    chunks.close()
+
+    assert closed == [True]
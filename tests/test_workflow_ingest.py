@@ -0,0 +1,128 @@
+import io
+import json
+import tarfile
+import threading
+import time
+import zipfile
+
+import pytest
+
+import workflow_db
+from workflow_ingest import IngestError, WorkflowIngester, iter_entries
+
+
+def workflow_bytes(name):
+    return json.dumps({'name': name, 'nodes': [], 'connections': {}}).encode()
+
+
+def ndjson(*records):
+    return io.BytesIO(b"".join(json.dumps(record).encode() + b"\n" for record in records))
+
+
+def test_ndjson_entries_and_per_item_results(db, workflows_dir):
+    corpus_name = sorted(workflows_dir.rglob('*.json'))[0].name
+    body = ndjson(
+        {'filename': '9100_Pushed.json', 'workflow': {'name': 'Pushed', 'nodes': [], 'connections': {}}},
+        {'filename': '9101_Copy.json', 'workflow': {'name': 'Pushed', 'nodes': [], 'connections': {}}},
+        {'filename': '../escape.json', 'workflow': {'nodes': []}},
+        {'filename': corpus_name, 'workflow': {'nodes': [], 'connections': {}}},
+        {'filename': '9102_No_Workflow.json'},
+    )
+
+    result = WorkflowIngester(db, workers=1).ingest(iter_entries(body))
+
+    assert [item['status'] for item in result['results']] == ['indexed', 'duplicate', 'error', 'error', 'error']
+    assert result['results'][1]['duplicate_of'] == '9100_Pushed.json'
+    assert db.get_by_filename('9100_Pushed.json')['name'] == 'Pushed'
+    assert json.loads(db.read_workflow_bytes('9100_Pushed.json'))['name'] == 'Pushed'
+
+
+def test_archives_are_keyed_by_basename(db):
+    tar_body = io.BytesIO()
+    with tarfile.open(fileobj=tar_body, mode='w:gz') as archive:
+        for name in ('Custom/9110_Tar.json', 'Custom/notes.txt'):
+            data = workflow_bytes(name)
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    tar_body.seek(0)
+    zip_body = io.BytesIO()
+    with zipfile.ZipFile(zip_body, 'w') as archive:
+        archive.writestr('Custom/9111_Zip.json', workflow_bytes('Zip'))
+    zip_body.seek(0)
+
+    ingester = WorkflowIngester(db, workers=1)
+    assert [item['filename'] for item in ingester.ingest(iter_entries(tar_body))['results']] == ['9110_Tar.json']
+    assert ingester.ingest(iter_entries(zip_body))['indexed'] == 1
+
+    # Re-ingesting a filename with new content updates it
+    assert ingester.ingest(iter([('9111_Zip.json', workflow_bytes('Zip v2'), None)]))['updated'] == 1
+    assert db.get_by_filename('9111_Zip.json')['name'] == 'Zip v2'
+
+
+def test_ndjson_workflows_hash_like_archive_members(db):
+    data = b'{"name": "Same", "nodes": [], "connections": {}}'
+    ndjson_body = io.BytesIO(b'{"filename": "9130_Line.json", "workflow": ' + data + b'}\n')
+    zip_body = io.BytesIO()
+    with zipfile.ZipFile(zip_body, 'w') as archive:
+        archive.writestr('9131_Member.json', data)
+    zip_body.seek(0)
+
+    ingester = WorkflowIngester(db, workers=1)
+    assert ingester.ingest(iter_entries(ndjson_body))['indexed'] == 1
+    assert db.read_workflow_bytes('9130_Line.json') == data
+
+    member = ingester.ingest(iter_entries(zip_body))['results'][0]
+    assert member['status'] == 'duplicate' and member['duplicate_of'] == '9130_Line.json'
+
+
+def test_unreadable_archive_is_rejected():
+    with pytest.raises(IngestError):
+        list(iter_entries(io.BytesIO(b"PK\x03\x04 not really a zip")))
+
+
+def test_ingest_endpoint(client, db, monkeypatch):
+    import api_server
+    monkeypatch.setattr(api_server, 'ingester', WorkflowIngester(db, workers=1))
+    body = json.dumps({'filename': '9120_Http.json', 'workflow': {'name': 'Http', 'nodes': [], 'connections': {}}})
+
+    status, _, response = client.request('POST', '/api/workflows/ingest', body.encode())
+
+    assert status == 200
+    assert json.loads(response)['indexed'] == 1
+    status, _, raw = client.get('/api/workflows/9120_Http.json/raw')
+    assert status == 200 and json.loads(raw)['name'] == 'Http'
+    assert client.request('POST', '/api/workflows/ingest', b'')[0] == 400
+
+
+def test_ingest_runs_between_reindex_batches(db, monkeypatch):
+    monkeypatch.setattr(workflow_db, 'INDEX_BATCH_SIZE', 2)
+    analyze = db.analyze_workflow_file
+
+    def slow_analyze(file_path):
+        time.sleep(0.05)
+        return analyze(file_path)
+
+    monkeypatch.setattr(db, 'analyze_workflow_file', slow_analyze)
+    failures = []
+
+    def reindex():
+        try:
+            db.index_all_workflows(force_reindex=True)
+        except Exception as e:
+            failures.append(e)
+
+    reindexes = [threading.Thread(target=reindex) for _ in range(2)]
+    for thread in reindexes:
+        thread.start()
+    time.sleep(0.1)
+    data = json.dumps({'name': 'Pushed', 'nodes': [], 'connections': {}}).encode()
+    result = WorkflowIngester(db, workers=1).ingest(iter([('9100_Pushed.json', data, None)]))
+    reindexing = any(thread.is_alive() for thread in reindexes)
+    for thread in reindexes:
+        thread.join()
+
+    assert result['indexed'] == 1
+    assert reindexing, "ingest waited for the whole reindex"
+    assert failures == []
+    assert db.get_by_filename('9100_Pushed.json') is not None
@@ -0,0 +1,66 @@
+from workflow_db import WorkflowDatabase
+from workflow_validator import WorkflowValidator, validate_workflow_data
+
+
+def node(name, node_type='n8n-nodes-base.set'):
+    return {'name': name, 'type': node_type, 'typeVersion': 1, 'position': [0, 0], 'parameters': {}}
+
+
+def link(*targets):
+    return {'main': [[{'node': target, 'type': 'main', 'index': 0} for target in targets]]}
+
+
+def test_structural_errors_and_warnings():
+    result = validate_workflow_data({
+        'nodes': [node('Start', 'n8n-nodes-base.manualTrigger'), node('Set'), node('Set'), {'name': 'Bare'}],
+        'connections': {'Start': link('Set', 'Missing'), 'Ghost': link('Set')},
+    })
+
+    assert "Duplicate node name 'Set'" in result['errors']
+    assert "Node Bare is missing required field 'type'" in result['errors']
+    assert "Connection from 'Start' (main) to unknown node 'Missing'" in result['errors']
+    assert "Connection from unknown node 'Ghost'" in result['errors']
+    assert "Node 'Bare' is not connected to any other node" in result['warnings']
+    assert "Node Bare is missing field 'position'" in result['warnings']
+
+
+def test_connected_workflow_is_clean():
+    result = validate_workflow_data({
+        'nodes': [node('Start', 'n8n-nodes-base.manualTrigger'), node('Set'),
+                  node('Note', 'n8n-nodes-base.stickyNote')],
+        'connections': {'Start': link('Set')},
+    })
+
+    assert result == {'errors': [], 'warnings': []}
+    assert validate_workflow_data([])['errors'] == ["Workflow is not a JSON object"]
+    assert validate_workflow_data({})['errors'] == [
+        "Missing or invalid 'nodes' list", "Missing or invalid 'connections' object"]
+
+
+def test_validation_cache_is_a_migrated_table(db, workflows_dir):
+    paths = sorted(workflows_dir.rglob('*.json'))
+    broken = workflows_dir / 'broken.json'
+    broken.write_text('{"nodes": [', encoding='utf-8')
+    paths.append(broken)
+
+    first = WorkflowValidator(db, workers=1).validate_paths(paths)
+    second = WorkflowValidator(db, workers=1).validate_paths(paths)
+
+    assert not any(result['cached'] for result in first)
+    assert all(result['cached'] for result in second)
+    assert [result['valid'] for result in second] == [result['valid'] for result in first]
+    assert first[-1]['errors'][0].startswith('Invalid JSON')
+
+
+def test_read_only_database_is_not_written(db, workflows_dir):
+    reader = WorkflowDatabase(db.db_path, use_bitmap_index=False, read_only=True, pack_path='')
+    paths = sorted(workflows_dir.rglob('*.json'))
+
+    results = WorkflowValidator(reader, workers=1).validate_paths(paths)
+
+    assert len(results) == len(paths)
+    conn = db.connect()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM validation_cache").fetchone()[0] == 0
+    finally:
+        conn.close()
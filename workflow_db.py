@@ -5,33 +5,244 @@ SQLite-based workflow indexer and search engine for instant performance.
 """
 
 import sqlite3
+import csv
+import io
 import json
 import os
 import glob
 import datetime
 import hashlib
-from typing import Dict, List, Any, Optional, Tuple
+import html
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from pathlib import Path
 
+from metrics import metrics
+from search_query import (FTS_COLUMNS, Vocabulary, build_deep_match_query, build_match_query,
+                          build_trigram_query)
+from similarity import (workflow_shingles, minhash_signature, lsh_buckets, estimate_similarity,
+                        pack_signature, unpack_signature)
+
+# bm25() column weights: names and real integrations outweigh the generated description
+DEFAULT_BM25_WEIGHTS = {
+    'filename': 5.0,
+    'name': 5.0,
+    'description': 0.5,
+    'integrations': 2.0,
+    'tags': 2.0,
+}
+
+# Scale applied to the index-time static boost (0 disables it)
+DEFAULT_STATIC_BOOST_WEIGHT = 1.0
+
+# Files indexed per transaction, so a reindex never holds the write lock for long
+INDEX_BATCH_SIZE = 200
+
+# Seconds a writing connection waits for another one's write transaction
+WRITE_BUSY_TIMEOUT = 30.0
+
+# Number of entries in WorkflowDatabase.MIGRATIONS
+SCHEMA_VERSION = 5
+
+# Version of what indexing writes. Bump it only when a migration changes
+# indexed tables or columns, or when the indexer derives different values;
+# startup then rebuilds the index from scratch (see is_index_current).
+# Migrations for other tables leave the index alone.
+# 2: workflows without structure store an empty MinHash signature
+INDEX_VERSION = 2
+
+# Columns of the workflow_summary projection: exactly what list endpoints return
+SUMMARY_COLUMNS = ('id', 'filename', 'name', 'active', 'description', 'trigger_type', 'complexity',
+                   'node_count', 'integrations', 'tags', 'created_at', 'updated_at')
+
+# Decoded workflows rows kept for filename lookups, and how often a cached
+# row's index generation is re-checked against the database
+ROW_CACHE_SIZE = 1024
+ROW_CACHE_RECHECK_SECONDS = 1.0
+
+# Per-workflow cap on text extracted into the deep (node parameter) index
+DEEP_INDEX_MAX_CHARS = 32768
+
+# snippet() brackets matches with these private-use characters; the text is
+# HTML-escaped before they become <mark> tags (see highlight_snippet)
+SNIPPET_START = '\ue000'
+SNIPPET_END = '\ue001'
+
+# Columns of a bulk export (GET /api/export, --export), in output order
+EXPORT_COLUMNS = ('id', 'filename', 'name', 'workflow_id', 'active', 'description', 'trigger_type',
+                  'complexity', 'node_count', 'integrations', 'tags', 'category', 'created_at',
+                  'updated_at', 'file_hash', 'file_size', 'analyzed_at')
+EXPORT_FORMATS = ('ndjson', 'csv')
+# Export output is buffered into chunks of about this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def parse_bm25_weights(spec: str) -> Dict[str, float]:
+    """Parse 'name=5,description=0.5' into a full column weight mapping."""
+    weights = dict(DEFAULT_BM25_WEIGHTS)
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        column, _, value = item.partition('=')
+        column = column.strip()
+        if column not in weights:
+            raise ValueError(f"Unknown FTS column '{column}' in bm25 weights")
+        weights[column] = float(value)
+    return weights
+
+
+def highlight_snippet(snippet: str) -> str:
+    """HTML-escape snippet text taken from workflows and turn the match
+    markers into ``<mark>`` tags, so clients can render it as HTML."""
+    return html.escape(snippet).replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+
+
+def splice_json(fields: Dict[str, Any], raw_key: str, raw: bytes) -> bytes:
+    """Serialize ``fields`` with ``raw`` (already valid JSON) appended under
+    ``raw_key`` verbatim, without parsing or re-encoding it."""
+    head = json.dumps(fields, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    separator = b"," if len(head) > 2 else b""
+    return b"".join((head[:-1], separator, json.dumps(raw_key).encode("utf-8"), b":", raw, b"}"))
+
+
+def verified_raw_json(metadata: Dict[str, Any], data: bytes) -> bytes:
+    """Workflow file bytes that are safe to splice into a JSON document.
+    
+    Bytes whose hash matches the index were parsed by the indexer and are
+    used as is; a file edited since indexing is parsed (ValueError if it is
+    no longer valid JSON) and re-encoded.
+    """
+    if hashlib.md5(data).hexdigest() == metadata.get('file_hash'):
+        return data
+    with metrics.timer('json_load'):
+        parsed = json.loads(data)
+    return json.dumps(parsed, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def single_line_json(raw: bytes) -> bytes:
+    """Valid JSON on one line: line breaks in it can only be whitespace."""
+    return raw.replace(b"\r", b"").replace(b"\n", b"")
+
+
 class WorkflowDatabase:
     """High-performance SQLite database for workflow metadata and search."""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, use_bitmap_index: Optional[bool] = None,
+                 bm25_weights: Optional[Dict[str, float]] = None,
+                 static_boost_weight: Optional[float] = None,
+                 deep_index: Optional[bool] = None, read_only: Optional[bool] = None,
+                 profiler=None, pack_path: Optional[str] = None):
         # Use environment variable if no path provided
         if db_path is None:
             db_path = os.environ.get('WORKFLOW_DB_PATH', 'workflows.db')
+        if use_bitmap_index is None:
+            use_bitmap_index = os.environ.get('WORKFLOW_BITMAP_INDEX', '').lower() in ('1', 'true', 'yes')
+        if bm25_weights is None:
+            bm25_weights = parse_bm25_weights(os.environ.get('WORKFLOW_BM25_WEIGHTS', ''))
+        if static_boost_weight is None:
+            static_boost_weight = float(os.environ.get('WORKFLOW_STATIC_BOOST', DEFAULT_STATIC_BOOST_WEIGHT))
+        if deep_index is None:
+            deep_index = os.environ.get('WORKFLOW_DEEP_INDEX', '').lower() in ('1', 'true', 'yes')
+        # Immutable implies read-only: for databases that never change while served
+        self.immutable = os.environ.get('WORKFLOW_DB_IMMUTABLE', '').lower() in ('1', 'true', 'yes')
+        if read_only is None:
+            read_only = self.immutable or os.environ.get('WORKFLOW_DB_READONLY', '').lower() in ('1', 'true', 'yes')
+        self.read_only = read_only
+        # Query plan / slow-query profiling (see query_profiler.py); off by default
+        if profiler is None and os.environ.get('WORKFLOW_PROFILE_QUERIES', '').lower() in ('1', 'true', 'yes'):
+            from query_profiler import QueryProfiler
+            profiler = QueryProfiler()
+        self.profiler = profiler
         self.db_path = db_path
         self.workflows_dir = "workflows"
+        # Packed corpus (see corpus_pack.py) read instead of workflows_dir when set
+        if pack_path is None:
+            pack_path = os.environ.get('WORKFLOW_CORPUS_PACK') or None
+        self.pack_path = pack_path
+        self._corpus_pack = None
+        self._corpus_pack_lock = threading.Lock()
+        # Serializes this instance's write transactions (reindex batches, ingests)
+        self._write_lock = threading.Lock()
+        self.deep_index = deep_index
+        self.use_bitmap_index = use_bitmap_index
+        self.bm25_weights = {**DEFAULT_BM25_WEIGHTS, **bm25_weights}
+        self.static_boost_weight = static_boost_weight
+        self._bitmap_index = None
+        self._vocabulary = None
+        self._category_engine = None
+        self._workflow_paths = None
+        self._row_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._row_cache_lock = threading.Lock()
+        self._row_cache_generation = None
+        self._row_cache_checked = 0.0
+        self.trigram_enabled = False
         self.init_database()
     
+    # Schema migrations in order; PRAGMA user_version counts the applied ones
+    MIGRATIONS = ('create_base_schema', 'create_summary_table', 'create_blob_table',
+                  'key_import_ledger_by_filename', 'create_validation_cache')
+    
+    def connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open a connection; read-only query workers use a ``mode=ro`` URI
+        (plus ``immutable=1`` when configured) so they can never write.
+        
+        ``check_same_thread=False`` is for a connection driven by a generator
+        that a server may resume from different threads, one at a time.
+        """
+        options = {'check_same_thread': check_same_thread}
+        if self.profiler is not None:
+            from query_profiler import ProfilingConnection
+            options['factory'] = ProfilingConnection
+        if not self.read_only:
+            conn = sqlite3.connect(self.db_path, timeout=WRITE_BUSY_TIMEOUT, **options)
+        else:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            if self.immutable:
+                uri += "&immutable=1"
+            conn = sqlite3.connect(uri, uri=True, **options)
+        if self.profiler is not None:
+            conn.profiler = self.profiler
+        return conn
+    
     def init_database(self):
-        """Initialize SQLite database with optimized schema and indexes."""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA journal_mode=WAL")  # Write-ahead logging for performance
-        conn.execute("PRAGMA synchronous=NORMAL")
-        conn.execute("PRAGMA cache_size=10000")
-        conn.execute("PRAGMA temp_store=MEMORY")
+        """Apply pending schema migrations; a single PRAGMA read when up to date."""
+        conn = self.connect()
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION and self.read_only:
+                raise RuntimeError(f"Database schema is at version {version}, expected {SCHEMA_VERSION}; "
+                                   f"run 'python workflow_db.py --migrate' before starting read-only workers")
+            if version < SCHEMA_VERSION:
+                self.migrate(conn)
+            self.trigram_enabled = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'workflows_trigram'"
+            ).fetchone() is not None
+        finally:
+            conn.close()
+    
+    def migrate(self, conn: sqlite3.Connection):
+        """Run the migrations newer than the database's user_version.
         
+        Runs in one IMMEDIATE transaction and re-reads the version inside it,
+        so concurrent processes (e.g. several server workers) migrate once.
+        """
+        conn.isolation_level = None
+        conn.execute("PRAGMA journal_mode=WAL")  # Write-ahead logging for performance
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, name in enumerate(self.MIGRATIONS[version:], start=version + 1):
+                print(f"🔧 Applying database migration {number}: {name}")
+                getattr(self, name)(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def create_base_schema(self, conn: sqlite3.Connection):
+        """Migration 1: tables, FTS indexes and triggers. Idempotent, so databases
+        created before user_version was tracked are upgraded in place."""
         # Create main workflows table
         conn.execute("""
             CREATE TABLE IF NOT EXISTS workflows (
@@ -50,10 +261,36 @@ class WorkflowDatabase:
                 updated_at TEXT,
                 file_hash TEXT,
                 file_size INTEGER,
+                static_boost REAL DEFAULT 0,  -- query-independent ranking boost
+                category TEXT,     -- use-case category from def_categories.json
                 analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
         
+        # Columns added after the initial schema
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(workflows)")}
+        if 'static_boost' not in columns:
+            conn.execute("ALTER TABLE workflows ADD COLUMN static_boost REAL DEFAULT 0")
+        if 'category' not in columns:
+            conn.execute("ALTER TABLE workflows ADD COLUMN category TEXT")
+        
+        # Workflows imported into n8n, keyed by content so edited files are re-imported
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS import_ledger (
+                file_hash TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Index metadata (generation counter bumped whenever the index changes)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        
         # Create FTS5 table for full-text search
         conn.execute("""
             CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts USING fts5(
@@ -73,6 +310,23 @@ class WorkflowDatabase:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_active ON workflows(active)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_node_count ON workflows(node_count)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_filename ON workflows(filename)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON workflows(category)")
+        
+        # MinHash signatures and LSH band buckets for near-duplicate detection
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_minhash (
+                filename TEXT PRIMARY KEY,
+                signature BLOB NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_lsh (
+                bucket TEXT NOT NULL,
+                filename TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON workflow_lsh(bucket)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_filename ON workflow_lsh(filename)")
         
         # Create triggers to keep FTS table in sync
         conn.execute("""
@@ -98,8 +352,518 @@ class WorkflowDatabase:
             END
         """)
         
-        conn.commit()
-        conn.close()
+        self.init_search_tables(conn)
+    
+    def create_summary_table(self, conn: sqlite3.Connection):
+        """Migration 2: narrow workflow_summary projection for list queries.
+        
+        It is clustered on (analyzed_at DESC, id DESC), the listing order, so
+        an unfiltered page is a range read of the table with no sort step.
+        Each filter the UI combines has an index ending in the same sort key.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_summary (
+                analyzed_at TEXT NOT NULL,
+                id INTEGER NOT NULL,       -- workflows.id
+                filename TEXT NOT NULL,
+                name TEXT NOT NULL,
+                active INTEGER NOT NULL DEFAULT 0,
+                description TEXT,
+                trigger_type TEXT,
+                complexity TEXT,
+                node_count INTEGER DEFAULT 0,
+                integrations TEXT,  -- JSON array
+                tags TEXT,          -- JSON array
+                created_at TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (analyzed_at DESC, id DESC)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_summary_id ON workflow_summary(id)")
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_summary_trigger
+                        ON workflow_summary(trigger_type, analyzed_at DESC, id DESC)""")
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_summary_complexity
+                        ON workflow_summary(complexity, analyzed_at DESC, id DESC)""")
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_summary_trigger_complexity
+                        ON workflow_summary(trigger_type, complexity, analyzed_at DESC, id DESC)""")
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_summary_active
+                        ON workflow_summary(active, analyzed_at DESC, id DESC)""")
+        
+        # Backfill from workflows indexed before the projection existed
+        conn.execute("DELETE FROM workflow_summary")
+        self.copy_to_summary(conn)
+    
+    def create_blob_table(self, conn: sqlite3.Connection):
+        """Migration 3: content-addressed storage for workflows pushed through
+        the ingest API, which have no file in workflows_dir."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_blobs (
+                file_hash TEXT PRIMARY KEY,  -- MD5 of data, as in workflows.file_hash
+                data BLOB NOT NULL
+            )
+        """)
+        # Duplicate detection looks workflows up by content
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_file_hash ON workflows(file_hash)")
+    
+    def key_import_ledger_by_filename(self, conn: sqlite3.Connection):
+        """Migration 4: key import_ledger by (file_hash, filename). Identical
+        workflows saved under different names are separate n8n imports."""
+        conn.execute("""
+            CREATE TABLE import_ledger_v4 (
+                file_hash TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (file_hash, filename)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            INSERT INTO import_ledger_v4 (file_hash, filename, imported_at)
+            SELECT file_hash, filename, imported_at FROM import_ledger
+        """)
+        conn.execute("DROP TABLE import_ledger")
+        conn.execute("ALTER TABLE import_ledger_v4 RENAME TO import_ledger")
+    
+    def create_validation_cache(self, conn: sqlite3.Connection):
+        """Migration 5: workflow_validator results keyed by file content. Created
+        on demand by the validator before it was a migration, hence IF NOT EXISTS."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS validation_cache (
+                file_hash TEXT PRIMARY KEY,
+                validator_version INTEGER NOT NULL,
+                errors TEXT NOT NULL,
+                warnings TEXT NOT NULL
+            )
+        """)
+    
+    def copy_to_summary(self, conn: sqlite3.Connection, workflow_id: Optional[int] = None):
+        """Copy one workflows row (or all of them) into workflow_summary."""
+        columns = ", ".join(SUMMARY_COLUMNS)
+        query = f"""
+            INSERT OR REPLACE INTO workflow_summary (analyzed_at, {columns})
+            SELECT COALESCE(analyzed_at, ''), {columns} FROM workflows
+        """
+        if workflow_id is None:
+            conn.execute(query)
+        else:
+            conn.execute(query + " WHERE id = ?", (workflow_id,))
+    
+    def init_search_tables(self, conn: sqlite3.Connection):
+        """Create the trigram FTS table and search vocabulary used for fuzzy matching."""
+        # Search vocabulary captured at index time for query corrections
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_vocab (
+                term TEXT PRIMARY KEY,
+                doc_count INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts_vocab USING fts5vocab(workflows_fts, row)
+        """)
+        
+        # Opt-in "deep" index over text extracted from node parameters;
+        # rowid matches workflows.id and content is stored for snippet()
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS workflows_deep_fts USING fts5(
+                name,
+                content
+            )
+        """)
+        
+        # Trigram-tokenized secondary FTS table (needs SQLite 3.34+)
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'workflows_trigram'"
+        ).fetchone()
+        if not exists:
+            try:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE workflows_trigram USING fts5(
+                        filename,
+                        name,
+                        description,
+                        integrations,
+                        tags,
+                        content=workflows,
+                        content_rowid=id,
+                        tokenize='trigram'
+                    )
+                """)
+            except sqlite3.OperationalError as e:
+                print(f"Warning: trigram search unavailable ({e})")
+                self.trigram_enabled = False
+                return
+            conn.execute("INSERT INTO workflows_trigram(workflows_trigram) VALUES ('rebuild')")
+            self.refresh_search_vocab(conn)
+        self.trigram_enabled = True
+        
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS workflows_trigram_ai AFTER INSERT ON workflows BEGIN
+                INSERT INTO workflows_trigram(rowid, filename, name, description, integrations, tags)
+                VALUES (new.id, new.filename, new.name, new.description, new.integrations, new.tags);
+            END
+        """)
+        
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS workflows_trigram_ad AFTER DELETE ON workflows BEGIN
+                INSERT INTO workflows_trigram(workflows_trigram, rowid, filename, name, description, integrations, tags)
+                VALUES ('delete', old.id, old.filename, old.name, old.description, old.integrations, old.tags);
+            END
+        """)
+        
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS workflows_trigram_au AFTER UPDATE ON workflows BEGIN
+                INSERT INTO workflows_trigram(workflows_trigram, rowid, filename, name, description, integrations, tags)
+                VALUES ('delete', old.id, old.filename, old.name, old.description, old.integrations, old.tags);
+                INSERT INTO workflows_trigram(rowid, filename, name, description, integrations, tags)
+                VALUES (new.id, new.filename, new.name, new.description, new.integrations, new.tags);
+            END
+        """)
+    
+    def refresh_search_vocab(self, conn: sqlite3.Connection):
+        """Snapshot the FTS vocabulary into search_vocab for spelling suggestions."""
+        conn.execute("DELETE FROM search_vocab")
+        conn.execute("""
+            INSERT INTO search_vocab (term, doc_count)
+            SELECT term, doc FROM workflows_fts_vocab
+        """)
+    
+    def get_vocabulary(self, conn: sqlite3.Connection = None):
+        """Get the in-memory search vocabulary, reloading it if the index generation changed."""
+        own_conn = conn is None
+        if own_conn:
+            conn = self.connect()
+        try:
+            generation = self.get_index_generation(conn)
+            stale = self._vocabulary is None or self._vocabulary.generation != generation
+            metrics.cache('vocabulary', hit=not stale)
+            if stale:
+                terms = conn.execute("SELECT term, doc_count FROM search_vocab").fetchall()
+                self._vocabulary = Vocabulary(terms, generation)
+            return self._vocabulary
+        finally:
+            if own_conn:
+                conn.close()
+    
+    def suggest_query(self, query: str) -> Optional[str]:
+        """Suggest a spelling-corrected query from the index vocabulary."""
+        return self.get_vocabulary().suggest(query)
+    
+    def get_index_generation(self, conn: sqlite3.Connection = None) -> int:
+        """Get the index generation, incremented by every indexing pass that changes rows."""
+        own_conn = conn is None
+        if own_conn:
+            conn = self.connect()
+        try:
+            row = conn.execute("SELECT value FROM index_meta WHERE key = 'generation'").fetchone()
+            return int(row[0]) if row else 0
+        finally:
+            if own_conn:
+                conn.close()
+    
+    def bump_index_generation(self, conn: sqlite3.Connection):
+        """Increment the index generation so in-memory indexes know to rebuild."""
+        conn.execute("""
+            INSERT INTO index_meta (key, value) VALUES ('generation', '1')
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """)
+    
+    def corpus_fingerprint(self) -> Tuple[str, int]:
+        """Cheap fingerprint of the workflows directory from file names, sizes and
+        mtimes only (no file contents are read). Returns (digest, file count).
+        A corpus pack is fingerprinted by the content digest in its index."""
+        pack = self.get_corpus_pack()
+        if pack is not None:
+            return f"pack:{pack.digest}", len(pack)
+        entries = []
+        pending = [self.workflows_dir]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith('.json'):
+                            stat = entry.stat()
+                            entries.append(f"{entry.path}\0{stat.st_size}\0{stat.st_mtime_ns}")
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        digest = hashlib.blake2b("\n".join(entries).encode('utf-8'), digest_size=16).hexdigest()
+        return digest, len(entries)
+    
+    def get_manifest(self, conn: sqlite3.Connection = None) -> Dict[str, str]:
+        """Index manifest: corpus fingerprint, index version, generation and options."""
+        own_conn = conn is None
+        if own_conn:
+            conn = self.connect()
+        try:
+            return dict(conn.execute("SELECT key, value FROM index_meta"))
+        finally:
+            if own_conn:
+                conn.close()
+    
+    def write_manifest(self, conn: sqlite3.Connection, fingerprint: str, file_count: int):
+        """Record what the index was built from (committed by the caller)."""
+        conn.executemany("""
+            INSERT INTO index_meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """, [
+            ('corpus_fingerprint', fingerprint),
+            ('corpus_files', str(file_count)),
+            ('index_version', str(INDEX_VERSION)),
+            ('deep_index', '1' if self.deep_index else '0'),
+            ('indexed_at', datetime.datetime.now().isoformat(timespec='seconds')),
+        ])
+    
+    def is_index_current(self, manifest: Optional[Dict[str, str]] = None) -> bool:
+        """True when the index was built by this index version from the files now on disk."""
+        if manifest is None:
+            manifest = self.get_manifest()
+        if manifest.get('index_version') != str(INDEX_VERSION):
+            return False
+        if self.deep_index and manifest.get('deep_index') != '1':
+            return False
+        return manifest.get('corpus_fingerprint') == self.corpus_fingerprint()[0]
+    
+    def has_workflows(self) -> bool:
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT EXISTS(SELECT 1 FROM workflows)").fetchone()[0] == 1
+        finally:
+            conn.close()
+    
+    def needs_full_reindex(self, manifest: Dict[str, str]) -> bool:
+        """An index built by a different index version must be rebuilt from scratch.
+        
+        Manifests written before index_version existed only carry the schema
+        version, which also differs, so those indexes are rebuilt once.
+        """
+        version = manifest.get('index_version', manifest.get('schema_version'))
+        return version is not None and version != str(INDEX_VERSION)
+    
+    def start_background_reindex(self, force_reindex: bool = False) -> threading.Thread:
+        """Reindex in a daemon thread while the server keeps serving.
+        
+        Readers are unaffected thanks to WAL; in-memory indexes rebuild on
+        their next use once the generation is bumped.
+        """
+        def run():
+            try:
+                self.index_all_workflows(force_reindex=force_reindex)
+            except Exception as e:
+                print(f"❌ Background reindex failed: {e}")
+        
+        thread = threading.Thread(target=run, name="workflow-reindex", daemon=True)
+        thread.start()
+        return thread
+    
+    def get_bitmap_index(self, conn: sqlite3.Connection = None):
+        """Get the in-memory bitmap index, rebuilding it if the index generation changed."""
+        from bitmap_index import BitmapIndex
+        
+        own_conn = conn is None
+        if own_conn:
+            conn = self.connect()
+        try:
+            generation = self.get_index_generation(conn)
+            stale = self._bitmap_index is None or self._bitmap_index.generation != generation
+            metrics.cache('bitmap_index', hit=not stale)
+            if stale:
+                index = BitmapIndex(self.get_service_categories())
+                index.build(conn, generation)
+                self._bitmap_index = index
+            return self._bitmap_index
+        finally:
+            if own_conn:
+                conn.close()
+    
+    def get_corpus_pack(self):
+        """The configured corpus pack, reopened when the file is rebuilt.
+        
+        None when no pack is configured, or when it is missing, in which case
+        workflows are read from workflows_dir.
+        """
+        if not self.pack_path:
+            return None
+        try:
+            stat = os.stat(self.pack_path)
+        except FileNotFoundError:
+            if self._corpus_pack is not False:
+                print(f"⚠️ Corpus pack '{self.pack_path}' not found, reading '{self.workflows_dir}' instead")
+                self._corpus_pack = False
+            return None
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        pack = self._corpus_pack
+        current = bool(pack) and pack.stat_key == key
+        metrics.cache('corpus_pack', hit=current)
+        if not current:
+            from corpus_pack import CorpusPack
+            with self._corpus_pack_lock:
+                pack = self._corpus_pack
+                if not pack or pack.stat_key != key:
+                    # Readers of the previous pack keep their mapping until it is collected
+                    pack = self._corpus_pack = CorpusPack(self.pack_path)
+        return pack
+    
+    def get_workflow_files(self, refresh: bool = False) -> List[Path]:
+        """All workflow JSON files under workflows_dir, including category subfolders.
+        
+        The listing is cached and shared by the indexer, the API and the importer.
+        """
+        if self._workflow_paths is None or refresh:
+            paths = {}
+            for path in sorted(Path(self.workflows_dir).rglob("*.json")):
+                # Filenames are unique keys in the index; the first occurrence wins
+                paths.setdefault(path.name, path)
+            self._workflow_paths = paths
+        return list(self._workflow_paths.values())
+    
+    def resolve_workflow_path(self, filename: str, rescan: bool = True) -> Optional[Path]:
+        """Path of a workflow file by filename, rescanning once for new files
+        unless ``rescan`` is False."""
+        with metrics.timer('resolve'):
+            cached = self._workflow_paths is not None
+            if not cached:
+                self.get_workflow_files()
+            path = self._workflow_paths.get(filename)
+            if rescan and (path is None or not path.exists()):
+                cached = False
+                self.get_workflow_files(refresh=True)
+                path = self._workflow_paths.get(filename)
+            metrics.cache('workflow_paths', hit=cached)
+            return path
+    
+    def read_workflow_bytes(self, filename: str, conn: Optional[sqlite3.Connection] = None,
+                            rescan: bool = True) -> Optional[bytes]:
+        """Raw bytes of a workflow, or None if it is not found.
+        
+        Read from the corpus pack when one is configured, otherwise from the
+        workflow file; workflows pushed through the ingest API come from the
+        blob table, looked up on ``conn`` when given. ``rescan=False`` is for
+        callers that refreshed the file listing themselves.
+        """
+        pack = self.get_corpus_pack()
+        if pack is not None:
+            with metrics.timer('file_read'):
+                data = pack.read(filename)
+            return data if data is not None else self.read_workflow_blob(filename, conn)
+        # Ingested workflows have no file: look for a blob before rescanning the directory
+        data = self._read_workflow_file(self.resolve_workflow_path(filename, rescan=False))
+        if data is None:
+            data = self.read_workflow_blob(filename, conn)
+        if data is None and rescan:
+            data = self._read_workflow_file(self.resolve_workflow_path(filename))
+        return data
+    
+    def _read_workflow_file(self, path: Optional[Path]) -> Optional[bytes]:
+        if path is None:
+            return None
+        with metrics.timer('file_read'):
+            try:
+                return path.read_bytes()
+            except FileNotFoundError:
+                return None
+    
+    def read_workflow_blob(self, filename: str, conn: Optional[sqlite3.Connection] = None) -> Optional[bytes]:
+        """Stored bytes of an ingested workflow, or None. Uses ``conn`` when
+        given, otherwise a connection of its own."""
+        own = conn is None
+        if own:
+            conn = self.connect()
+        try:
+            with metrics.timer('sql'):
+                row = conn.execute("""
+                    SELECT b.data FROM workflows w JOIN workflow_blobs b ON b.file_hash = w.file_hash
+                    WHERE w.filename = ?
+                """, (filename,)).fetchone()
+            return row[0] if row else None
+        finally:
+            if own:
+                conn.close()
+    
+    def is_corpus_file(self, filename: str) -> bool:
+        """True when the filename belongs to the corpus pack or workflows_dir,
+        whose content the indexer owns."""
+        pack = self.get_corpus_pack()
+        if pack is not None:
+            return filename in pack
+        return self.resolve_workflow_path(filename, rescan=False) is not None
+    
+    def find_by_hashes(self, hashes: List[str]) -> Dict[str, str]:
+        """Map content hashes that are already indexed to a filename holding them."""
+        found = {}
+        conn = self.connect()
+        try:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(conn.execute(
+                    f"SELECT file_hash, MIN(filename) FROM workflows WHERE file_hash IN ({placeholders}) "
+                    f"GROUP BY file_hash", chunk))
+        finally:
+            conn.close()
+        return found
+    
+    def store_ingested(self, items: List[Tuple[Dict[str, Any], bytes]]) -> set:
+        """Index analyzed workflows and store their bytes in one transaction.
+        
+        Returns the filenames that replaced an existing workflow. Blobs no
+        longer referenced by any workflow are dropped.
+        """
+        if not items:
+            return set()
+        filenames = [workflow['filename'] for workflow, _ in items]
+        conn = self.connect()
+        try:
+            with self._write_lock:
+                placeholders = ",".join("?" * len(filenames))
+                previous = dict(conn.execute(
+                    f"SELECT filename, file_hash FROM workflows WHERE filename IN ({placeholders})", filenames))
+                for workflow, data in items:
+                    conn.execute("INSERT OR IGNORE INTO workflow_blobs (file_hash, data) VALUES (?, ?)",
+                                 (workflow['file_hash'], data))
+                    self.upsert_workflow(conn, workflow)
+                conn.executemany("""
+                    DELETE FROM workflow_blobs WHERE file_hash = ?
+                    AND NOT EXISTS (SELECT 1 FROM workflows WHERE file_hash = ?)
+                """, [(file_hash, file_hash) for file_hash in set(previous.values())])
+                self.refresh_search_vocab(conn)
+                self.bump_index_generation(conn)
+                conn.commit()
+        finally:
+            conn.close()
+        self.clear_row_cache()
+        return set(previous)
+    
+    def get_imported(self) -> set:
+        """``(file_hash, filename)`` pairs of workflows already imported into n8n."""
+        conn = self.connect()
+        try:
+            return set(conn.execute("SELECT file_hash, filename FROM import_ledger"))
+        finally:
+            conn.close()
+    
+    def record_imports(self, imports: List[Tuple[str, str]]):
+        """Add ``(file_hash, filename)`` pairs to the import ledger."""
+        if not imports:
+            return
+        conn = self.connect()
+        try:
+            conn.executemany("""
+                INSERT OR REPLACE INTO import_ledger (file_hash, filename, imported_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, imports)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def clear_import_ledger(self):
+        conn = self.connect()
+        try:
+            conn.execute("DELETE FROM import_ledger")
+            conn.commit()
+        finally:
+            conn.close()
     
     def get_file_hash(self, file_path: str) -> str:
         """Get MD5 hash of file for change detection."""
@@ -149,16 +913,22 @@ class WorkflowDatabase:
     
     def analyze_workflow_file(self, file_path: str) -> Optional[Dict[str, Any]]:
         """Analyze a single workflow file and extract metadata."""
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        return self.analyze_workflow_data(os.path.basename(file_path), raw, source=file_path)
+    
+    def analyze_workflow_data(self, filename: str, raw: bytes,
+                              source: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Extract metadata from the bytes of one workflow JSON document;
+        ``source`` names it in error messages (defaults to the filename)."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = json.loads(raw.decode('utf-8'))
         except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            print(f"Error reading {file_path}: {str(e)}")
+            print(f"Error reading {source or filename}: {str(e)}")
             return None
         
-        filename = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path)
-        file_hash = self.get_file_hash(file_path)
+        file_size = len(raw)
+        file_hash = hashlib.md5(raw).hexdigest()
         
         # Extract basic metadata
         workflow = {
@@ -201,9 +971,92 @@ class WorkflowDatabase:
         
         # Generate description
         workflow['description'] = self.generate_description(workflow, trigger_type, integrations)
+        workflow['static_boost'] = self.compute_static_boost(workflow)
+        workflow['category'] = self.categorize_workflow(filename, integrations)
+        workflow['minhash'] = minhash_signature(
+            workflow_shingles(workflow['nodes'], workflow['connections'])
+        )
+        
+        if self.deep_index:
+            workflow['deep_text'] = self.extract_parameter_text(workflow['nodes'])
         
         return workflow
     
+    def extract_parameter_text(self, nodes: List[Dict], max_chars: int = DEEP_INDEX_MAX_CHARS) -> str:
+        """Extract searchable text (prompts, URLs, code, sticky notes) from node parameters.
+        
+        Strings are deduplicated in first-seen order and the result is capped
+        at ``max_chars`` so one huge workflow cannot bloat the deep index.
+        """
+        seen = set()
+        parts = []
+        size = 0
+        
+        def collect(value):
+            nonlocal size
+            if size >= max_chars:
+                return
+            if isinstance(value, dict):
+                for item in value.values():
+                    collect(item)
+            elif isinstance(value, list):
+                for item in value:
+                    collect(item)
+            elif isinstance(value, str):
+                # n8n expressions are stored with a leading '='
+                text = value[1:] if value.startswith('=') else value
+                text = text.strip()
+                if len(text) < 3 or text in seen:
+                    return
+                seen.add(text)
+                parts.append(text[:max_chars - size])
+                size += len(parts[-1]) + 1
+        
+        for node in nodes:
+            if not isinstance(node, dict):
+                continue
+            collect(node.get('notes', ''))
+            collect(node.get('parameters', {}))
+        
+        return "\n".join(parts)
+    
+    def categorize_workflow(self, filename: str, integrations: set) -> str:
+        """Use-case category from the workflow's integrations (weighted vote over
+        context/def_categories.json), falling back to filename keywords."""
+        if self._category_engine is None:
+            from create_categories import CategoryEngine, load_def_categories
+            try:
+                self._category_engine = CategoryEngine(load_def_categories())
+            except (FileNotFoundError, json.JSONDecodeError) as e:
+                print(f"Warning: category definitions unavailable ({e})")
+                self._category_engine = False
+        if not self._category_engine:
+            return ""
+        return self._category_engine.categorize_integrations(sorted(integrations), filename)
+    
+    def compute_static_boost(self, workflow: Dict) -> float:
+        """Query-independent ranking boost in [0, 1] from active flag, size and recency."""
+        boost = 0.0
+        if workflow.get('active'):
+            boost += 0.4
+        
+        # Richer templates are more useful starting points, up to a point
+        boost += 0.4 * min(workflow.get('node_count', 0), 30) / 30
+        
+        # Recently updated templates, decaying to nothing over two years
+        timestamp = workflow.get('updated_at') or workflow.get('created_at')
+        if isinstance(timestamp, str) and timestamp:
+            try:
+                updated = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                if updated.tzinfo is None:
+                    updated = updated.replace(tzinfo=datetime.timezone.utc)
+                age_days = (datetime.datetime.now(datetime.timezone.utc) - updated).days
+                boost += 0.2 * max(0.0, 1 - age_days / 730)
+            except ValueError:
+                pass
+        
+        return round(boost, 4)
+    
     def analyze_nodes(self, nodes: List[Dict]) -> Tuple[str, set]:
         """Analyze nodes to determine trigger type and integrations."""
         trigger_type = 'Manual'
@@ -429,92 +1282,299 @@ class WorkflowDatabase:
         
         return desc + "."
     
-    def index_all_workflows(self, force_reindex: bool = False) -> Dict[str, int]:
-        """Index all workflow files. Only reprocesses changed files unless force_reindex=True."""
-        if not os.path.exists(self.workflows_dir):
-            print(f"Warning: Workflows directory '{self.workflows_dir}' not found.")
-            return {'processed': 0, 'skipped': 0, 'errors': 0}
+    def upsert_workflow(self, conn: sqlite3.Connection, workflow_data: Dict[str, Any]) -> int:
+        """Insert or replace one analyzed workflow and return its rowid."""
+        row = conn.execute(
+            "SELECT id FROM workflows WHERE filename = ?", (workflow_data['filename'],)
+        ).fetchone()
+        old_id = row[0] if row else None
         
-        workflows_path = Path(self.workflows_dir)
-        json_files = [str(p) for p in workflows_path.rglob("*.json")]
+        cursor = conn.execute("""
+            INSERT OR REPLACE INTO workflows (
+                filename, name, workflow_id, active, description, trigger_type,
+                complexity, node_count, integrations, tags, created_at, updated_at,
+                file_hash, file_size, static_boost, category, analyzed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (
+            workflow_data['filename'],
+            workflow_data['name'],
+            workflow_data['workflow_id'],
+            workflow_data['active'],
+            workflow_data['description'],
+            workflow_data['trigger_type'],
+            workflow_data['complexity'],
+            workflow_data['node_count'],
+            json.dumps(workflow_data['integrations']),
+            json.dumps(workflow_data['tags']),
+            workflow_data['created_at'],
+            workflow_data['updated_at'],
+            workflow_data['file_hash'],
+            workflow_data['file_size'],
+            workflow_data['static_boost'],
+            workflow_data.get('category', '')
+        ))
+        workflow_id = cursor.lastrowid
+        
+        # REPLACE assigns a new rowid, so move the deep index and summary entries along with it
+        if old_id is not None:
+            conn.execute("DELETE FROM workflows_deep_fts WHERE rowid = ?", (old_id,))
+            conn.execute("DELETE FROM workflow_summary WHERE id = ?", (old_id,))
+        self.copy_to_summary(conn, workflow_id)
+        if 'deep_text' in workflow_data:
+            conn.execute(
+                "INSERT INTO workflows_deep_fts (rowid, name, content) VALUES (?, ?, ?)",
+                (workflow_id, workflow_data['name'], workflow_data['deep_text'])
+            )
         
-        if not json_files:
-            print(f"Warning: No JSON files found in '{self.workflows_dir}' directory.")
-            return {'processed': 0, 'skipped': 0, 'errors': 0}
+        if 'minhash' in workflow_data:
+            filename = workflow_data['filename']
+            signature = workflow_data['minhash']
+            # An empty signature marks a workflow without structure: it is
+            # indexed but in no LSH bucket, so it never matches anything
+            conn.execute(
+                "INSERT OR REPLACE INTO workflow_minhash (filename, signature) VALUES (?, ?)",
+                (filename, pack_signature(signature) if signature else b"")
+            )
+            conn.execute("DELETE FROM workflow_lsh WHERE filename = ?", (filename,))
+            if signature:
+                conn.executemany(
+                    "INSERT INTO workflow_lsh (bucket, filename) VALUES (?, ?)",
+                    [(bucket, filename) for bucket in lsh_buckets(signature)]
+                )
+        return workflow_id
+    
+    def index_all_workflows(self, force_reindex: bool = False) -> Dict[str, int]:
+        """Index all workflow files. Only reprocesses changed files unless force_reindex=True.
         
-        print(f"Indexing {len(json_files)} workflow files...")
+        With a corpus pack configured, entries are read from the pack and
+        unchanged ones are skipped by the hash in its index, without reading them.
+        """
+        pack = self.get_corpus_pack()
+        if pack is not None:
+            json_files = pack.names()
+            print(f"Indexing {len(json_files)} workflows from {self.pack_path}...")
+        else:
+            if not os.path.exists(self.workflows_dir):
+                print(f"Warning: Workflows directory '{self.workflows_dir}' not found.")
+                return {'processed': 0, 'skipped': 0, 'errors': 0}
+            
+            json_files = [str(p) for p in self.get_workflow_files(refresh=True)]
+            
+            if not json_files:
+                print(f"Warning: No JSON files found in '{self.workflows_dir}' directory.")
+                return {'processed': 0, 'skipped': 0, 'errors': 0}
+            
+            print(f"Indexing {len(json_files)} workflow files...")
         
-        conn = sqlite3.connect(self.db_path)
+        # Fingerprint before reading files so edits made during indexing are
+        # picked up by the next run
+        fingerprint, file_count = self.corpus_fingerprint()
+        conn = self.connect()
         conn.row_factory = sqlite3.Row
         
         stats = {'processed': 0, 'skipped': 0, 'errors': 0}
-        
-        for file_path in json_files:
-            filename = os.path.basename(file_path)
-            
-            try:
-                # Check if file needs to be reprocessed
-                if not force_reindex:
-                    current_hash = self.get_file_hash(file_path)
-                    cursor = conn.execute(
-                        "SELECT file_hash FROM workflows WHERE filename = ?", 
-                        (filename,)
-                    )
-                    row = cursor.fetchone()
-                    if row and row['file_hash'] == current_hash:
-                        stats['skipped'] += 1
+        bytes_read = 0
+        
+        # Commit every INDEX_BATCH_SIZE files: ingests and other writers get the
+        # write lock between batches instead of waiting for the whole corpus
+        for batch_start in range(0, len(json_files), INDEX_BATCH_SIZE):
+            with self._write_lock:
+                for file_path in json_files[batch_start:batch_start + INDEX_BATCH_SIZE]:
+                    filename = os.path.basename(file_path)
+                    
+                    try:
+                        # Check if file needs to be reprocessed
+                        if not force_reindex:
+                            if pack is not None:
+                                current_hash = pack.entry(filename).file_hash
+                            else:
+                                current_hash = self.get_file_hash(file_path)
+                                bytes_read += os.path.getsize(file_path)
+                            cursor = conn.execute("""
+                                SELECT file_hash, category,
+                                       EXISTS(SELECT 1 FROM workflows_deep_fts d WHERE d.rowid = w.id) AS has_deep,
+                                       EXISTS(SELECT 1 FROM workflow_minhash m WHERE m.filename = w.filename) AS has_minhash
+                                FROM workflows w WHERE filename = ?
+                            """, (filename,))
+                            row = cursor.fetchone()
+                            # Unchanged files still need processing when a derived index is new
+                            if (row and row['file_hash'] == current_hash and row['has_minhash']
+                                    and row['category'] is not None
+                                    and (row['has_deep'] or not self.deep_index)):
+                                stats['skipped'] += 1
+                                continue
+                        
+                        # Analyze workflow
+                        with metrics.timer('index_analyze'):
+                            if pack is not None:
+                                workflow_data = self.analyze_workflow_data(filename, pack.read(filename))
+                            else:
+                                workflow_data = self.analyze_workflow_file(file_path)
+                        if not workflow_data:
+                            stats['errors'] += 1
+                            continue
+                        if force_reindex or pack is not None:
+                            bytes_read += workflow_data['file_size']
+                        
+                        # Insert or update in database
+                        with metrics.timer('index_upsert'):
+                            self.upsert_workflow(conn, workflow_data)
+                        
+                        stats['processed'] += 1
+                        
+                    except Exception as e:
+                        print(f"Error processing {file_path}: {str(e)}")
+                        stats['errors'] += 1
                         continue
-                
-                # Analyze workflow
-                workflow_data = self.analyze_workflow_file(file_path)
-                if not workflow_data:
-                    stats['errors'] += 1
-                    continue
-                
-                # Insert or update in database
-                conn.execute("""
-                    INSERT OR REPLACE INTO workflows (
-                        filename, name, workflow_id, active, description, trigger_type,
-                        complexity, node_count, integrations, tags, created_at, updated_at,
-                        file_hash, file_size, analyzed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (
-                    workflow_data['filename'],
-                    workflow_data['name'],
-                    workflow_data['workflow_id'],
-                    workflow_data['active'],
-                    workflow_data['description'],
-                    workflow_data['trigger_type'],
-                    workflow_data['complexity'],
-                    workflow_data['node_count'],
-                    json.dumps(workflow_data['integrations']),
-                    json.dumps(workflow_data['tags']),
-                    workflow_data['created_at'],
-                    workflow_data['updated_at'],
-                    workflow_data['file_hash'],
-                    workflow_data['file_size']
-                ))
-                
-                stats['processed'] += 1
-                
-            except Exception as e:
-                print(f"Error processing {file_path}: {str(e)}")
-                stats['errors'] += 1
-                continue
-        
-        conn.commit()
+                conn.commit()
+        
+        with self._write_lock:
+            if stats['processed']:
+                self.refresh_search_vocab(conn)
+                self.bump_index_generation(conn)
+                self.clear_row_cache()
+            self.write_manifest(conn, fingerprint, file_count)
+            conn.commit()
         conn.close()
         
+        for result, count in stats.items():
+            metrics.inc('workflow_index_files_total', count, result=result)
+        metrics.inc('workflow_index_bytes_read_total', bytes_read)
         print(f"✅ Indexing complete: {stats['processed']} processed, {stats['skipped']} skipped, {stats['errors']} errors")
         return stats
     
+    def decode_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a workflows row to a dictionary and parse its JSON fields."""
+        workflow = dict(row)
+        workflow['integrations'] = json.loads(workflow['integrations'] or '[]')
+        
+        # Parse tags and convert dict tags to strings
+        raw_tags = json.loads(workflow['tags'] or '[]')
+        clean_tags = []
+        for tag in raw_tags:
+            if isinstance(tag, dict):
+                # Extract name from tag dict if available
+                clean_tags.append(tag.get('name', str(tag.get('id', 'tag'))))
+            else:
+                clean_tags.append(str(tag))
+        workflow['tags'] = clean_tags
+        return workflow
+    
+    def fetch_by_ids(self, conn: sqlite3.Connection, ids: List[int]) -> List[Dict]:
+        """Fetch decoded workflows by rowid, preserving the order of ``ids``."""
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        with metrics.timer('sql'):
+            rows = conn.execute(f"SELECT w.*, 0 as rank FROM workflow_summary w WHERE w.id IN ({placeholders})",
+                                ids).fetchall()
+        with metrics.timer('decode'):
+            by_id = {row['id']: self.decode_row(row) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+    
+    def clear_row_cache(self):
+        with self._row_cache_lock:
+            self._row_cache.clear()
+            self._row_cache_generation = None
+    
+    def _validate_row_cache(self, conn: sqlite3.Connection):
+        """Drop cached rows once another process bumps the index generation.
+        
+        Called at most every ROW_CACHE_RECHECK_SECONDS, so a reindex by another
+        worker shows up in cached lookups within that time.
+        """
+        now = time.monotonic()
+        generation = self.get_index_generation(conn)
+        with self._row_cache_lock:
+            if generation != self._row_cache_generation:
+                self._row_cache.clear()
+                self._row_cache_generation = generation
+            self._row_cache_checked = now
+    
+    def get_by_filename(self, filename: str) -> Optional[Dict]:
+        """Decoded workflows row for one filename, or None: one unique-index probe
+        on a cache miss."""
+        return self.get_many_by_filenames([filename]).get(filename)
+    
+    def get_many_by_filenames(self, filenames: List[str]) -> Dict[str, Dict]:
+        """Decoded workflows rows keyed by filename via the unique filename index.
+        
+        Rows are served from a small LRU when possible. Unknown filenames are
+        simply absent from the result.
+        """
+        filenames = list(dict.fromkeys(filenames))
+        if not filenames:
+            return {}
+        conn = None
+        try:
+            # Cache hits need no connection unless the generation is due a re-check
+            if time.monotonic() - self._row_cache_checked >= ROW_CACHE_RECHECK_SECONDS:
+                conn = self.connect()
+                self._validate_row_cache(conn)
+            found = {}
+            with self._row_cache_lock:
+                for filename in filenames:
+                    row = self._row_cache.get(filename)
+                    if row is not None:
+                        self._row_cache.move_to_end(filename)
+                        found[filename] = dict(row)
+            for filename in filenames:
+                metrics.cache('workflow_rows', hit=filename in found)
+            missing = [filename for filename in filenames if filename not in found]
+            if missing and conn is None:
+                conn = self.connect()
+            if conn is not None:
+                conn.row_factory = sqlite3.Row
+            
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                with metrics.timer('sql'):
+                    rows = conn.execute(f"SELECT * FROM workflows WHERE filename IN ({placeholders})",
+                                        chunk).fetchall()
+                with metrics.timer('decode'):
+                    decoded = [self.decode_row(row) for row in rows]
+                with self._row_cache_lock:
+                    for workflow in decoded:
+                        found[workflow['filename']] = dict(workflow)
+                        self._row_cache[workflow['filename']] = workflow
+                    while len(self._row_cache) > ROW_CACHE_SIZE:
+                        self._row_cache.popitem(last=False)
+            return found
+        finally:
+            if conn is not None:
+                conn.close()
+    
     def search_workflows(self, query: str = "", trigger_filter: str = "all", 
                         complexity_filter: str = "all", active_only: bool = False,
-                        limit: int = 50, offset: int = 0) -> Tuple[List[Dict], int]:
-        """Fast search with filters and pagination."""
-        conn = sqlite3.connect(self.db_path)
+                        limit: int = 50, offset: int = 0,
+                        scope: str = "default") -> Tuple[List[Dict], int]:
+        """Fast search with filters and pagination.
+        
+        The last word of ``query`` is matched as a prefix. When nothing matches,
+        every word is tried as a prefix, then the trigram index is tried for
+        substring matches inside words.
+        
+        ``scope="deep"`` searches the node parameter index instead and adds a
+        highlighted ``snippet`` to each result. ``column:value`` filters are
+        still matched against the main index.
+        """
+        conn = self.connect()
         conn.row_factory = sqlite3.Row
         
+        # Raw input is never passed to MATCH; punctuation-only input lists everything
+        match_query = build_match_query(query) if query.strip() else ""
+        
+        # Pure filter queries are answered from the in-memory bitmap index;
+        # FTS ranking always goes through SQLite
+        if self.use_bitmap_index and not match_query:
+            index = self.get_bitmap_index(conn)
+            bits = index.match(trigger_filter, complexity_filter, active_only)
+            results = self.fetch_by_ids(conn, index.page(bits, limit, offset))
+            conn.close()
+            return results, index.count(bits)
+        
         # Build WHERE clause
         where_conditions = []
         params = []
@@ -530,103 +1590,162 @@ class WorkflowDatabase:
             where_conditions.append("w.complexity = ?")
             params.append(complexity_filter)
         
+        if scope == "deep" and match_query:
+            # Column filters address workflows_fts columns the deep index does not have
+            text_query, filter_query = build_deep_match_query(query)
+            if text_query:
+                deep_conditions, deep_params = list(where_conditions), list(params)
+                if filter_query:
+                    deep_conditions.append("w.id IN (SELECT rowid FROM workflows_fts WHERE workflows_fts MATCH ?)")
+                    deep_params.append(filter_query)
+                results, total = self._run_search(conn, "workflows_deep_fts", text_query,
+                                                  deep_conditions, deep_params, limit, offset)
+                conn.close()
+                return results, total
+            # Only column filters: there is no parameter text to look for
+        
+        results, total = self._run_search(conn, "workflows_fts", match_query,
+                                          where_conditions, params, limit, offset)
+        
+        # Treat every word as a prefix before giving up on the main index
+        if total == 0 and match_query:
+            prefix_query = build_match_query(query, prefix="all")
+            if prefix_query != match_query:
+                results, total = self._run_search(conn, "workflows_fts", prefix_query,
+                                                  where_conditions, params, limit, offset)
+        
+        # Fall back to substring matching on the trigram index
+        if total == 0 and match_query and self.trigram_enabled:
+            trigram_query = build_trigram_query(query)
+            if trigram_query:
+                results, total = self._run_search(conn, "workflows_trigram", trigram_query,
+                                                  where_conditions, params, limit, offset)
+        
+        conn.close()
+        return results, total
+    
+    def snippet_expression(self, fts_table: str) -> str:
+        """Extra select column with a highlighted snippet, for the deep index only."""
+        if fts_table != "workflows_deep_fts":
+            return ""
+        return f", snippet(workflows_deep_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', '…', 16) as snippet"
+    
+    def has_deep_index(self) -> bool:
+        """Whether the opt-in deep index has been populated."""
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT 1 FROM workflows_deep_fts LIMIT 1").fetchone() is not None
+        finally:
+            conn.close()
+    
+    def rank_expression(self, fts_table: str) -> str:
+        """SQL ranking expression: weighted bm25() minus the scaled static boost.
+        
+        bm25() is negative with better matches lower, so subtracting the boost
+        moves boosted workflows up under ``ORDER BY rank``.
+        """
+        if fts_table == "workflows_deep_fts":
+            # Deep index columns: name, extracted parameter text
+            weights = f"{self.bm25_weights['name']!r}, 1.0"
+        else:
+            weights = ", ".join(repr(float(self.bm25_weights[column])) for column in FTS_COLUMNS)
+        expression = f"bm25({fts_table}, {weights})"
+        if self.static_boost_weight:
+            expression += f" - w.static_boost * {float(self.static_boost_weight)!r}"
+        return expression
+    
+    def _run_search(self, conn: sqlite3.Connection, fts_table: str, match_query: str,
+                    where_conditions: List[str], params: List[Any],
+                    limit: int, offset: int) -> Tuple[List[Dict], int]:
+        """Run a filtered, paginated search against one FTS table (or none)."""
+        params = list(params)
+        
         # Use FTS search if query provided
-        if query.strip():
-            # FTS search with ranking
-            base_query = """
-                SELECT w.*, rank
-                FROM workflows_fts fts
-                JOIN workflows w ON w.id = fts.rowid
-                WHERE workflows_fts MATCH ?
+        if match_query:
+            # FTS search with field-weighted ranking. CROSS JOIN keeps the MATCH
+            # as the outer loop: with a trigger or complexity filter the planner
+            # would otherwise scan that index and run the MATCH once per row
+            base_query = f"""
+                SELECT {', '.join('w.' + column for column in SUMMARY_COLUMNS)},
+                       {self.rank_expression(fts_table)} as rank
+                    {self.snippet_expression(fts_table)}
+                FROM {fts_table} fts
+                CROSS JOIN workflows w ON w.id = fts.rowid
+                WHERE {fts_table} MATCH ?
             """
-            params.insert(0, query)
+            params.insert(0, match_query)
         else:
-            # Regular query without FTS
+            # Regular query without FTS, served from the summary projection's indexes
             base_query = """
                 SELECT w.*, 0 as rank
-                FROM workflows w
+                FROM workflow_summary w
                 WHERE 1=1
             """
         
         if where_conditions:
             base_query += " AND " + " AND ".join(where_conditions)
         
-        # Count total results
         count_query = f"SELECT COUNT(*) as total FROM ({base_query}) t"
-        cursor = conn.execute(count_query, params)
-        total = cursor.fetchone()['total']
         
         # Get paginated results
-        if query.strip():
-            base_query += " ORDER BY rank"
+        if match_query:
+            base_query += " ORDER BY rank, w.id"
         else:
-            base_query += " ORDER BY w.analyzed_at DESC"
+            base_query += " ORDER BY w.analyzed_at DESC, w.id DESC"
         
         base_query += f" LIMIT {limit} OFFSET {offset}"
         
-        cursor = conn.execute(base_query, params)
-        rows = cursor.fetchall()
+        with metrics.timer('sql'):
+            total = conn.execute(count_query, params).fetchone()['total']
+            rows = conn.execute(base_query, params).fetchall()
         
         # Convert to dictionaries and parse JSON fields
-        results = []
-        for row in rows:
-            workflow = dict(row)
-            workflow['integrations'] = json.loads(workflow['integrations'] or '[]')
-            
-            # Parse tags and convert dict tags to strings
-            raw_tags = json.loads(workflow['tags'] or '[]')
-            clean_tags = []
-            for tag in raw_tags:
-                if isinstance(tag, dict):
-                    # Extract name from tag dict if available
-                    clean_tags.append(tag.get('name', str(tag.get('id', 'tag'))))
-                else:
-                    clean_tags.append(str(tag))
-            workflow['tags'] = clean_tags
-            
-            results.append(workflow)
-        
-        conn.close()
-        return results, total
+        with metrics.timer('decode'):
+            results = [self.decode_row(row) for row in rows]
+            for workflow in results:
+                if workflow.get('snippet'):
+                    workflow['snippet'] = highlight_snippet(workflow['snippet'])
+            return results, total
     
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         conn.row_factory = sqlite3.Row
         
-        # Basic counts
-        cursor = conn.execute("SELECT COUNT(*) as total FROM workflows")
-        total = cursor.fetchone()['total']
-        
-        cursor = conn.execute("SELECT COUNT(*) as active FROM workflows WHERE active = 1")
-        active = cursor.fetchone()['active']
-        
-        # Trigger type breakdown
-        cursor = conn.execute("""
-            SELECT trigger_type, COUNT(*) as count 
-            FROM workflows 
-            GROUP BY trigger_type
-        """)
-        triggers = {row['trigger_type']: row['count'] for row in cursor.fetchall()}
-        
-        # Complexity breakdown
-        cursor = conn.execute("""
-            SELECT complexity, COUNT(*) as count 
-            FROM workflows 
-            GROUP BY complexity
-        """)
-        complexity = {row['complexity']: row['count'] for row in cursor.fetchall()}
-        
-        # Node stats
-        cursor = conn.execute("SELECT SUM(node_count) as total_nodes FROM workflows")
-        total_nodes = cursor.fetchone()['total_nodes'] or 0
-        
-        # Unique integrations count
-        cursor = conn.execute("SELECT integrations FROM workflows WHERE integrations != '[]'")
-        all_integrations = set()
-        for row in cursor.fetchall():
-            integrations = json.loads(row['integrations'])
-            all_integrations.update(integrations)
+        with metrics.timer('sql'):
+            # Basic counts
+            cursor = conn.execute("SELECT COUNT(*) as total FROM workflows")
+            total = cursor.fetchone()['total']
+        
+            cursor = conn.execute("SELECT COUNT(*) as active FROM workflows WHERE active = 1")
+            active = cursor.fetchone()['active']
+        
+            # Trigger type breakdown
+            cursor = conn.execute("""
+                SELECT trigger_type, COUNT(*) as count 
+                FROM workflows 
+                GROUP BY trigger_type
+            """)
+            triggers = {row['trigger_type']: row['count'] for row in cursor.fetchall()}
+        
+            # Complexity breakdown
+            cursor = conn.execute("""
+                SELECT complexity, COUNT(*) as count 
+                FROM workflows 
+                GROUP BY complexity
+            """)
+            complexity = {row['complexity']: row['count'] for row in cursor.fetchall()}
+        
+            # Node stats
+            cursor = conn.execute("SELECT SUM(node_count) as total_nodes FROM workflows")
+            total_nodes = cursor.fetchone()['total_nodes'] or 0
+        
+            # Unique integrations count
+            cursor = conn.execute("SELECT integrations FROM workflows WHERE integrations != '[]'")
+            all_integrations = set()
+            for row in cursor.fetchall():
+                integrations = json.loads(row['integrations'])
+                all_integrations.update(integrations)
         
         conn.close()
         
@@ -641,6 +1760,130 @@ class WorkflowDatabase:
             'last_indexed': datetime.datetime.now().isoformat()
         }
 
+    def extract_node_graph(self, nodes: List[Dict], connections: Dict) -> Dict[str, List]:
+        """Nodes (name and type) and typed edges between them."""
+        names = set()
+        graph = {'nodes': [], 'edges': []}
+        for node in nodes:
+            if isinstance(node, dict):
+                names.add(node.get('name', ''))
+                graph['nodes'].append({'name': node.get('name', ''), 'type': node.get('type', '')})
+        if isinstance(connections, dict):
+            for source, outputs in connections.items():
+                if not isinstance(outputs, dict):
+                    continue
+                for kind, branches in outputs.items():
+                    for branch in branches if isinstance(branches, list) else []:
+                        for target in branch if isinstance(branch, list) else []:
+                            if isinstance(target, dict) and target.get('node') in names:
+                                graph['edges'].append({'source': source, 'target': target['node'], 'kind': kind})
+        return graph
+    
+    def iter_export_rows(self, include_raw: bool = False,
+                         include_graph: bool = False) -> Iterator[Dict[str, Any]]:
+        """Every workflow in filename order, decoded one row at a time.
+        
+        All rows come from one cursor, so the export is a consistent snapshot
+        (a single read transaction) and memory use does not grow with the
+        corpus. ``raw_json`` is the workflow file's bytes, ready to splice;
+        a workflow whose file is missing or invalid gets an ``error`` instead.
+        
+        File paths are resolved against one listing taken at the start, and
+        ingested workflows are read on the export's own connection, so
+        missing files cost neither a directory rescan nor a connection each.
+        """
+        conn = self.connect(check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            if (include_raw or include_graph) and self.get_corpus_pack() is None:
+                self.get_workflow_files(refresh=True)
+            # The unique filename index yields rows in order without a sort
+            cursor = conn.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM workflows ORDER BY filename")
+            for row in cursor:
+                workflow = self.decode_row(row)
+                workflow['active'] = bool(workflow['active'])
+                if include_raw or include_graph:
+                    data = self.read_workflow_bytes(workflow['filename'], conn, rescan=False)
+                    try:
+                        if data is None:
+                            raise FileNotFoundError("Workflow file not found")
+                        if include_graph:
+                            with metrics.timer('json_load'):
+                                parsed = json.loads(data)
+                            workflow['graph'] = self.extract_node_graph(parsed.get('nodes', []),
+                                                                        parsed.get('connections', {}))
+                        if include_raw:
+                            workflow['raw_json'] = verified_raw_json(workflow, data)
+                    except (OSError, ValueError) as e:
+                        workflow.pop('graph', None)
+                        workflow['error'] = str(e)
+                yield workflow
+        finally:
+            conn.close()
+    
+    def iter_export(self, fmt: str = 'ndjson', include_raw: bool = False, include_graph: bool = False,
+                    chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+        """Stream the whole index as NDJSON or CSV in chunks of about ``chunk_bytes``."""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}' (choose from {', '.join(EXPORT_FORMATS)})")
+        rows = self.iter_export_rows(include_raw=include_raw, include_graph=include_graph)
+        if fmt == 'ndjson':
+            lines = (self._export_ndjson_line(row) for row in rows)
+        else:
+            columns = list(EXPORT_COLUMNS)
+            if include_graph:
+                columns.append('graph')
+            if include_raw:
+                columns.append('raw_json')
+            if include_raw or include_graph:
+                columns.append('error')
+            lines = self._export_csv_lines(rows, columns)
+        
+        chunk, size = [], 0
+        try:
+            for line in lines:
+                chunk.append(line)
+                size += len(line)
+                if size >= chunk_bytes:
+                    yield b"".join(chunk)
+                    chunk, size = [], 0
+            if chunk:
+                yield b"".join(chunk)
+        finally:
+            # Close the row cursor's connection now when a client disconnects mid-export
+            rows.close()
+    
+    def _export_ndjson_line(self, workflow: Dict[str, Any]) -> bytes:
+        raw = workflow.pop('raw_json', None)
+        if raw is not None:
+            return splice_json(workflow, 'raw_json', single_line_json(raw)) + b"\n"
+        return (json.dumps(workflow, ensure_ascii=False) + "\n").encode("utf-8")
+    
+    def _export_csv_lines(self, rows: Iterator[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        def flush() -> bytes:
+            line = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            return line
+        
+        writer.writerow(columns)
+        yield flush()
+        for workflow in rows:
+            values = []
+            for column in columns:
+                value = workflow.get(column)
+                if isinstance(value, bytes):
+                    value = single_line_json(value).decode("utf-8")
+                elif isinstance(value, (bool, list, dict)):
+                    # Lists and booleans as JSON, so they read back unambiguously
+                    value = json.dumps(value, ensure_ascii=False)
+                values.append(value)
+            writer.writerow(values)
+            yield flush()
+    
     def get_service_categories(self) -> Dict[str, List[str]]:
         """Get service categories for enhanced filtering."""
         return {
@@ -665,9 +1908,16 @@ class WorkflowDatabase:
             return [], 0
         
         services = categories[category]
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         conn.row_factory = sqlite3.Row
         
+        if self.use_bitmap_index:
+            index = self.get_bitmap_index(conn)
+            bits = index.match(category=category)
+            results = self.fetch_by_ids(conn, index.page(bits, limit, offset))
+            conn.close()
+            return results, index.count(bits)
+        
         # Build OR conditions for all services in category
         service_conditions = []
         params = []
@@ -678,38 +1928,160 @@ class WorkflowDatabase:
         where_clause = " OR ".join(service_conditions)
         
         # Count total results
-        count_query = f"SELECT COUNT(*) as total FROM workflows WHERE {where_clause}"
-        cursor = conn.execute(count_query, params)
-        total = cursor.fetchone()['total']
+        count_query = f"SELECT COUNT(*) as total FROM workflow_summary WHERE {where_clause}"
         
         # Get paginated results
         query = f"""
-            SELECT * FROM workflows 
+            SELECT * FROM workflow_summary 
             WHERE {where_clause}
-            ORDER BY analyzed_at DESC
+            ORDER BY analyzed_at DESC, id DESC
             LIMIT {limit} OFFSET {offset}
         """
         
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
+        with metrics.timer('sql'):
+            total = conn.execute(count_query, params).fetchone()['total']
+            rows = conn.execute(query, params).fetchall()
         
         # Convert to dictionaries and parse JSON fields
-        results = []
-        for row in rows:
-            workflow = dict(row)
-            workflow['integrations'] = json.loads(workflow['integrations'] or '[]')
-            raw_tags = json.loads(workflow['tags'] or '[]')
-            clean_tags = []
-            for tag in raw_tags:
-                if isinstance(tag, dict):
-                    clean_tags.append(tag.get('name', str(tag.get('id', 'tag'))))
-                else:
-                    clean_tags.append(str(tag))
-            workflow['tags'] = clean_tags
-            results.append(workflow)
+        with metrics.timer('decode'):
+            results = [self.decode_row(row) for row in rows]
         
         conn.close()
         return results, total
+    
+    def export_categories(self) -> Tuple[List[Dict[str, str]], List[str]]:
+        """Export search_categories.json / unique_categories.json content from the index."""
+        conn = self.connect()
+        try:
+            search_categories = [
+                {"filename": filename, "category": category or ""}
+                for filename, category in conn.execute(
+                    "SELECT filename, category FROM workflows ORDER BY filename"
+                )
+            ]
+        finally:
+            conn.close()
+        
+        unique_categories = {item['category'] for item in search_categories if item['category']}
+        # Always include 'Uncategorized' for workflows without categories
+        unique_categories.add('Uncategorized')
+        return search_categories, sorted(unique_categories)
+    
+    def find_similar(self, filename: str, limit: int = 20,
+                     min_similarity: float = 0.5) -> Optional[List[Dict]]:
+        """Find structurally similar workflows via shared LSH buckets.
+        
+        Returns None if the workflow has no signature (unknown or not indexed)
+        and an empty list if it has no nodes to compare.
+        """
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute(
+                "SELECT signature FROM workflow_minhash WHERE filename = ?", (filename,)
+            ).fetchone()
+            if not row:
+                return None
+            signature = unpack_signature(row['signature'])
+            if not signature:
+                return []
+            
+            # Candidates share at least one band bucket; only they are compared
+            cursor = conn.execute("""
+                SELECT m.filename, m.signature
+                FROM workflow_minhash m
+                WHERE m.filename IN (
+                    SELECT DISTINCT l2.filename
+                    FROM workflow_lsh l1
+                    JOIN workflow_lsh l2 ON l2.bucket = l1.bucket
+                    WHERE l1.filename = ? AND l2.filename != ?
+                )
+            """, (filename, filename))
+            scored = []
+            for candidate in cursor.fetchall():
+                similarity = estimate_similarity(signature, unpack_signature(candidate['signature']))
+                if similarity >= min_similarity:
+                    scored.append((similarity, candidate['filename']))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            scored = scored[:limit]
+            
+            workflows = self.get_many_by_filenames([candidate for _, candidate in scored])
+            similar = []
+            for similarity, candidate in scored:
+                if candidate in workflows:
+                    result = workflows[candidate]
+                    result['similarity'] = similarity
+                    similar.append(result)
+            return similar
+        finally:
+            conn.close()
+    
+    def dedupe_report(self, min_similarity: float = 0.9) -> Dict[str, Any]:
+        """Group exact duplicates (same file hash) and near-duplicate clusters.
+        
+        Only pairs sharing an LSH bucket are compared, so the cost grows with
+        the number of candidate pairs rather than the square of the corpus.
+        """
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            exact = [
+                sorted(row['filenames'].split('\n'))
+                for row in conn.execute("""
+                    SELECT group_concat(filename, char(10)) AS filenames
+                    FROM workflows
+                    GROUP BY file_hash
+                    HAVING COUNT(*) > 1
+                """)
+            ]
+            
+            signatures = {
+                row['filename']: unpack_signature(row['signature'])
+                for row in conn.execute("SELECT filename, signature FROM workflow_minhash "
+                                        "WHERE length(signature) > 0")
+            }
+            buckets: Dict[str, List[str]] = {}
+            for row in conn.execute("SELECT bucket, filename FROM workflow_lsh"):
+                buckets.setdefault(row['bucket'], []).append(row['filename'])
+        finally:
+            conn.close()
+        
+        # Union-find over candidate pairs above the threshold
+        parent: Dict[str, str] = {}
+        
+        def find(item: str) -> str:
+            while parent.get(item, item) != item:
+                parent[item] = parent.get(parent[item], parent[item])
+                item = parent[item]
+            return item
+        
+        compared = set()
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pair = (first, second) if first < second else (second, first)
+                    if pair in compared:
+                        continue
+                    compared.add(pair)
+                    if estimate_similarity(signatures[first], signatures[second]) >= min_similarity:
+                        first_root, second_root = find(first), find(second)
+                        parent.setdefault(second_root, second_root)
+                        if first_root != second_root:
+                            parent[first_root] = second_root
+        
+        clusters: Dict[str, List[str]] = {}
+        for filename in list(parent):
+            clusters.setdefault(find(filename), []).append(filename)
+        near = sorted((sorted(members) for members in clusters.values() if len(members) > 1),
+                      key=lambda members: (-len(members), members[0]))
+        
+        return {
+            'min_similarity': min_similarity,
+            'workflows': len(signatures),
+            'candidate_pairs': len(compared),
+            'exact_duplicates': sorted(exact, key=lambda group: (-len(group), group[0])),
+            'near_duplicates': near,
+        }
 
 
 def main():
@@ -721,20 +2093,98 @@ def main():
     parser.add_argument('--force', action='store_true', help='Force reindex all files')
     parser.add_argument('--search', help='Search workflows')
     parser.add_argument('--stats', action='store_true', help='Show database statistics')
+    parser.add_argument('--deep', action='store_true',
+                        help='With --index, also build the node parameter index; with --search, search it')
+    parser.add_argument('--dedupe-report', action='store_true',
+                        help='Report exact and near-duplicate workflows')
+    parser.add_argument('--threshold', type=float, default=0.9,
+                        help='Minimum estimated similarity for --dedupe-report (default: 0.9)')
+    parser.add_argument('--migrate', action='store_true',
+                        help='Apply pending schema migrations and exit')
+    parser.add_argument('--validate', action='store_true',
+                        help='With --index, validate workflow structure first and write validation_report.json')
+    parser.add_argument('--export', metavar='FILE',
+                        help="Stream all workflow metadata to FILE ('-' for stdout)")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson',
+                        help='With --export, output format (default: ndjson)')
+    parser.add_argument('--include-raw', action='store_true',
+                        help="With --export, add each workflow's JSON")
+    parser.add_argument('--include-graph', action='store_true',
+                        help="With --export, add each workflow's node graph")
+    parser.add_argument('--profile-queries', action='store_true',
+                        help='Replay a query mix, print each query shape with its plan and timings, '
+                             'and suggest missing indexes')
+    parser.add_argument('--slow-ms', type=float, default=None,
+                        help='With --profile-queries, log queries slower than this (default: WORKFLOW_SLOW_QUERY_MS or 50)')
     
     args = parser.parse_args()
     
-    db = WorkflowDatabase()
+    profiler = None
+    if args.profile_queries:
+        from query_profiler import QueryProfiler
+        profiler = QueryProfiler(slow_ms=args.slow_ms)
+    
+    db = WorkflowDatabase(deep_index=True if args.deep else None, profiler=profiler)
+    
+    if args.migrate:
+        print(f"✅ Database schema at version {SCHEMA_VERSION}: {db.db_path}")
     
-    if args.index:
+    elif args.index:
+        if args.validate:
+            from workflow_validator import WorkflowValidator, build_report, write_report, DEFAULT_REPORT
+            start = time.time()
+            results = WorkflowValidator(db).validate_paths(db.get_workflow_files(refresh=True))
+            report = build_report(results, time.time() - start)
+            write_report(report)
+            print(f"🔍 Validation: {report['invalid']} invalid, {report['with_warnings']} with warnings "
+                  f"(details in {DEFAULT_REPORT})")
         stats = db.index_all_workflows(force_reindex=args.force)
         print(f"Indexed {stats['processed']} workflows")
     
     elif args.search:
-        results, total = db.search_workflows(args.search, limit=10)
+        results, total = db.search_workflows(args.search, limit=10,
+                                             scope="deep" if args.deep else "default")
         print(f"Found {total} workflows:")
         for workflow in results:
             print(f"  - {workflow['name']} ({workflow['trigger_type']}, {workflow['node_count']} nodes)")
+            if workflow.get('snippet'):
+                print(f"      {' '.join(workflow['snippet'].split())}")
+        if total == 0:
+            suggestion = db.suggest_query(args.search)
+            if suggestion:
+                print(f"Did you mean: {suggestion}")
+    
+    elif args.dedupe_report:
+        report = db.dedupe_report(min_similarity=args.threshold)
+        print(f"Duplicate report ({report['workflows']} workflows, "
+              f"{report['candidate_pairs']} candidate pairs compared):")
+        print(f"\nExact duplicates: {len(report['exact_duplicates'])} groups")
+        for group in report['exact_duplicates']:
+            print(f"  - {', '.join(group)}")
+        print(f"\nNear duplicates (similarity >= {args.threshold}): {len(report['near_duplicates'])} clusters")
+        for cluster in report['near_duplicates']:
+            print(f"  - {', '.join(cluster)}")
+    
+    elif args.export:
+        import sys
+        chunks = db.iter_export(args.format, include_raw=args.include_raw, include_graph=args.include_graph)
+        if args.export == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            written = 0
+            with open(args.export, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    written += len(chunk)
+            print(f"✅ Exported the index to {args.export} ({written / 1e6:.1f} MB, {args.format})")
+    
+    elif args.profile_queries:
+        from query_profiler import print_profile
+        # Profile the SQL paths, not the in-memory bitmap index
+        db.use_bitmap_index = False
+        print_profile(db)
     
     elif args.stats:
         stats = db.get_stats()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Bulk ingestion of workflows pushed over the API instead of dropped into
+``workflows/``.
+
+A request body is one of:
+
+- NDJSON, one ``{"filename": "...", "workflow": {...}}`` object per line
+- a tar archive (optionally gzip, bzip2 or xz compressed) of workflow JSON files
+- a zip archive of workflow JSON files
+
+Archive members are keyed by their basename, as files in category folders
+are; hidden files and members that are not ``.json`` are skipped. Entries
+are analyzed by ``WorkflowDatabase.analyze_workflow_data``, the same code
+the indexer runs on files, in a process pool (``WORKFLOW_INGEST_WORKERS``,
+default one per CPU; 1 analyzes inline). They are committed in batches of
+``INGEST_BATCH_SIZE`` per transaction, with their bytes kept in the
+``workflow_blobs`` table. Content already indexed under any filename is
+reported as a duplicate and not stored again.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# Entries analyzed and committed per transaction
+INGEST_BATCH_SIZE = 200
+# Upper bound for a single workflow JSON document
+INGEST_MAX_ENTRY_BYTES = 16 * 1024 * 1024
+INGEST_WORKERS = int(os.environ.get('WORKFLOW_INGEST_WORKERS') or os.cpu_count() or 1)
+
+# (filename, bytes, error); an entry with an error is reported and skipped
+Entry = Tuple[Optional[str], Optional[bytes], Optional[str]]
+
+
+class IngestError(ValueError):
+    """The request body as a whole cannot be read (not a per-item failure)."""
+
+
+def check_filename(filename: Any) -> Optional[str]:
+    """Error message for a filename the index cannot key on, else None."""
+    if not isinstance(filename, str) or not filename.endswith('.json'):
+        return "filename must be a string ending in .json"
+    if '/' in filename or '\\' in filename or filename.startswith('.') or len(filename) > 255:
+        return "filename must be a plain file name, not a path"
+    return None
+
+
+def detect_format(head: bytes) -> str:
+    """'zip', 'tar' or 'ndjson' from the first bytes of a body."""
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"PK\x05\x06"):
+        return 'zip'
+    if head.startswith((b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")) or head[257:262] == b"ustar":
+        return 'tar'
+    return 'ndjson'
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def parse_record(text: str) -> Tuple[Any, Dict[str, str]]:
+    """Parse one JSON document like ``json.loads``; for an object, also return
+    the source text of each top-level member value."""
+    position = _WHITESPACE.match(text).end()
+    if not text.startswith('{', position):
+        return json.loads(text), {}
+    record: Dict[str, Any] = {}
+    sources: Dict[str, str] = {}
+    position = _WHITESPACE.match(text, position + 1).end()
+    if text.startswith('}', position):
+        position += 1
+    else:
+        while True:
+            if not text.startswith('"', position):
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, position)
+            key, position = _decoder.raw_decode(text, position)
+            position = _WHITESPACE.match(text, position).end()
+            if not text.startswith(':', position):
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, position)
+            start = _WHITESPACE.match(text, position + 1).end()
+            record[key], position = _decoder.raw_decode(text, start)
+            sources[key] = text[start:position]
+            position = _WHITESPACE.match(text, position).end()
+            if text.startswith(',', position):
+                position = _WHITESPACE.match(text, position + 1).end()
+            elif text.startswith('}', position):
+                position += 1
+                break
+            else:
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, position)
+    if _WHITESPACE.match(text, position).end() != len(text):
+        raise json.JSONDecodeError("Extra data", text, position)
+    return record, sources
+
+
+def iter_ndjson_entries(stream: BinaryIO) -> Iterator[Entry]:
+    """Entries from NDJSON lines. Each workflow keeps the bytes it was sent
+    as, so it hashes like the same document in an archive or on disk."""
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        if len(line) > INGEST_MAX_ENTRY_BYTES:
+            yield None, None, f"line {number}: larger than {INGEST_MAX_ENTRY_BYTES} bytes"
+            continue
+        try:
+            record, sources = parse_record(line.decode('utf-8'))
+        except ValueError as e:
+            yield None, None, f"line {number}: invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict) or not isinstance(record.get('workflow'), dict):
+            yield (record.get('filename') if isinstance(record, dict) else None, None,
+                   f"line {number}: expected an object with 'filename' and a 'workflow' object")
+            continue
+        yield record.get('filename'), sources['workflow'].encode('utf-8'), None
+
+
+def iter_tar_entries(stream: BinaryIO) -> Iterator[Entry]:
+    try:
+        archive = tarfile.open(fileobj=stream, mode='r:*')
+    except tarfile.TarError as e:
+        raise IngestError(f"Unreadable tar archive: {e}")
+    with archive:
+        for member in archive:
+            filename = os.path.basename(member.name)
+            if not member.isfile() or filename.startswith('.') or not filename.endswith('.json'):
+                continue
+            if member.size > INGEST_MAX_ENTRY_BYTES:
+                yield filename, None, f"larger than {INGEST_MAX_ENTRY_BYTES} bytes"
+                continue
+            yield filename, archive.extractfile(member).read(), None
+
+
+def iter_zip_entries(stream: BinaryIO) -> Iterator[Entry]:
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as e:
+        raise IngestError(f"Unreadable zip archive: {e}")
+    with archive:
+        for info in archive.infolist():
+            filename = os.path.basename(info.filename)
+            if info.is_dir() or filename.startswith('.') or not filename.endswith('.json'):
+                continue
+            if info.file_size > INGEST_MAX_ENTRY_BYTES:
+                yield filename, None, f"larger than {INGEST_MAX_ENTRY_BYTES} bytes"
+                continue
+            try:
+                yield filename, archive.read(info), None
+            except (zipfile.BadZipFile, NotImplementedError) as e:
+                yield filename, None, f"unreadable zip member: {e}"
+
+
+def iter_entries(stream: BinaryIO) -> Iterator[Entry]:
+    """Entries of a seekable body in whichever format it is."""
+    head = stream.read(512)
+    stream.seek(0)
+    fmt = detect_format(head)
+    if fmt == 'zip':
+        return iter_zip_entries(stream)
+    if fmt == 'tar':
+        return iter_tar_entries(stream)
+    return iter_ndjson_entries(stream)
+
+
+# Analysis in pool processes: each has its own WorkflowDatabase for the
+# settings (deep index, categories) analyze_workflow_data depends on
+_worker_db = None
+
+
+def _init_worker(db_path: str, deep_index: bool):
+    global _worker_db
+    from workflow_db import WorkflowDatabase
+    _worker_db = WorkflowDatabase(db_path, use_bitmap_index=False, deep_index=deep_index,
+                                  read_only=True, pack_path='')
+
+
+def analyze_entry(db, filename: str, data: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """(workflow, None) or (None, error message) for one entry."""
+    try:
+        workflow = db.analyze_workflow_data(filename, data)
+    except Exception as e:
+        return None, f"Error analyzing workflow: {str(e)}"
+    if workflow is None:
+        # Parse again only to report why the JSON was rejected
+        try:
+            json.loads(data.decode('utf-8'))
+        except ValueError as e:
+            return None, f"Invalid JSON: {str(e)}"
+        return None, "Invalid workflow JSON"
+    return workflow, None
+
+
+def _analyze_in_worker(filename: str, data: bytes):
+    return analyze_entry(_worker_db, filename, data)
+
+
+class WorkflowIngester:
+    """Analyzes and indexes pushed workflows for one WorkflowDatabase.
+
+    Requests are handled one at a time so duplicate detection sees every
+    earlier commit; the process pool is started on first use and reused.
+    """
+
+    def __init__(self, db, workers: int = INGEST_WORKERS, batch_size: int = INGEST_BATCH_SIZE):
+        self.db = db
+        self.workers = workers
+        self.batch_size = batch_size
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _analyze(self, entries: List[Tuple[str, bytes]]):
+        if self.workers <= 1 or len(entries) < 2:
+            return [analyze_entry(self.db, filename, data) for filename, data in entries]
+        if self._pool is None:
+            # spawn: forking a threaded server process is not safe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(os.path.abspath(self.db.db_path), self.db.deep_index))
+        filenames, datas = zip(*entries)
+        chunksize = max(1, len(entries) // (self.workers * 4))
+        try:
+            return list(self._pool.map(_analyze_in_worker, filenames, datas, chunksize=chunksize))
+        except BrokenProcessPool:
+            # A worker died: start a fresh pool on the next request
+            self._pool.shutdown(wait=False)
+            self._pool = None
+            raise
+
+    def ingest(self, entries: Iterator[Entry]) -> Dict[str, Any]:
+        """Index all entries; returns counts and one result per entry, in input order."""
+        with self._lock:
+            results: List[Dict[str, Any]] = []
+            seen_filenames = set()
+            seen_hashes: Dict[str, str] = {}
+            batch: List[Tuple[Dict[str, Any], str, bytes]] = []
+
+            for position, (filename, data, error) in enumerate(entries):
+                result: Dict[str, Any] = {'item': position, 'filename': filename}
+                results.append(result)
+                error = error or check_filename(filename)
+                if error is None and filename in seen_filenames:
+                    error = "filename appears earlier in this request"
+                if error is None and self.db.is_corpus_file(filename):
+                    error = "a workflow file with this name exists in the corpus; edit the file instead"
+                if error is not None:
+                    result.update(status='error', error=error)
+                    continue
+                seen_filenames.add(filename)
+                result['file_hash'] = hashlib.md5(data).hexdigest()
+                batch.append((result, filename, data))
+                if len(batch) >= self.batch_size:
+                    self._commit(batch, seen_hashes)
+                    batch = []
+            self._commit(batch, seen_hashes)
+
+            counts = {status: 0 for status in ('indexed', 'updated', 'duplicate', 'error')}
+            for result in results:
+                counts[result['status']] += 1
+            print(f"📥 Ingested {len(results)} workflows: {counts['indexed']} indexed, {counts['updated']} updated, "
+                  f"{counts['duplicate']} duplicates, {counts['error']} errors")
+            return {**counts, 'total': len(results), 'results': results}
+
+    def _commit(self, batch: List[Tuple[Dict[str, Any], str, bytes]], seen_hashes: Dict[str, str]):
+        """Dedupe, analyze and commit one batch in a single transaction."""
+        if not batch:
+            return
+        indexed = self.db.find_by_hashes(list({result['file_hash'] for result, _, _ in batch}))
+        pending = []
+        for result, filename, data in batch:
+            duplicate_of = seen_hashes.get(result['file_hash']) or indexed.get(result['file_hash'])
+            if duplicate_of is not None:
+                result.update(status='duplicate', duplicate_of=duplicate_of)
+            else:
+                seen_hashes[result['file_hash']] = filename
+                pending.append((result, filename, data))
+
+        analyzed = self._analyze([(filename, data) for _, filename, data in pending])
+        stored = []
+        for (result, filename, data), (workflow, error) in zip(pending, analyzed):
+            if error is not None:
+                result.update(status='error', error=error)
+                # Not indexed, so later copies are analyzed rather than called duplicates
+                del seen_hashes[result['file_hash']]
+            else:
+                stored.append((result, workflow, data))
+        replaced = self.db.store_ingested([(workflow, data) for _, workflow, data in stored])
+        for result, workflow, _ in stored:
+            result['status'] = 'updated' if workflow['filename'] in replaced else 'indexed'
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Structural validation for n8n workflow files.
+Runs across a process pool before importing or indexing so malformed
+workflows are rejected without spawning n8n, and caches results by file hash.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Fields every n8n node needs to be imported; the others are expected but optional
+REQUIRED_NODE_FIELDS = ('name', 'type')
+EXPECTED_NODE_FIELDS = ('typeVersion', 'position', 'parameters')
+
+# Nodes that legitimately have no connections
+STANDALONE_NODE_TYPES = {'n8n-nodes-base.stickyNote'}
+
+# Bump when the rules change so cached results are recomputed
+VALIDATOR_VERSION = 1
+
+DEFAULT_REPORT = "validation_report.json"
+
+
+def validate_workflow_data(data) -> Dict[str, List[str]]:
+    """Check a parsed workflow; returns ``{"errors": [...], "warnings": [...]}``.
+
+    Errors make a workflow unimportable (missing nodes/connections, nodes
+    without name or type, duplicate names, connections to unknown nodes).
+    Warnings cover missing optional node fields and orphan nodes.
+    """
+    errors: List[str] = []
+    warnings: List[str] = []
+
+    if not isinstance(data, dict):
+        return {"errors": ["Workflow is not a JSON object"], "warnings": warnings}
+
+    nodes = data.get('nodes')
+    connections = data.get('connections')
+    if not isinstance(nodes, list):
+        errors.append("Missing or invalid 'nodes' list")
+        nodes = []
+    if not isinstance(connections, dict):
+        errors.append("Missing or invalid 'connections' object")
+        connections = {}
+
+    names = set()
+    standalone = set()
+    triggers = set()
+    for position, node in enumerate(nodes):
+        if not isinstance(node, dict):
+            errors.append(f"Node #{position} is not an object")
+            continue
+        label = node.get('name') or f"#{position}"
+        for field in REQUIRED_NODE_FIELDS:
+            if not node.get(field):
+                errors.append(f"Node {label} is missing required field '{field}'")
+        for field in EXPECTED_NODE_FIELDS:
+            if field not in node:
+                warnings.append(f"Node {label} is missing field '{field}'")
+
+        name = node.get('name')
+        if not name:
+            continue
+        if name in names:
+            errors.append(f"Duplicate node name '{name}'")
+        names.add(name)
+        node_type = node.get('type') or ''
+        if node_type in STANDALONE_NODE_TYPES:
+            standalone.add(name)
+        elif 'trigger' in node_type.lower() or node_type.endswith('.webhook'):
+            triggers.add(name)
+
+    connected = set()
+    for source, outputs in connections.items():
+        if source not in names:
+            errors.append(f"Connection from unknown node '{source}'")
+        if not isinstance(outputs, dict):
+            errors.append(f"Connections of '{source}' are not an object")
+            continue
+        for kind, branches in outputs.items():
+            for branch in branches if isinstance(branches, list) else []:
+                for target in branch if isinstance(branch, list) else []:
+                    target_name = target.get('node') if isinstance(target, dict) else None
+                    if target_name not in names:
+                        errors.append(f"Connection from '{source}' ({kind}) to unknown node '{target_name}'")
+                        continue
+                    connected.add(source)
+                    connected.add(target_name)
+
+    # Orphans only matter once there is something to connect to
+    if len(names - standalone) > 1:
+        for name in sorted(names - connected - standalone):
+            kind = "Trigger" if name in triggers else "Node"
+            warnings.append(f"{kind} '{name}' is not connected to any other node")
+
+    return {"errors": errors, "warnings": warnings}
+
+
+def validate_file(path: str) -> Dict:
+    """Validate one workflow file (runs in worker processes)."""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        return {"errors": [f"Invalid JSON: {e}"], "warnings": []}
+    return validate_workflow_data(data)
+
+
+def file_hash(path: str) -> str:
+    """MD5 of a file, matching WorkflowDatabase.get_file_hash."""
+    hash_md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+
+class WorkflowValidator:
+    """Validates workflow files in parallel with a file_hash-keyed result cache.
+
+    The cache is the ``validation_cache`` table of a WorkflowDatabase (created
+    by its migrations); read-only databases are read but never written.
+    """
+
+    def __init__(self, db=None, workers: Optional[int] = None):
+        if db is None:
+            from workflow_db import WorkflowDatabase
+            db = WorkflowDatabase()
+        self.db = db
+        self.workers = workers or os.cpu_count() or 1
+
+    def validate_paths(self, paths: List[Path]) -> List[Dict]:
+        """Validate files, reusing cached results for unchanged content.
+
+        Returns one result per path, in order, with ``filename``, ``path``,
+        ``file_hash``, ``valid``, ``errors``, ``warnings`` and ``cached``.
+        """
+        paths = [str(path) for path in paths]
+        hashes = {}
+        results: Dict[str, Dict] = {}
+        for path in paths:
+            try:
+                hashes[path] = file_hash(path)
+            except OSError as e:
+                results[path] = {"errors": [f"Unreadable file: {e}"], "warnings": [], "cached": False}
+
+        conn = self.db.connect()
+        try:
+            cached = {}
+            unique_hashes = list(set(hashes.values()))
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique_hashes), 500):
+                chunk = unique_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for digest, errors, warnings in conn.execute(f"""
+                    SELECT file_hash, errors, warnings FROM validation_cache
+                    WHERE validator_version = ? AND file_hash IN ({placeholders})
+                """, [VALIDATOR_VERSION, *chunk]):
+                    cached[digest] = {"errors": json.loads(errors), "warnings": json.loads(warnings)}
+
+            misses = []
+            for path, digest in hashes.items():
+                if digest in cached:
+                    results[path] = {**cached[digest], "cached": True}
+                else:
+                    misses.append(path)
+
+            if misses:
+                if self.workers > 1 and len(misses) > 1:
+                    from concurrent.futures import ProcessPoolExecutor
+                    with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                        chunksize = max(1, len(misses) // (self.workers * 4))
+                        outcomes = list(executor.map(validate_file, misses, chunksize=chunksize))
+                else:
+                    outcomes = [validate_file(path) for path in misses]
+                for path, outcome in zip(misses, outcomes):
+                    results[path] = {**outcome, "cached": False}
+
+            if misses and not self.db.read_only:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO validation_cache (file_hash, validator_version, errors, warnings)
+                    VALUES (?, ?, ?, ?)
+                """, [(hashes[path], VALIDATOR_VERSION, json.dumps(results[path]["errors"]),
+                       json.dumps(results[path]["warnings"])) for path in misses])
+                conn.commit()
+        finally:
+            conn.close()
+
+        return [{
+            "filename": os.path.basename(path),
+            "path": path,
+            "file_hash": hashes.get(path),
+            "valid": not results[path]["errors"],
+            **results[path],
+        } for path in paths]
+
+
+def build_report(results: List[Dict], elapsed: float) -> Dict:
+    """Machine-readable summary plus per-file results with findings."""
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "validator_version": VALIDATOR_VERSION,
+        "elapsed_seconds": round(elapsed, 3),
+        "total": len(results),
+        "valid": sum(1 for result in results if result["valid"]),
+        "invalid": sum(1 for result in results if not result["valid"]),
+        "with_warnings": sum(1 for result in results if result["warnings"]),
+        "cached": sum(1 for result in results if result["cached"]),
+        "results": [result for result in results if result["errors"] or result["warnings"]],
+    }
+
+
+def write_report(report: Dict, path: str = DEFAULT_REPORT):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    import argparse
+    from workflow_db import WorkflowDatabase
+
+    parser = argparse.ArgumentParser(description='Validate n8n workflow files')
+    parser.add_argument('--dir', default=None, help='Workflows directory (default: workflows)')
+    parser.add_argument('--db', default=None, help='Database holding the validation cache')
+    parser.add_argument('--workers', type=int, default=None, help='Validation processes (default: CPU count)')
+    parser.add_argument('--report', default=DEFAULT_REPORT, help='Path of the JSON report')
+    args = parser.parse_args()
+
+    db = WorkflowDatabase(args.db)
+    if args.dir:
+        db.workflows_dir = args.dir
+    paths = db.get_workflow_files(refresh=True)
+
+    start = time.time()
+    results = WorkflowValidator(db, args.workers).validate_paths(paths)
+    report = build_report(results, time.time() - start)
+    write_report(report, args.report)
+
+    print(f"🔍 Validated {report['total']} workflows in {report['elapsed_seconds']}s "
+          f"({report['cached']} cached)")
+    print(f"✅ Valid: {report['valid']}  ❌ Invalid: {report['invalid']}  "
+          f"⚠️  With warnings: {report['with_warnings']}")
+    for result in report['results']:
+        if result['errors']:
+            print(f"   • {result['filename']}: {result['errors'][0]}")
+    print(f"📄 Report written to {args.report}")
+    sys.exit(1 if report['invalid'] else 0)
+
+
+if __name__ == "__main__":
+    main()